@@ -0,0 +1,94 @@
+"""
+Check that GET /api/model-testing/results pages through every row exactly once.
+
+Builds a throwaway SQLite database whose ``tested_at`` values mix the two stored
+shapes ("YYYY-MM-DD HH:MM:SS" from the server default and older rows,
+"YYYY-MM-DD HH:MM:SS.ffffff" from the ORM default), including ties on the same
+second, then follows ``next_cursor`` until it runs out and verifies that every id
+came back once, newest first.
+
+Usage:
+    python -m backend.loadtest.check_results_pagination --rows 304 --limit 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from backend.database import Base
+from backend.routers.model_testing import list_results
+
+
+def _tested_at(index: int) -> str:
+    # Three rows per second; every other row in the old, second-precision shape.
+    moment = datetime(2025, 1, 1) + timedelta(seconds=index // 3, microseconds=(index % 3) * 250_000)
+    if index % 2:
+        return moment.strftime("%Y-%m-%d %H:%M:%S")
+    return moment.isoformat(sep=" ", timespec="microseconds")
+
+
+async def run(rows: int, limit: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'pagination.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(
+                text(
+                    "INSERT INTO model_test_results (source_dataset, source_filename, score, tested_at) "
+                    "VALUES (:dataset, :filename, :score, :tested_at)"
+                ),
+                [
+                    {"dataset": "gold", "filename": f"sample_{index}.wav", "score": index % 101, "tested_at": _tested_at(index)}
+                    for index in range(rows)
+                ],
+            )
+
+        seen: list[int] = []
+        pages = 0
+        cursor = None
+        async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+            while True:
+                page = await list_results(
+                    drum_type=None,
+                    min_score=None,
+                    max_score=None,
+                    tested_after=None,
+                    tested_before=None,
+                    model_version=None,
+                    has_notes=None,
+                    include_json=False,
+                    cursor=cursor,
+                    limit=limit,
+                    session=session,
+                )
+                pages += 1
+                seen.extend(row["id"] for row in page["results"])
+                cursor = page["next_cursor"]
+                if cursor is None or pages > rows:
+                    break
+        await engine.dispose()
+
+    # Ids are 1-based insert order; expected order is stored time, then id, newest first.
+    expected = sorted(range(1, rows + 1), key=lambda row_id: (datetime.fromisoformat(_tested_at(row_id - 1)), row_id), reverse=True)
+    assert len(seen) == len(set(seen)) == rows, f"{len(seen)} rows fetched, {len(set(seen))} unique, {rows} expected"
+    assert seen == expected, "results are not newest first"
+    print(f"OK: {rows} rows in {pages} pages of {limit}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=304)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.limit))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Microbenchmark for the model worker's audio encoders.
+
+Times the previous ``wave``/``BytesIO`` encoder against every output format of
+``encode_audio`` on synthetic stereo float32 audio and reports ms per encode,
+throughput and output size. FLAC is included when ``soundfile`` is installed.
+
+Usage:
+    python -m backend.loadtest.encode_bench --seconds 2 --iterations 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import time
+import wave
+from typing import Callable
+
+import numpy as np
+
+from backend.model_beta_worker import available_output_formats, encode_audio
+
+
+def legacy_wav_bytes(audio: np.ndarray, sample_rate: int) -> bytes:
+    """The encoder the worker used before EncodedAudio (clip, scale, astype, wave module, getvalue)."""
+    channels = 1 if audio.ndim == 1 else audio.shape[1]
+    audio = np.clip(np.asarray(audio, dtype=np.float32), -1.0, 1.0)
+    audio_int16 = (audio * 32767.0).astype(np.int16)
+    with io.BytesIO() as buffer:
+        with wave.open(buffer, "wb") as wav_file:
+            wav_file.setnchannels(channels)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(sample_rate)
+            wav_file.writeframes(audio_int16.tobytes())
+        return buffer.getvalue()
+
+
+def _time(encode: Callable[[np.ndarray], int], source: np.ndarray, iterations: int) -> tuple[float, int]:
+    # Each iteration gets a fresh copy, like synth output; the copy is not timed.
+    inputs = [source.copy() for _ in range(min(iterations, 8))]
+    size = encode(inputs[0].copy())
+    started = time.perf_counter()
+    for iteration in range(iterations):
+        buffer = inputs[iteration % len(inputs)]
+        buffer[...] = source
+        encode(buffer)
+    elapsed = time.perf_counter() - started
+    # Subtract the refill cost measured separately.
+    refill_started = time.perf_counter()
+    for iteration in range(iterations):
+        inputs[iteration % len(inputs)][...] = source
+    elapsed -= time.perf_counter() - refill_started
+    return max(elapsed, 0.0) / iterations, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=2.0, help="Length of the test audio")
+    parser.add_argument("--sample-rate", type=int, default=44100)
+    parser.add_argument("--channels", type=int, default=2)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    frames = int(args.seconds * args.sample_rate)
+    rng = np.random.default_rng(0)
+    source = (rng.standard_normal((frames, args.channels)) * 0.5).astype(np.float32)
+    raw_mb = source.nbytes / (1024 * 1024)
+
+    cases: list[tuple[str, Callable[[np.ndarray], int]]] = [
+        ("legacy-wave", lambda audio: len(legacy_wav_bytes(audio, args.sample_rate))),
+    ]
+    for output_format in available_output_formats():
+        cases.append(
+            (output_format, lambda audio, fmt=output_format: len(encode_audio(audio, args.sample_rate, fmt)))
+        )
+        cases.append(
+            (
+                f"{output_format}+join",
+                lambda audio, fmt=output_format: len(encode_audio(audio, args.sample_rate, fmt).tobytes()),
+            )
+        )
+
+    print(f"{frames} frames x {args.channels} ch ({raw_mb:.1f} MB float32), {args.iterations} iterations")
+    print(f"{'encoder':<16} {'ms/encode':>10} {'MB/s':>10} {'output KB':>10}")
+    for name, encode in cases:
+        seconds, size = _time(encode, source, args.iterations)
+        throughput = raw_mb / seconds if seconds else float("inf")
+        print(f"{name:<16} {seconds * 1000:>10.3f} {throughput:>10.0f} {size / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
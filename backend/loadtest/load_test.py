@@ -0,0 +1,200 @@
+"""
+Asyncio load generator for the DrumGen Scorer API.
+
+Drives send-prompt, model-testing samples and source-audio concurrently and
+reports p50/p95/p99 latency and requests/second per endpoint.
+
+Against a running backend (already pointed at the stand-ins):
+    python -m backend.loadtest.load_test --base-url http://127.0.0.1:8000
+
+In-process, without starting a backend (uses a temporary database and audio
+directory, and skips startup tasks such as backups and the model worker):
+    python -m backend.loadtest.stub_upstreams --port 9100 &
+    python -m backend.loadtest.load_test --in-process --upstream http://127.0.0.1:9100
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import httpx
+
+DRUM_TYPES = ["bass_drum", "snare", "low_tom", "mid_tom", "high_tom"]
+
+_counter = itertools.count()
+
+
+def _send_prompt() -> tuple[str, str, dict[str, Any]]:
+    # Unique text per call so single-flight de-duplication does not hide upstream cost.
+    return "POST", "/api/test/send-prompt", {"json": {"text": f"punchy rock kick #{next(_counter)}", "model_version": "v15"}}
+
+
+def _list_samples() -> tuple[str, str, dict[str, Any]]:
+    drum_type = DRUM_TYPES[next(_counter) % len(DRUM_TYPES)]
+    return "GET", "/api/model-testing/samples", {"params": {"drum_type": drum_type, "limit": 50}}
+
+
+def _source_audio() -> tuple[str, str, dict[str, Any]]:
+    index = next(_counter) % 500
+    return "GET", "/api/model-testing/source-audio", {
+        "params": {"dataset": "gold-db|acoustic_drums", "filename": f"gold-db_kick_{index:06d}.wav"}
+    }
+
+
+SCENARIOS: dict[str, Callable[[], tuple[str, str, dict[str, Any]]]] = {
+    "send_prompt": _send_prompt,
+    "list_samples": _list_samples,
+    "source_audio": _source_audio,
+}
+
+
+class EndpointStats:
+    def __init__(self) -> None:
+        self.latencies: list[float] = []
+        self.errors = 0
+        self.statuses: dict[int, int] = {}
+
+    def record(self, seconds: float, status_code: Optional[int]) -> None:
+        self.latencies.append(seconds)
+        if status_code is None or status_code >= 400:
+            self.errors += 1
+        if status_code is not None:
+            self.statuses[status_code] = self.statuses.get(status_code, 0) + 1
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100.0 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(stats: dict[str, EndpointStats], elapsed: float) -> dict[str, dict[str, Any]]:
+    report: dict[str, dict[str, Any]] = {}
+    for name, entry in stats.items():
+        ordered = sorted(entry.latencies)
+        report[name] = {
+            "requests": len(ordered),
+            "errors": entry.errors,
+            "rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(ordered, 50) * 1000, 1),
+            "p95_ms": round(percentile(ordered, 95) * 1000, 1),
+            "p99_ms": round(percentile(ordered, 99) * 1000, 1),
+            "statuses": dict(sorted(entry.statuses.items())),
+        }
+    return report
+
+
+def print_report(report: dict[str, dict[str, Any]], elapsed: float) -> None:
+    print(f"\nDuration: {elapsed:.1f}s")
+    print(f"{'endpoint':<14}{'requests':>10}{'errors':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, row in report.items():
+        print(
+            f"{name:<14}{row['requests']:>10}{row['errors']:>8}{row['rps']:>9}"
+            f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}"
+        )
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    scenarios: list[str],
+    concurrency: int,
+    duration: float,
+) -> tuple[dict[str, EndpointStats], float]:
+    stats = {name: EndpointStats() for name in scenarios}
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_index: int) -> None:
+        # Spread workers evenly over the selected scenarios.
+        name = scenarios[worker_index % len(scenarios)]
+        build = SCENARIOS[name]
+        while time.perf_counter() < deadline:
+            method, path, kwargs = build()
+            started = time.perf_counter()
+            status_code: Optional[int] = None
+            try:
+                response = await client.request(method, path, **kwargs)
+                await response.aread()
+                status_code = response.status_code
+            except httpx.HTTPError:
+                pass
+            stats[name].record(time.perf_counter() - started, status_code)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    return stats, time.perf_counter() - started
+
+
+async def _in_process_client(upstream: str, timeout: float) -> httpx.AsyncClient:
+    """Build a client that calls the FastAPI app directly, wired to the stand-ins."""
+    workdir = Path(tempfile.mkdtemp(prefix="drumgen-loadtest-"))
+    os.environ["DRUMGEN_BASE_URL"] = upstream
+    os.environ["ILLUGEN_BASE_URL"] = upstream
+    os.environ["DRUMGEN_DB_BASE_URL"] = upstream
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{workdir / 'loadtest.db'}"
+    os.environ.setdefault("WARM_POOL_ENABLED", "0")
+
+    # Imported late so the environment above is picked up at import time.
+    from backend import main
+    from backend.routers import model_testing, testing
+
+    audio_dir = workdir / "audio_files"
+    audio_dir.mkdir()
+    testing.AUDIO_DIR = audio_dir
+    model_testing.AUDIO_DIR = audio_dir
+    await main.init_models()
+    print(f"In-process backend using {workdir}")
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://loadtest", timeout=timeout)
+
+
+async def amain(args: argparse.Namespace) -> None:
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"Unknown scenario(s): {', '.join(unknown)}. Choose from: {', '.join(SCENARIOS)}")
+
+    if args.in_process:
+        client = await _in_process_client(args.upstream, args.timeout)
+    else:
+        client = httpx.AsyncClient(
+            base_url=args.base_url,
+            timeout=args.timeout,
+            limits=httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency),
+        )
+
+    async with client:
+        print(f"Running {', '.join(scenarios)} with {args.concurrency} workers for {args.duration:.0f}s...")
+        stats, elapsed = await run_load(client, scenarios, args.concurrency, args.duration)
+
+    report = summarize(stats, elapsed)
+    print_report(report, elapsed)
+    if args.json:
+        Path(args.json).write_text(json.dumps({"duration_s": elapsed, "endpoints": report}, indent=2), encoding="utf-8")
+        print(f"\nWrote {args.json}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--in-process", action="store_true", help="Drive the app via ASGI instead of over HTTP")
+    parser.add_argument("--upstream", default="http://127.0.0.1:9100", help="Stand-in server URL (--in-process only)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated subset of scenarios")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--json", default=None, help="Also write the report to this JSON file")
+    asyncio.run(amain(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
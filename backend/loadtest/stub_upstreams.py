@@ -0,0 +1,193 @@
+"""
+Local stand-ins for the Waves upstreams used by the backend, for load testing.
+
+One app serves all of them:
+- DrumGen:   POST /process_text, POST /generate, GET /audio/{audio_id}
+- Illugen:   POST /generate-demo, GET /illugen-files/{request_id}/{variation_id}.wav
+- gold-db / full-db: GET /{db}/api/samples, GET /{db}/api/proxy-audio
+
+Point the backend at it with:
+    DRUMGEN_BASE_URL=http://127.0.0.1:9100
+    ILLUGEN_BASE_URL=http://127.0.0.1:9100
+    DRUMGEN_DB_BASE_URL=http://127.0.0.1:9100
+
+Usage:
+    python -m backend.loadtest.stub_upstreams --port 9100 --latency-ms 300 --error-rate 0.02
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import struct
+from uuid import uuid4
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import Response
+
+
+class StubSettings:
+    latency_ms = 200.0
+    jitter_ms = 50.0
+    error_rate = 0.0
+    audio_bytes = 200_000
+    samples_per_kind = 1000
+    illugen_variations = 4
+
+
+settings = StubSettings()
+app = FastAPI(title="DrumGen upstream stand-ins")
+
+KINDS = ["Bass Drum", "Kick", "Snare", "Snare Piccolo", "Snare + Clap", "Low Tom", "Floor Tom", "Mid Tom", "High Tom", "Hi Tom"]
+VELOCITIES = ["soft", "medium", "hard", "quiet"]
+
+_audio_cache: dict[int, bytes] = {}
+
+
+def wav_payload(size: int) -> bytes:
+    """A valid 44.1 kHz stereo 16-bit WAV of roughly ``size`` bytes (cached per size)."""
+    cached = _audio_cache.get(size)
+    if cached is None:
+        data_size = max(size - 44, 4) // 4 * 4
+        header = b"RIFF" + struct.pack("<I", 36 + data_size) + b"WAVE"
+        header += b"fmt " + struct.pack("<IHHIIHH", 16, 1, 2, 44100, 44100 * 4, 4, 16)
+        header += b"data" + struct.pack("<I", data_size)
+        cached = _audio_cache[size] = header + random.randbytes(data_size)
+    return cached
+
+
+async def simulate_upstream() -> None:
+    """Sleep for the configured latency and fail a configured fraction of calls with 503."""
+    delay = settings.latency_ms + random.uniform(-settings.jitter_ms, settings.jitter_ms)
+    await asyncio.sleep(max(delay, 0.0) / 1000.0)
+    if random.random() < settings.error_rate:
+        raise HTTPException(status_code=503, detail="Simulated upstream failure")
+
+
+def audio_response() -> Response:
+    return Response(content=wav_payload(settings.audio_bytes), media_type="audio/wav")
+
+
+# DrumGen
+
+@app.post("/process_text")
+async def process_text(payload: dict) -> dict:
+    await simulate_upstream()
+    text = str(payload.get("text") or "")
+    return {
+        "success": True,
+        "controls": {"Kind": random.choice(KINDS), "Velocity": "hard", "Genres": ["Rock"]},
+        "llm_response": f"stub controls for: {text}",
+    }
+
+
+@app.post("/generate")
+async def generate(payload: dict) -> dict:
+    await simulate_upstream()
+    return {"success": True, "audio_id": str(uuid4())}
+
+
+@app.get("/audio/{audio_id}")
+async def audio(audio_id: str) -> Response:
+    await simulate_upstream()
+    return audio_response()
+
+
+# Illugen
+
+@app.post("/generate-demo")
+async def generate_demo(payload: dict, request: Request) -> dict:
+    await simulate_upstream()
+    request_id = str(uuid4())
+    base = str(request.base_url).rstrip("/")
+    return {
+        "requestId": request_id,
+        "title": str(payload.get("prompt") or "stub")[:40],
+        "sfxType": payload.get("sfxType", "one-shot"),
+        "variations": [
+            {
+                "variationId": f"{request_id}-{index}",
+                "orderIndex": index,
+                "url": f"{base}/illugen-files/{request_id}/{request_id}-{index}.wav",
+            }
+            for index in range(settings.illugen_variations)
+        ],
+    }
+
+
+@app.get("/illugen-files/{request_id}/{filename}")
+async def illugen_file(request_id: str, filename: str) -> Response:
+    await simulate_upstream()
+    return audio_response()
+
+
+# gold-db / full-db
+
+def _sample(db: str, kind: str, index: int) -> dict:
+    slug = kind.lower().replace(" ", "_").replace("+", "plus")
+    return {
+        "Filename": f"{db}_{slug}_{index:06d}.wav",
+        "Kind": kind,
+        "dataset": "acoustic_drums",
+        "_dataset": "electronic" if db == "full-db" and index % 5 == 0 else "acoustic",
+        "Velocity": VELOCITIES[index % len(VELOCITIES)],
+        "Genres": "Rock, Pop",
+        "Process": "",
+        "Free Tags": "stub",
+        "audio_url": f"/{db}/api/proxy-audio?filename={slug}_{index:06d}.wav",
+    }
+
+
+@app.get("/{db}/api/samples")
+async def samples(
+    db: str,
+    kind: str = Query(""),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(200, ge=1, le=1000),
+    dataset: str = Query("acoustic_drums"),
+) -> dict:
+    await simulate_upstream()
+    start = (page - 1) * per_page
+    end = min(start + per_page, settings.samples_per_kind)
+    return {
+        "samples": [_sample(db, kind, index) for index in range(start, end)],
+        "page": page,
+        "per_page": per_page,
+        "total": settings.samples_per_kind,
+    }
+
+
+@app.get("/{db}/api/proxy-audio")
+async def proxy_audio(db: str, dataset: str = Query(""), filename: str = Query("")) -> Response:
+    await simulate_upstream()
+    return audio_response()
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=settings.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=settings.jitter_ms)
+    parser.add_argument("--error-rate", type=float, default=settings.error_rate, help="Fraction of calls answered with 503")
+    parser.add_argument("--audio-bytes", type=int, default=settings.audio_bytes, help="Size of every served WAV")
+    parser.add_argument("--samples-per-kind", type=int, default=settings.samples_per_kind)
+    parser.add_argument("--illugen-variations", type=int, default=settings.illugen_variations)
+    args = parser.parse_args()
+
+    settings.latency_ms = args.latency_ms
+    settings.jitter_ms = args.jitter_ms
+    settings.error_rate = args.error_rate
+    settings.audio_bytes = args.audio_bytes
+    settings.samples_per_kind = args.samples_per_kind
+    settings.illugen_variations = args.illugen_variations
+
+    print(f"Upstream stand-ins running on http://{args.host}:{args.port}")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ from __future__ import annotations
 import asyncio
 import os
 from pathlib import Path
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -16,7 +16,17 @@ from sqlalchemy import text
 from backend.database import Base, engine, async_session_maker
 from backend.routers import prompts, results, testing, llm_failures, model_beta, model_testing
 from backend.services.audio_cleanup import cleanup_all_orphaned_audio
-from backend.services.model_worker_manager import ensure_model_worker_started, stop_model_worker
+from backend.services.batch_jobs import batch_jobs
+from backend.services.model_worker_manager import (
+    ensure_model_worker_started,
+    start_worker_monitor,
+    stop_model_worker,
+    stop_worker_monitor,
+    worker_pool_state,
+)
+from backend.services.upstream import upstream_state
+from backend.services.remote_samples import classify_drum_type, start_catalog_sync, stop_catalog_sync
+from backend.services.warm_pool import start_warm_pool, stop_warm_pool
 from backend.backup_service import start_backup_scheduler, stop_backup_scheduler
 
 
@@ -53,6 +63,7 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
         status_code=exc.status_code,
         content={"detail": exc.detail},
         headers={
+            **(exc.headers or {}),
             "Access-Control-Allow-Origin": "*",
             "Access-Control-Allow-Credentials": "true",
         }
@@ -121,11 +132,89 @@ async def init_models() -> None:
             await conn.execute(text("CREATE INDEX idx_llm_failures_drum_type ON llm_failures(drum_type)"))
             await conn.execute(text("CREATE INDEX idx_llm_failures_viewed ON llm_failures(viewed)"))
 
+        # Stored drum_type on model_test_results (backfilled from source_kind)
+        result = await conn.execute(text("PRAGMA table_info('model_test_results')"))
+        columns = [row[1] for row in result.fetchall()]
+        if "drum_type" not in columns:
+            await conn.execute(text("ALTER TABLE model_test_results ADD COLUMN drum_type VARCHAR"))
+            await conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_model_test_results_drum_type ON model_test_results(drum_type)"
+            ))
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_model_test_results_tested_at ON model_test_results(tested_at)"
+        ))
+        result = await conn.execute(text(
+            "SELECT DISTINCT source_kind FROM model_test_results WHERE drum_type IS NULL"
+        ))
+        for (source_kind,) in result.fetchall():
+            await conn.execute(
+                text(
+                    "UPDATE model_test_results SET drum_type = :drum_type "
+                    "WHERE drum_type IS NULL AND source_kind IS :source_kind"
+                ),
+                {"drum_type": classify_drum_type(source_kind), "source_kind": source_kind},
+            )
+
+        # Unique (source_dataset, source_filename) index on model_test_results, added after the table existed.
+        result = await conn.execute(text("""
+            SELECT name FROM sqlite_master
+            WHERE type='index' AND name='uq_model_test_results_source'
+        """))
+        if not result.scalar():
+            # The index needs one row per sample. The first score of a sample is kept; later
+            # scores of it (which may differ in score and notes) are copied to
+            # model_test_results_duplicates before they are removed.
+            duplicate_ids_sql = """
+                SELECT id FROM model_test_results
+                WHERE id NOT IN (
+                    SELECT MIN(id) FROM model_test_results GROUP BY source_dataset, source_filename
+                )
+            """
+
+            async def move_duplicates() -> None:
+                duplicate_ids = [row[0] for row in (await conn.execute(text(duplicate_ids_sql))).fetchall()]
+                if not duplicate_ids:
+                    return
+                await conn.execute(text(
+                    "CREATE TABLE IF NOT EXISTS model_test_results_duplicates AS "
+                    "SELECT * FROM model_test_results WHERE 0"
+                ))
+                await conn.execute(text(
+                    f"INSERT INTO model_test_results_duplicates SELECT * FROM model_test_results WHERE id IN ({duplicate_ids_sql})"
+                ))
+                await conn.execute(text(f"DELETE FROM model_test_results WHERE id IN ({duplicate_ids_sql})"))
+                print(
+                    f"⚠️ Moved {len(duplicate_ids)} repeat score(s) of already-scored samples to "
+                    f"model_test_results_duplicates (ids: {', '.join(map(str, duplicate_ids))})"
+                )
+
+            await move_duplicates()
+            # Pre-source-tagged gold-db rows stored the raw dataset; give them the "gold-db|" prefix
+            # unless the sample was already scored again under the new key.
+            await conn.execute(text("""
+                UPDATE model_test_results
+                SET source_dataset = 'gold-db|' || source_dataset
+                WHERE instr(source_dataset, '|') = 0
+                AND NOT EXISTS (
+                    SELECT 1 FROM model_test_results AS tagged
+                    WHERE tagged.source_dataset = 'gold-db|' || model_test_results.source_dataset
+                    AND tagged.source_filename = model_test_results.source_filename
+                )
+            """))
+            await move_duplicates()
+            await conn.execute(text(
+                "CREATE UNIQUE INDEX uq_model_test_results_source "
+                "ON model_test_results(source_dataset, source_filename)"
+            ))
+
 
 @app.on_event("startup")
 async def on_startup() -> None:
     await init_models()
     ensure_model_worker_started()
+    start_worker_monitor()
+    start_warm_pool()
+    start_catalog_sync()
     
     # Start backup service every 12 hours (43200 seconds)
     start_backup_scheduler(interval_seconds=43200)
@@ -140,7 +229,11 @@ async def on_startup() -> None:
 @app.on_event("shutdown")
 async def on_shutdown() -> None:
     stop_backup_scheduler()
+    await stop_worker_monitor()
     stop_model_worker()
+    await stop_warm_pool()
+    await stop_catalog_sync()
+    await batch_jobs.shutdown()
 
 
 # Routers
@@ -180,7 +273,13 @@ async def health_root() -> dict[str, str]:
 
 
 @app.get("/api/health")
-async def health_api() -> dict[str, str]:
-    # Mirror the root health endpoint for frontend/API checks
-    return {"status": "ok"}
+async def health_api() -> dict[str, Any]:
+    # Mirror the root health endpoint for frontend/API checks, plus model worker readiness
+    return {"status": "ok", "model_worker": worker_pool_state()}
+
+
 
+@app.get("/api/health/upstreams")
+async def health_upstreams() -> dict[str, Any]:
+    """Circuit breaker and concurrency state for each upstream contacted so far."""
+    return {"upstreams": upstream_state()}
@@ -1,18 +1,32 @@
 import argparse
+import asyncio
+import hashlib
+import inspect
 import io
 import json
+import math
 import os
+import queue
+import re
+import struct
 import sys
 import threading
-import wave
-from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from http import HTTPStatus
 from pathlib import Path
-from typing import Any, Dict, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Tuple
 from urllib.parse import urlparse
 import uuid
 
 import numpy as np
 
+try:
+    import soundfile  # type: ignore
+except ImportError:  # FLAC output is optional
+    soundfile = None
+
 
 def resolve_model_root() -> Path:
     env_root = os.getenv("DRUMGEN_MODEL_ROOT")
@@ -21,23 +35,99 @@ def resolve_model_root() -> Path:
     return Path.home() / "Desktop" / "V18_Acoustic+Electronic"
 
 
-def to_wav_bytes(audio: np.ndarray, sample_rate: int) -> bytes:
-    if audio.ndim == 1:
-        channels = 1
-    else:
-        channels = audio.shape[1]
+DEFAULT_OUTPUT_FORMAT = "pcm16"
+AUDIO_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# RIFF/WAVE header: RIFF chunk, 16-byte fmt chunk, data chunk header.
+_WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+_WAVE_FORMAT_PCM = 1
+_WAVE_FORMAT_IEEE_FLOAT = 3
+
+
+class EncodedAudio:
+    """An encoded file as a header plus a view of the sample buffer, written out without joining them."""
+
+    __slots__ = ("header", "data", "content_type")
+
+    def __init__(self, header: bytes, data: memoryview, content_type: str) -> None:
+        self.header = header
+        self.data = data
+        self.content_type = content_type
+
+    def __len__(self) -> int:
+        return len(self.header) + self.data.nbytes
+
+    def chunks(self) -> Tuple[bytes, memoryview]:
+        return self.header, self.data
+
+    def tobytes(self) -> bytes:
+        return self.header + self.data.tobytes()
+
+
+def _wav_header(sample_rate: int, channels: int, bits: int, data_bytes: int, format_tag: int) -> bytes:
+    block_align = channels * bits // 8
+    return _WAV_HEADER.pack(
+        b"RIFF", 36 + data_bytes, b"WAVE",
+        b"fmt ", 16, format_tag, channels, sample_rate, sample_rate * block_align, block_align, bits,
+        b"data", data_bytes,
+    )
+
+
+def _clipped(audio: np.ndarray) -> np.ndarray:
+    """float32 C-contiguous samples clipped to [-1, 1]; float32 synth output is clipped in place."""
+    samples = np.ascontiguousarray(audio, dtype=np.float32)
+    np.clip(samples, -1.0, 1.0, out=samples)
+    return samples
+
+
+def _encode_pcm16(samples: np.ndarray, sample_rate: int, channels: int) -> EncodedAudio:
+    np.multiply(samples, 32767.0, out=samples)
+    data = memoryview(samples.astype("<i2")).cast("B")
+    return EncodedAudio(_wav_header(sample_rate, channels, 16, data.nbytes, _WAVE_FORMAT_PCM), data, "audio/wav")
+
+
+def _encode_pcm24(samples: np.ndarray, sample_rate: int, channels: int) -> EncodedAudio:
+    np.multiply(samples, 8388607.0, out=samples)
+    # Low three bytes of each little-endian int32, copied column by column (much faster than one strided copy).
+    source = samples.astype("<i4").view(np.uint8).reshape(-1, 4)
+    packed = np.empty((source.shape[0], 3), dtype=np.uint8)
+    for byte in range(3):
+        packed[:, byte] = source[:, byte]
+    data = memoryview(packed).cast("B")
+    return EncodedAudio(_wav_header(sample_rate, channels, 24, data.nbytes, _WAVE_FORMAT_PCM), data, "audio/wav")
+
+
+def _encode_float32(samples: np.ndarray, sample_rate: int, channels: int) -> EncodedAudio:
+    data = memoryview(samples.astype("<f4", copy=False)).cast("B")
+    return EncodedAudio(
+        _wav_header(sample_rate, channels, 32, data.nbytes, _WAVE_FORMAT_IEEE_FLOAT), data, "audio/wav"
+    )
+
+
+def _encode_flac(samples: np.ndarray, sample_rate: int, channels: int) -> EncodedAudio:
+    if soundfile is None:
+        raise RuntimeError("FLAC output needs the soundfile package")
+    buffer = io.BytesIO()
+    soundfile.write(buffer, samples, sample_rate, format="FLAC", subtype="PCM_24")
+    return EncodedAudio(b"", buffer.getbuffer(), "audio/flac")
+
 
-    audio = np.asarray(audio, dtype=np.float32)
-    audio = np.clip(audio, -1.0, 1.0)
-    audio_int16 = (audio * 32767.0).astype(np.int16)
+OUTPUT_ENCODERS = {
+    "pcm16": _encode_pcm16,
+    "pcm24": _encode_pcm24,
+    "float32": _encode_float32,
+    "flac": _encode_flac,
+}
 
-    with io.BytesIO() as buffer:
-        with wave.open(buffer, "wb") as wav_file:
-            wav_file.setnchannels(channels)
-            wav_file.setsampwidth(2)
-            wav_file.setframerate(sample_rate)
-            wav_file.writeframes(audio_int16.tobytes())
-        return buffer.getvalue()
+
+def available_output_formats() -> list[str]:
+    return [name for name in OUTPUT_ENCODERS if name != "flac" or soundfile is not None]
+
+
+def encode_audio(audio: np.ndarray, sample_rate: int, output_format: str = DEFAULT_OUTPUT_FORMAT) -> EncodedAudio:
+    """Encode synth output (frames x channels, or mono). float32 input is used as scratch space."""
+    channels = 1 if audio.ndim == 1 else audio.shape[1]
+    return OUTPUT_ENCODERS[output_format](_clipped(audio), sample_rate, channels)
 
 
 def compute_condition(condition_zero: np.ndarray, slider_values: np.ndarray) -> np.ndarray:
@@ -48,11 +138,316 @@ def compute_condition(condition_zero: np.ndarray, slider_values: np.ndarray) ->
     return condition
 
 
+def _number(value: Any, name: str, cast: Callable[[Any], Any]) -> Any:
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise TypeError(f"{name} must be a number")
+    try:
+        number = cast(value)
+    except ValueError as exc:
+        raise ValueError(f"{name} must be a number") from exc
+    if isinstance(number, float) and not np.isfinite(number):
+        raise ValueError(f"{name} must be finite")
+    return number
+
+
+# Held around every synthesis: numpy's global RNG is shared by the whole process.
+_GLOBAL_RNG_LOCK = threading.Lock()
+
+
+@contextmanager
+def seeded_noise(seed: int | None) -> Iterator[None]:
+    """Run one synthesis with numpy's global RNG seeded (if ``seed`` is set), then restore it.
+
+    DrumSynthONNX takes no generator argument and draws its noise from
+    ``np.random``. The lock keeps another synthesis from drawing from (or
+    reseeding) that RNG in the middle of a seeded one; ModelState.check_seeding
+    verifies at startup that a seed actually reproduces the audio.
+    """
+    with _GLOBAL_RNG_LOCK:
+        if seed is None:
+            yield
+            return
+        saved = np.random.get_state()
+        np.random.seed(seed % 2**32)
+        try:
+            yield
+        finally:
+            np.random.set_state(saved)
+
+
+class AudioResultCache:
+    """LRU cache of encoded audio for seeded (deterministic) requests.
+
+    Up to ``max_memory_bytes`` are kept in memory. Entries evicted from memory
+    spill to ``spill_dir`` (capped at ``max_disk_bytes``, least recently used
+    files removed first) and move back into memory on their next hit.
+    """
+
+    def __init__(self, max_memory_bytes: int, spill_dir: Path | None, max_disk_bytes: int) -> None:
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes if spill_dir is not None else 0
+        self.spill_dir = spill_dir
+        self.memory: "OrderedDict[str, Tuple[EncodedAudio, int]]" = OrderedDict()
+        self.memory_bytes = 0
+        # key -> (path, size), least recently used first.
+        self.disk: "OrderedDict[str, Tuple[Path, int]]" = OrderedDict()
+        self.disk_bytes = 0
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+        if self.spill_dir is not None and self.max_disk_bytes > 0:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            files = sorted(self.spill_dir.glob("*.*.*"), key=lambda path: path.stat().st_mtime)
+            for path in files:
+                size = path.stat().st_size
+                self.disk[path.name.split(".", 1)[0]] = (path, size)
+                self.disk_bytes += size
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_memory_bytes > 0 or self.max_disk_bytes > 0
+
+    def get(self, key: str) -> Tuple[EncodedAudio, int] | None:
+        """Look up ``key``; may read a spilled file, so call it off the event loop."""
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                self.memory.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry
+            spilled = self.disk.pop(key, None)
+            if spilled is None:
+                self.stats["misses"] += 1
+                return None
+            path, size = spilled
+            self.disk_bytes -= size
+        # File I/O happens outside the lock so memory hits on other threads are not held up.
+        try:
+            _key, sample_rate, extension = path.name.split(".")
+            content_type = "audio/flac" if extension == "flac" else "audio/wav"
+            entry = (EncodedAudio(b"", memoryview(path.read_bytes()), content_type), int(sample_rate))
+        except (OSError, ValueError):
+            with self.lock:
+                self.stats["misses"] += 1
+            return None
+        finally:
+            path.unlink(missing_ok=True)
+        with self.lock:
+            self.stats["disk_hits"] += 1
+            evicted = self._put_memory(key, entry)
+        self._spill_all(evicted)
+        return entry
+
+    def put(self, key: str, audio: EncodedAudio, sample_rate: int) -> None:
+        """Store an entry; may spill evicted entries to disk, so call it off the event loop."""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.stats["stores"] += 1
+            evicted = self._put_memory(key, (audio, sample_rate))
+        self._spill_all(evicted)
+
+    def _put_memory(self, key: str, entry: Tuple[EncodedAudio, int]) -> List[Tuple[str, Tuple[EncodedAudio, int]]]:
+        """Insert under the lock; returns the entries evicted from memory, for spilling."""
+        previous = self.memory.pop(key, None)
+        if previous is not None:
+            self.memory_bytes -= len(previous[0])
+        self.memory[key] = entry
+        self.memory_bytes += len(entry[0])
+        evicted = []
+        while self.memory_bytes > self.max_memory_bytes and self.memory:
+            old_key, old_entry = self.memory.popitem(last=False)
+            self.memory_bytes -= len(old_entry[0])
+            evicted.append((old_key, old_entry))
+        return evicted
+
+    def _spill_all(self, evicted: List[Tuple[str, Tuple[EncodedAudio, int]]]) -> None:
+        for key, entry in evicted:
+            self._spill(key, entry)
+
+    def _spill(self, key: str, entry: Tuple[EncodedAudio, int]) -> None:
+        audio, sample_rate = entry
+        if self.spill_dir is None or len(audio) > self.max_disk_bytes:
+            return
+        extension = "flac" if audio.content_type == "audio/flac" else "wav"
+        path = self.spill_dir / f"{key}.{sample_rate}.{extension}"
+        tmp_path = self.spill_dir / f".{key}.{threading.get_ident()}.tmp"
+        try:
+            with tmp_path.open("wb") as handle:
+                for chunk in audio.chunks():
+                    handle.write(chunk)
+            os.replace(tmp_path, path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            return
+        removed = []
+        with self.lock:
+            previous = self.disk.pop(key, None)
+            if previous is not None:
+                self.disk_bytes -= previous[1]
+            self.disk[key] = (path, len(audio))
+            self.disk_bytes += len(audio)
+            while self.disk_bytes > self.max_disk_bytes and self.disk:
+                _old_key, (old_path, old_size) = self.disk.popitem(last=False)
+                self.disk_bytes -= old_size
+                removed.append(old_path)
+        for old_path in removed:
+            old_path.unlink(missing_ok=True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "memory_entries": len(self.memory),
+                "memory_bytes": self.memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "disk_entries": len(self.disk),
+                "disk_bytes": self.disk_bytes,
+                "max_disk_bytes": self.max_disk_bytes,
+                **self.stats,
+            }
+
+
+class WorkerMetrics:
+    """Stage-latency histograms and request counters, rendered in Prometheus text format.
+
+    Stages: queue (waiting for the model thread), parse, lock, condition
+    (condition cache / predict_condition), synth_base and synth_sliders (the two
+    synthesis passes, per batch), encode, cache (result cache lookup), store
+    (direct-to-store write) and total (whole /generate request).
+    """
+
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.stage_buckets: Dict[str, list[int]] = {}
+            self.stage_sum: Dict[str, float] = {}
+            self.stage_count: Dict[str, int] = {}
+            self.requests: Dict[Tuple[str, int], int] = {}
+
+    def observe_stage(self, stage: str, seconds: float) -> None:
+        with self.lock:
+            buckets = self.stage_buckets.setdefault(stage, [0] * len(self.BUCKETS))
+            for position, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    buckets[position] += 1
+                    break
+            self.stage_sum[stage] = self.stage_sum.get(stage, 0.0) + seconds
+            self.stage_count[stage] = self.stage_count.get(stage, 0) + 1
+
+    def count_request(self, path: str, status: int) -> None:
+        with self.lock:
+            self.requests[(path, status)] = self.requests.get((path, status), 0) + 1
+
+    def render(self, counters: Dict[str, Tuple[str, float]], gauges: Dict[str, Tuple[str, float]]) -> str:
+        lines = [
+            "# HELP model_worker_stage_seconds Time spent per generation stage.",
+            "# TYPE model_worker_stage_seconds histogram",
+        ]
+        with self.lock:
+            for stage in sorted(self.stage_count):
+                cumulative = 0
+                for bound, count in zip(self.BUCKETS, self.stage_buckets[stage]):
+                    cumulative += count
+                    lines.append(f'model_worker_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'model_worker_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {self.stage_count[stage]}')
+                lines.append(f'model_worker_stage_seconds_sum{{stage="{stage}"}} {self.stage_sum[stage]:.6f}')
+                lines.append(f'model_worker_stage_seconds_count{{stage="{stage}"}} {self.stage_count[stage]}')
+            lines.append("# HELP model_worker_requests_total HTTP requests by path and status.")
+            lines.append("# TYPE model_worker_requests_total counter")
+            for (path, status), count in sorted(self.requests.items()):
+                lines.append(f'model_worker_requests_total{{path="{path}",status="{status}"}} {count}')
+        for kind, values in (("counter", counters), ("gauge", gauges)):
+            for name, (help_text, value) in values.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = WorkerMetrics()
+
+
+def server_timing(timings: Dict[str, float]) -> str:
+    return ", ".join(f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in timings.items())
+
+
+GRAPH_OPTIMIZATION_LEVELS = {
+    "disable": "ORT_DISABLE_ALL",
+    "basic": "ORT_ENABLE_BASIC",
+    "extended": "ORT_ENABLE_EXTENDED",
+    "all": "ORT_ENABLE_ALL",
+}
+EXECUTION_MODES = {"sequential": "ORT_SEQUENTIAL", "parallel": "ORT_PARALLEL"}
+
+
+def build_session_options(
+    intra_op_threads: int,
+    inter_op_threads: int,
+    graph_optimization: str,
+    execution_mode: str,
+) -> Any:
+    """onnxruntime.SessionOptions from the CLI settings (0 threads keeps the runtime default)."""
+    try:
+        import onnxruntime as ort  # type: ignore
+    except ImportError:
+        print("Warning: onnxruntime is not importable here; ONNX session tuning skipped")
+        return None
+    options = ort.SessionOptions()
+    if intra_op_threads > 0:
+        options.intra_op_num_threads = intra_op_threads
+    if inter_op_threads > 0:
+        options.inter_op_num_threads = inter_op_threads
+    options.graph_optimization_level = getattr(ort.GraphOptimizationLevel, GRAPH_OPTIMIZATION_LEVELS[graph_optimization])
+    options.execution_mode = getattr(ort.ExecutionMode, EXECUTION_MODES[execution_mode])
+    return options
+
+
+def build_synth(synth_cls: Any, onnx_dir: Path, session_options: Any) -> Any:
+    """Construct the synth with ``session_options``.
+
+    Synth builds whose constructor takes ``session_options`` get them directly.
+    Otherwise every InferenceSession attribute of the built synth is reopened
+    from its model file with the options and the same providers.
+    """
+    if session_options is None:
+        return synth_cls(onnx_dir=str(onnx_dir))
+    if "session_options" in inspect.signature(synth_cls).parameters:
+        return synth_cls(onnx_dir=str(onnx_dir), session_options=session_options)
+
+    import onnxruntime as ort  # type: ignore
+
+    synth = synth_cls(onnx_dir=str(onnx_dir))
+    reopened = []
+    for name, value in list(vars(synth).items()):
+        model_path = getattr(value, "_model_path", None) if isinstance(value, ort.InferenceSession) else None
+        if model_path:
+            setattr(
+                synth,
+                name,
+                ort.InferenceSession(model_path, sess_options=session_options, providers=value.get_providers()),
+            )
+            reopened.append(name)
+    print(f"Applied ONNX session options to: {', '.join(reopened) or 'no sessions found'}")
+    return synth
+
+
 FALLBACK_CONDITIONING_PARAMS = ["duration", "pitch", "brightness", "texture", "punch"]
 
 
 class ModelState:
-    def __init__(self, model_root: Path, onnx_dir: Path) -> None:
+    def __init__(
+        self,
+        model_root: Path,
+        onnx_dir: Path,
+        condition_cache_size: int = 256,
+        audio_cache: AudioResultCache | None = None,
+        session_options: Any = None,
+    ) -> None:
+        started = time.perf_counter()
         sys.path.insert(0, str(model_root))
 
         from drum_synth_onnx import DrumSynthONNX  # type: ignore
@@ -63,8 +458,23 @@ class ModelState:
         except Exception:
             print("Warning: could not import conditioning module, using fallback params")
             self.conditioning_params = list(FALLBACK_CONDITIONING_PARAMS)
-        self.synth = DrumSynthONNX(onnx_dir=str(onnx_dir))
+        self.synth = build_synth(DrumSynthONNX, onnx_dir, session_options)
+        self.startup: Dict[str, Any] = {"model_load_seconds": round(time.perf_counter() - started, 3)}
         self.lock = threading.Lock()
+        # (labels, temperature, width) -> (condition_zero, noise_source), most recently used last.
+        self.condition_cache: "OrderedDict[str, Tuple[np.ndarray, Any]]" = OrderedDict()
+        self.condition_cache_size = condition_cache_size
+        self.condition_stats = {"hits": 0, "misses": 0, "predicted": 0}
+        self.audio_cache = audio_cache or AudioResultCache(0, None, 0)
+        # Seeded results are cached as deterministic until check_seeding shows otherwise.
+        self.seeding_reproducible = True
+        # Cached audio is only valid for the model files it was generated with.
+        fingerprint = hashlib.sha256(str(onnx_dir.resolve()).encode("utf-8"))
+        for path in sorted(onnx_dir.rglob("*")):
+            if path.is_file():
+                stat = path.stat()
+                fingerprint.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+        self.model_fingerprint = fingerprint.hexdigest()[:16]
 
         label_dict_path = onnx_dir / "label_dictionaries.json"
         with label_dict_path.open("r", encoding="utf-8") as handle:
@@ -76,120 +486,732 @@ class ModelState:
             "dataset_type": schema.get("dataset_type", "unknown"),
         }
 
-    def generate(self, payload: Dict[str, Any]) -> Tuple[bytes, int]:
+    def validate(self, payload: Dict[str, Any]) -> None:
+        """Raise ValueError/TypeError for a payload /generate should reject with 400."""
+        self._parse(payload)
+
+    def _parse(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         labels = payload.get("labels") or {}
+        if not isinstance(labels, dict):
+            raise TypeError("labels must be an object")
+        for name, value in labels.items():
+            values = value if isinstance(value, list) else [value]
+            if not all(item is None or isinstance(item, (str, int, float)) for item in values):
+                raise TypeError(f"labels.{name} must be a string, a number or a list of them")
         sliders = payload.get("sliders") or {}
-        temperature = float(payload.get("temperature", 1.0))
-        width = float(payload.get("width", 0.5))
-
+        if not isinstance(sliders, dict):
+            raise TypeError("sliders must be an object")
         slider_values = np.array(
-            [float(sliders.get(name, 0.0)) for name in self.conditioning_params],
+            [_number(sliders.get(name, 0.0), f"sliders.{name}", float) for name in self.conditioning_params],
             dtype=np.float32,
         )
         slider_values = np.clip(slider_values, -1.0, 1.0)
-        use_base_audio = np.all(np.isclose(slider_values, 0.0))
+        temperature = _number(payload.get("temperature", 1.0), "temperature", float)
+        width = _number(payload.get("width", 0.5), "width", float)
+        seed = payload.get("seed")
+        seed = None if seed is None else _number(seed, "seed", int)
+        output_format = str(payload.get("format") or DEFAULT_OUTPUT_FORMAT)
+        if output_format not in available_output_formats():
+            raise ValueError(f"Unsupported format {output_format!r}; available: {', '.join(available_output_formats())}")
+        return {
+            "labels": labels,
+            "slider_values": slider_values,
+            "temperature": temperature,
+            "width": width,
+            "seed": seed,
+            "format": output_format,
+            "use_base_audio": bool(np.all(np.isclose(slider_values, 0.0))),
+            # Slider requests with the same cache_key share condition_zero and noise.
+            "cache_key": json.dumps([labels, temperature, width, seed], sort_keys=True),
+        }
 
-        with self.lock:
-            mel, audio_base, latent, condition_zero, noise_source = self.synth.generate_drum_stereo(
-                condition=None,
-                latent=None,
-                text=labels,
-                temperature=temperature,
-                width=width,
-                noise_source=None,
-            )
+    def result_key(self, payload: Dict[str, Any]) -> str | None:
+        """Audio cache key for a seeded request; unseeded requests are never cached."""
+        if not self.seeding_reproducible:
+            return None
+        try:
+            request = self._parse(payload)
+        except Exception:  # noqa: BLE001
+            return None
+        if request["seed"] is None:
+            return None
+        canonical = json.dumps(
+            [
+                self.model_fingerprint,
+                request["labels"],
+                [round(float(value), 6) for value in request["slider_values"]],
+                request["temperature"],
+                request["width"],
+                request["seed"],
+                request["format"],
+            ],
+            sort_keys=True,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
 
-            if condition_zero is None:
-                condition_zero = np.zeros(len(self.conditioning_params), dtype=np.float32)
-            else:
-                condition_zero = np.asarray(condition_zero, dtype=np.float32)
+    def _synthesize(self, requests: list[Dict[str, Any]], conditions: list[Any], noise_sources: list[Any]) -> list[tuple]:
+        """One generate_drum_stereo pass over several requests.
 
-            if use_base_audio:
-                audio = audio_base
-            else:
-                condition = compute_condition(condition_zero, slider_values)
-                mel, audio, latent, condition_zero, noise_source = self.synth.generate_drum_stereo(
+        DrumSynthONNX has no batched entry point, so the requests run back to
+        back under the caller's single lock acquisition; a micro-batch saves
+        lock handoffs and condition work, not inference time.
+        """
+        outputs: list[tuple] = []
+        for request, condition, noise_source in zip(requests, conditions, noise_sources):
+            with seeded_noise(request["seed"]):
+                output = self.synth.generate_drum_stereo(
                     condition=condition,
                     latent=None,
-                    text=labels,
-                    temperature=temperature,
-                    width=width,
+                    text=request["labels"],
+                    temperature=request["temperature"],
+                    width=request["width"],
                     noise_source=noise_source,
                 )
+            outputs.append(output)
+        return outputs
 
-        wav_bytes = to_wav_bytes(audio, self.synth.fs)
-        return wav_bytes, self.synth.fs
+    def _cached_condition(self, key: str) -> Tuple[np.ndarray, Any] | None:
+        entry = self.condition_cache.get(key)
+        if entry is None:
+            self.condition_stats["misses"] += 1
+            return None
+        self.condition_cache.move_to_end(key)
+        self.condition_stats["hits"] += 1
+        return entry
 
+    def _remember_condition(self, key: str, condition_zero: np.ndarray, noise_source: Any) -> None:
+        if self.condition_cache_size <= 0:
+            return
+        self.condition_cache[key] = (condition_zero, noise_source)
+        self.condition_cache.move_to_end(key)
+        while len(self.condition_cache) > self.condition_cache_size:
+            self.condition_cache.popitem(last=False)
 
-class ModelBetaHandler(BaseHTTPRequestHandler):
-    state: ModelState
+    def _condition_zero(self, value: Any) -> np.ndarray:
+        if value is None:
+            return np.zeros(len(self.conditioning_params), dtype=np.float32)
+        return np.asarray(value, dtype=np.float32)
 
-    def log_message(self, format: str, *args: Any) -> None:
-        return
+    def _predict_condition_zero(self, request: Dict[str, Any]) -> np.ndarray | None:
+        """Condition-only prediction, for synth builds that provide predict_condition(text=...)."""
+        predict = getattr(self.synth, "predict_condition", None)
+        if predict is None:
+            return None
+        self.condition_stats["predicted"] += 1
+        return self._condition_zero(predict(text=request["labels"]))
 
-    def _set_headers(self, status: int, content_type: str | None, extra: Dict[str, str] | None = None) -> None:
-        self.send_response(status)
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "GET,POST,OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
-        if content_type:
-            self.send_header("Content-Type", content_type)
-        if extra:
-            for key, value in extra.items():
-                self.send_header(key, value)
-        self.end_headers()
-
-    def do_OPTIONS(self) -> None:
-        self._set_headers(204, None)
-
-    def do_GET(self) -> None:
-        path = urlparse(self.path).path
-        if path == "/health":
-            self._set_headers(200, "application/json")
-            self.wfile.write(json.dumps({"status": "ok"}).encode("utf-8"))
-            return
+    def generate_batch(
+        self,
+        payloads: list[Dict[str, Any]],
+        timings: list[Dict[str, float]] | None = None,
+    ) -> list[Tuple[EncodedAudio, int] | Exception]:
+        """Generate several requests together; failures are returned per request.
 
-        if path == "/schema":
-            payload = {
-                "conditioning_params": self.state.conditioning_params,
-                "label_schema": self.state.label_schema,
-            }
-            self._set_headers(200, "application/json")
-            self.wfile.write(json.dumps(payload).encode("utf-8"))
-            return
+        Slider requests need the unconditioned condition_zero and noise of their
+        labels. Those come from the condition cache, from predict_condition, or
+        as a last resort from a full unconditioned pass. Stage durations are
+        added to ``timings`` (one dict per payload); batch-wide stages count
+        for every request in the batch.
+        """
+        timings = timings if timings is not None else [{} for _ in payloads]
+        results: list[Tuple[EncodedAudio, int] | Exception] = [RuntimeError("not generated")] * len(payloads)
+        parsed: list[tuple[int, Dict[str, Any]]] = []
 
-        self._set_headers(404, "application/json")
-        self.wfile.write(json.dumps({"detail": "Not found"}).encode("utf-8"))
+        def record(stage: str, started: float) -> None:
+            elapsed = time.perf_counter() - started
+            METRICS.observe_stage(stage, elapsed)
+            for index, _request in parsed:
+                timings[index][stage] = timings[index].get(stage, 0.0) + elapsed
 
-    def do_POST(self) -> None:
-        path = urlparse(self.path).path
-        if path != "/generate":
-            self._set_headers(404, "application/json")
-            self.wfile.write(json.dumps({"detail": "Not found"}).encode("utf-8"))
-            return
+        started = time.perf_counter()
+        for index, payload in enumerate(payloads):
+            try:
+                parsed.append((index, self._parse(payload)))
+            except Exception as exc:  # noqa: BLE001
+                results[index] = exc
+        if not parsed:
+            return results
+        record("parse", started)
 
-        content_length = int(self.headers.get("Content-Length", "0"))
-        raw = self.rfile.read(content_length) if content_length > 0 else b"{}"
+        requests = [request for _index, request in parsed]
+        audios: list[Any] = [None] * len(requests)
         try:
-            payload = json.loads(raw.decode("utf-8"))
-        except json.JSONDecodeError:
-            self._set_headers(400, "application/json")
-            self.wfile.write(json.dumps({"detail": "Invalid JSON"}).encode("utf-8"))
-            return
+            started = time.perf_counter()
+            with self.lock:
+                record("lock", started)
+                started = time.perf_counter()
+                conditioned = [position for position, request in enumerate(requests) if not request["use_base_audio"]]
+                unconditioned_pass = [position for position, request in enumerate(requests) if request["use_base_audio"]]
+                condition_zeros: Dict[int, np.ndarray] = {}
+                noise_sources: Dict[int, Any] = {}
+                for position in conditioned:
+                    cached = self._cached_condition(requests[position]["cache_key"])
+                    if cached is None:
+                        predicted = self._predict_condition_zero(requests[position])
+                        if predicted is None:
+                            unconditioned_pass.append(position)
+                            continue
+                        cached = (predicted, None)
+                    condition_zeros[position], noise_sources[position] = cached
+                record("condition", started)
 
-        try:
-            wav_bytes, sample_rate = self.state.generate(payload)
+                # Pass 1: base audio, plus condition_zero / noise for slider requests with nothing cached.
+                if unconditioned_pass:
+                    started = time.perf_counter()
+                    first = self._synthesize(
+                        [requests[position] for position in unconditioned_pass],
+                        [None] * len(unconditioned_pass),
+                        [None] * len(unconditioned_pass),
+                    )
+                    for position, output in zip(unconditioned_pass, first):
+                        condition_zero = self._condition_zero(output[3])
+                        self._remember_condition(requests[position]["cache_key"], condition_zero, output[4])
+                        if requests[position]["use_base_audio"]:
+                            audios[position] = output[1]
+                        else:
+                            condition_zeros[position], noise_sources[position] = condition_zero, output[4]
+                    record("synth_base", started)
+
+                # Pass 2: slider requests, conditioned on their labels' noise.
+                if conditioned:
+                    started = time.perf_counter()
+                    second = self._synthesize(
+                        [requests[position] for position in conditioned],
+                        [
+                            compute_condition(condition_zeros[position], requests[position]["slider_values"])
+                            for position in conditioned
+                        ],
+                        [noise_sources[position] for position in conditioned],
+                    )
+                    for position, output in zip(conditioned, second):
+                        audios[position] = output[1]
+                        if noise_sources[position] is None:
+                            # Predicted condition: keep the noise this synthesis drew for later slider tweaks.
+                            self._remember_condition(requests[position]["cache_key"], condition_zeros[position], output[4])
+                    record("synth_sliders", started)
         except Exception as exc:  # noqa: BLE001
-            self._set_headers(500, "application/json")
-            self.wfile.write(json.dumps({"detail": str(exc)}).encode("utf-8"))
+            for index, _request in parsed:
+                results[index] = exc
+            return results
+
+        for (index, request), audio in zip(parsed, audios):
+            started = time.perf_counter()
+            try:
+                results[index] = (encode_audio(audio, self.synth.fs, request["format"]), self.synth.fs)
+            except Exception as exc:  # noqa: BLE001
+                results[index] = exc
+            elapsed = time.perf_counter() - started
+            METRICS.observe_stage("encode", elapsed)
+            timings[index]["encode"] = elapsed
+        return results
+
+    def warm_up(self, runs: int) -> None:
+        """Run unconditioned and slider generations so the first real request doesn't pay for lazy init."""
+        warmup_payloads = [
+            {"labels": {}, "sliders": {}},
+            {"labels": {}, "sliders": {name: 0.5 for name in self.conditioning_params[:1]}},
+        ]
+        durations = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            for result in self.generate_batch(warmup_payloads):
+                if isinstance(result, Exception):
+                    print(f"Warning: warm-up generation failed: {result}")
+            durations.append(round(time.perf_counter() - started, 3))
+        self.condition_cache.clear()
+        self.condition_stats = {"hits": 0, "misses": 0, "predicted": 0}
+        METRICS.reset()
+        self.startup["warmup_seconds"] = durations
+
+    def check_seeding(self) -> bool:
+        """Generate one seeded request twice and compare the audio.
+
+        If the synth's noise does not come from the global RNG the seed has no
+        effect, so seeded results stop being cached (they would replay one
+        random take for every later request with that seed).
+        """
+        payload = {"labels": {}, "sliders": {}, "seed": 1}
+        first = self.generate_batch([payload])[0]
+        second = self.generate_batch([payload])[0]
+        self.seeding_reproducible = not isinstance(first, Exception) and not isinstance(second, Exception) and (
+            first[0].tobytes() == second[0].tobytes()
+        )
+        self.startup["seeding_reproducible"] = self.seeding_reproducible
+        return self.seeding_reproducible
+
+    def condition_cache_stats(self) -> Dict[str, Any]:
+        return {"entries": len(self.condition_cache), "max_entries": self.condition_cache_size, **self.condition_stats}
+
+    def generate(self, payload: Dict[str, Any]) -> Tuple[bytes, int]:
+        result = self.generate_batch([payload])[0]
+        if isinstance(result, Exception):
+            raise result
+        encoded, sample_rate = result
+        return encoded.tobytes(), sample_rate
+
+
+class _PendingGeneration:
+    def __init__(
+        self,
+        payload: Dict[str, Any],
+        future: "asyncio.Future[Tuple[EncodedAudio, int]]",
+        timings: Dict[str, float],
+    ) -> None:
+        self.payload = payload
+        self.future = future
+        self.loop = future.get_loop()
+        self.timings = timings
+        self.enqueued_at = time.perf_counter()
+
+    def resolve(self, result: Tuple[EncodedAudio, int] | Exception) -> None:
+        self.loop.call_soon_threadsafe(self._settle, result)
+
+    def _settle(self, result: Tuple[EncodedAudio, int] | Exception) -> None:
+        if self.future.done():
             return
+        if isinstance(result, Exception):
+            self.future.set_exception(result)
+        else:
+            self.future.set_result(result)
+
+
+class GenerationBatcher:
+    """Runs queued /generate calls on the model thread, in micro-batches for ModelState.generate_batch.
+
+    Whatever is already queued is always taken. The batcher only waits up to
+    ``max_wait_ms`` for more requests when the previous batch held more than
+    one request, so an idle worker serves a lone request immediately.
+    """
+
+    def __init__(self, state: ModelState, max_batch: int, max_wait_ms: float) -> None:
+        self.state = state
+        self.max_batch = max(max_batch, 1)
+        self.max_wait = max(max_wait_ms, 0.0) / 1000.0
+        self.queue: "queue.Queue[_PendingGeneration]" = queue.Queue()
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+        self.busy_seconds = 0.0
+        self.failed = 0
+        self._last_batch_size = 1
+        threading.Thread(target=self._run, name="generation-batcher", daemon=True).start()
+
+    async def submit(self, payload: Dict[str, Any], timings: Dict[str, float] | None = None) -> Tuple[EncodedAudio, int]:
+        """Queue one generation; stage durations are added to ``timings`` before this returns."""
+        future: "asyncio.Future[Tuple[EncodedAudio, int]]" = asyncio.get_running_loop().create_future()
+        self.queue.put(_PendingGeneration(payload, future, timings if timings is not None else {}))
+        return await future
+
+    def _collect(self) -> list[_PendingGeneration]:
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + (self.max_wait if self._last_batch_size > 1 else 0.0)
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            self._last_batch_size = len(batch)
+            for pending in batch:
+                pending.timings["queue"] = started - pending.enqueued_at
+                METRICS.observe_stage("queue", pending.timings["queue"])
+            try:
+                results = self.state.generate_batch(
+                    [pending.payload for pending in batch],
+                    [pending.timings for pending in batch],
+                )
+            except Exception as exc:  # noqa: BLE001
+                results = [exc] * len(batch)
+            self.failed += sum(1 for result in results if isinstance(result, Exception))
+            self.busy_seconds += time.perf_counter() - started
+            self.batches += 1
+            self.items += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            for pending, result in zip(batch, results):
+                pending.resolve(result)
+
+    def average_batch_seconds(self) -> float:
+        return self.busy_seconds / self.batches if self.batches else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": round(self.max_wait * 1000.0, 1),
+            "queued": self.queue.qsize(),
+            "batches": self.batches,
+            "items": self.items,
+            "average_batch": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "average_batch_seconds": round(self.average_batch_seconds(), 4),
+        }
+
+
+class _BadRequest(Exception):
+    pass
+
 
+class ModelBetaServer:
+    """Minimal asyncio HTTP/1.1 server for the worker.
+
+    Connections are kept alive between requests (up to ``keepalive_timeout``
+    seconds idle). At most ``max_queue`` /generate requests may wait or run at
+    once; further requests get an immediate 503 with a Retry-After estimate
+    instead of queueing until the client times out.
+
+    A /generate payload with ``"store": {"audio_id": ...}`` is written straight
+    into ``audio_store_dir`` as ``<audio_id>.wav`` and answered with metadata
+    only, so a backend sharing that directory never handles the audio bytes.
+
+    The server listens while the model is still loading. /health answers as
+    soon as the process is up (liveness). /ready returns 200 only once the
+    model is loaded and warm, and 503 with the current phase until then.
+    Model endpoints also return 503 until the model is ready.
+    """
+
+    MAX_BODY_BYTES = 1024 * 1024
+    KNOWN_PATHS = {"/generate", "/health", "/ready", "/stats", "/schema", "/metrics"}
+    LOADING_RETRY_AFTER = "5"
+    MAX_HEADER_LINES = 100
+
+    def __init__(
+        self,
+        max_queue: int,
+        keepalive_timeout: float,
+        audio_store_dir: Path | None = None,
+    ) -> None:
+        # Set by run() once the model is loaded and warm.
+        self.state: ModelState | None = None
+        self.batcher: GenerationBatcher | None = None
+        self.phase = "starting"
+        self.audio_store_dir = audio_store_dir
+        self.max_queue = max(max_queue, 1)
+        self.keepalive_timeout = keepalive_timeout
+        self.outstanding = 0
+        self.connections = 0
+        self.served = 0
+        self.rejected = 0
+        self.cache_hits = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.phase == "ready"
+
+    async def run(self, host: str, port: int, load: Callable[["ModelBetaServer"], Tuple[ModelState, GenerationBatcher]]) -> None:
+        """Listen right away, load the model off the event loop, then serve until cancelled."""
+        server = await asyncio.start_server(self._handle_connection, host, port, backlog=128)
+        print(f"Model Beta worker listening on http://{host}:{port}; loading model")
+        async with server:
+            self.phase = "loading"
+            try:
+                state, batcher = await asyncio.to_thread(load, self)
+            except Exception as exc:  # noqa: BLE001
+                self.phase = "failed"
+                print(f"Model load failed: {exc}")
+                raise SystemExit(1) from exc
+            self.state, self.batcher = state, batcher
+            self.phase = "ready"
+            print(f"Model Beta worker ready on http://{host}:{port}")
+            await server.serve_forever()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Tuple[str, str, str, Dict[str, str], bytes] | None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), self.keepalive_timeout)
+        except asyncio.TimeoutError:
+            return None
+        except ValueError as exc:
+            # StreamReader raises ValueError for a line over its buffer limit (64 KiB).
+            raise _BadRequest("Request line too long") from exc
+        if not request_line.strip():
+            return None
+        parts = request_line.decode("latin-1").split()
+        if len(parts) != 3:
+            raise _BadRequest("Malformed request line")
+        method, target, version = parts
+
+        headers: Dict[str, str] = {}
+        for _ in range(self.MAX_HEADER_LINES):
+            try:
+                line = await reader.readline()
+            except ValueError as exc:
+                raise _BadRequest("Header line too long") from exc
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _sep, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise _BadRequest("Too many headers")
+
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError as exc:
+            raise _BadRequest("Invalid Content-Length") from exc
+        if length < 0 or length > self.MAX_BODY_BYTES:
+            raise _BadRequest("Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), urlparse(target).path, version, headers, body
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except _BadRequest as exc:
+                    await self._write(writer, 400, "application/json", _json({"detail": str(exc)}), {}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, path, version, headers, body = request
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+                try:
+                    status, content_type, response_body, extra = await self._dispatch(method, path, body)
+                except Exception as exc:  # noqa: BLE001
+                    # Answer instead of dropping the connection on a bug in a handler.
+                    print(f"Unhandled error for {method} {path}: {exc!r}")
+                    status, content_type, response_body, extra = 500, "application/json", _json({"detail": str(exc)}), {}
+                    keep_alive = False
+                METRICS.count_request(path if path in self.KNOWN_PATHS else "other", status)
+                await self._write(writer, status, content_type, response_body, extra, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _write(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        content_type: str | None,
+        body: bytes | EncodedAudio,
+        extra: Dict[str, str],
+        keep_alive: bool,
+    ) -> None:
+        lines = [
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+            "Access-Control-Allow-Origin: *",
+            "Access-Control-Allow-Methods: GET,POST,OPTIONS",
+            "Access-Control-Allow-Headers: Content-Type",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if keep_alive:
+            lines.append(f"Keep-Alive: timeout={int(self.keepalive_timeout)}")
+        if content_type:
+            lines.append(f"Content-Type: {content_type}")
+        lines.extend(f"{key}: {value}" for key, value in extra.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        for chunk in body.chunks() if isinstance(body, EncodedAudio) else (body,):
+            if len(chunk):
+                writer.write(chunk)
+        await writer.drain()
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, str | None, bytes | EncodedAudio, Dict[str, str]]:
+        if method == "OPTIONS":
+            return 204, None, b"", {}
+        if method == "GET" and path == "/health":
+            return 200, "application/json", _json(self._health()), {}
+        if method == "GET" and path == "/ready":
+            status = 200 if self.ready else 503
+            return status, "application/json", _json({"ready": self.ready, "phase": self.phase}), {}
+        if path in self.KNOWN_PATHS and not self.ready:
+            detail = {"detail": f"Model worker is not ready ({self.phase})", "phase": self.phase}
+            return 503, "application/json", _json(detail), {"Retry-After": self.LOADING_RETRY_AFTER}
+        if method == "GET" and path == "/stats":
+            return 200, "application/json", _json(self.stats()), {}
+        if method == "GET" and path == "/metrics":
+            return 200, "text/plain; version=0.0.4", self.metrics().encode("utf-8"), {}
+        if method == "GET" and path == "/schema":
+            schema = {
+                "conditioning_params": self.state.conditioning_params,
+                "label_schema": self.state.label_schema,
+                "output_formats": available_output_formats(),
+            }
+            return 200, "application/json", _json(schema), {}
+        if method == "POST" and path == "/generate":
+            return await self._generate(body)
+        return 404, "application/json", _json({"detail": "Not found"}), {}
+
+    async def _generate(self, body: bytes) -> Tuple[int, str | None, bytes | EncodedAudio, Dict[str, str]]:
+        try:
+            payload = json.loads(body.decode("utf-8") or "{}")
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return 400, "application/json", _json({"detail": "Invalid JSON"}), {}
+        if not isinstance(payload, dict):
+            return 400, "application/json", _json({"detail": "Expected a JSON object"}), {}
+        try:
+            # Reject bad values here, before queueing, instead of failing in the batch as a 500.
+            self.state.validate(payload)
+        except (ValueError, TypeError) as exc:
+            return 400, "application/json", _json({"detail": str(exc)}), {}
+        store_id = None
+        if payload.get("store") is not None:
+            if self.audio_store_dir is None:
+                return 501, "application/json", _json({"detail": "Direct store is disabled on this worker"}), {}
+            store = payload.get("store")
+            if not isinstance(store, dict):
+                return 400, "application/json", _json({"detail": "store must be an object"}), {}
+            store_id = str(store.get("audio_id") or "")
+            if not AUDIO_ID_RE.match(store_id):
+                return 400, "application/json", _json({"detail": "store.audio_id must match [A-Za-z0-9_-]{1,64}"}), {}
+
+        request_started = time.perf_counter()
+        timings: Dict[str, float] = {}
+        result_key = self.state.result_key(payload)
+        # The result cache may touch disk (spilled entries); keep that off the event loop.
+        cached = await asyncio.to_thread(self.state.audio_cache.get, result_key) if result_key else None
+        if result_key:
+            timings["cache"] = time.perf_counter() - request_started
+            METRICS.observe_stage("cache", timings["cache"])
+        if cached is not None:
+            self.cache_hits += 1
+            audio, sample_rate = cached
+        else:
+            if self.outstanding >= self.max_queue:
+                self.rejected += 1
+                return 503, "application/json", _json({"detail": "Model worker busy"}), {"Retry-After": str(self._retry_after())}
+            self.outstanding += 1
+            try:
+                audio, sample_rate = await self.batcher.submit(payload, timings)
+            except Exception as exc:  # noqa: BLE001
+                return 500, "application/json", _json({"detail": str(exc)}), {}
+            finally:
+                self.outstanding -= 1
+            if result_key:
+                await asyncio.to_thread(self.state.audio_cache.put, result_key, audio, sample_rate)
+
+        stored = None
+        if store_id is not None:
+            started = time.perf_counter()
+            try:
+                path = await asyncio.to_thread(self._store, store_id, audio)
+            except OSError as exc:
+                return 500, "application/json", _json({"detail": f"Could not store audio: {exc}"}), {}
+            timings["store"] = time.perf_counter() - started
+            METRICS.observe_stage("store", timings["store"])
+            stored = {
+                "audio_id": store_id,
+                "path": str(path),
+                "bytes": len(audio),
+                "sample_rate": sample_rate,
+                "content_type": audio.content_type,
+            }
+
+        self.served += 1
+        timings["total"] = time.perf_counter() - request_started
+        METRICS.observe_stage("total", timings["total"])
         headers = {
             "X-Sample-Rate": str(sample_rate),
             "X-Request-Id": str(uuid.uuid4()),
+            "Server-Timing": server_timing(timings),
         }
-        self._set_headers(200, "audio/wav", headers)
-        self.wfile.write(wav_bytes)
+        if result_key:
+            headers["X-Cache"] = "hit" if cached is not None else "miss"
+        if stored is not None:
+            return 200, "application/json", _json(stored), headers
+        return 200, audio.content_type, audio, headers
+
+    def _store(self, audio_id: str, audio: EncodedAudio) -> Path:
+        """Write ``audio`` into the shared audio store; readers never see a partial file."""
+        assert self.audio_store_dir is not None
+        extension = "flac" if audio.content_type == "audio/flac" else "wav"
+        path = self.audio_store_dir / f"{audio_id}.{extension}"
+        tmp_path = self.audio_store_dir / f".{audio_id}.{uuid.uuid4().hex}.tmp"
+        try:
+            with tmp_path.open("wb") as handle:
+                for chunk in audio.chunks():
+                    handle.write(chunk)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return path
+
+    def _retry_after(self) -> int:
+        # Time to drain the current queue at the observed batch rate.
+        batches_ahead = self.outstanding / self.batcher.max_batch
+        return max(1, math.ceil(batches_ahead * self.batcher.average_batch_seconds()))
+
+    def _health(self) -> Dict[str, Any]:
+        if self.state is None or self.batcher is None:
+            return {"status": "ok", "phase": self.phase}
+        return {
+            "status": "ok",
+            "phase": self.phase,
+            "startup": self.state.startup,
+            "condition_cache": self.state.condition_cache_stats(),
+            "audio_cache": self.state.audio_cache.snapshot(),
+            "batching": self.batcher.stats(),
+        }
+
+    def metrics(self) -> str:
+        audio_cache = self.state.audio_cache.snapshot()
+        counters = {
+            "model_worker_generations_total": ("Generations run on the model thread.", self.batcher.items),
+            "model_worker_generation_errors_total": ("Generations that failed.", self.batcher.failed),
+            "model_worker_batches_total": ("Micro-batches run.", self.batcher.batches),
+            "model_worker_rejected_total": ("/generate requests shed with 503.", self.rejected),
+            "model_worker_audio_cache_hits_total": (
+                "Seeded requests served from the result cache.",
+                audio_cache["hits"] + audio_cache["disk_hits"],
+            ),
+            "model_worker_audio_cache_misses_total": ("Seeded requests not in the result cache.", audio_cache["misses"]),
+            "model_worker_condition_cache_hits_total": (
+                "Slider requests with a cached condition_zero.",
+                self.state.condition_stats["hits"],
+            ),
+            "model_worker_condition_cache_misses_total": (
+                "Slider requests without a cached condition_zero.",
+                self.state.condition_stats["misses"],
+            ),
+        }
+        gauges = {
+            "model_worker_in_flight": ("/generate requests waiting or running.", self.outstanding),
+            "model_worker_queue_depth": ("Requests queued for the model thread.", self.batcher.queue.qsize()),
+            "model_worker_max_queue": ("Admission limit for /generate.", self.max_queue),
+            "model_worker_connections": ("Open client connections.", self.connections),
+            "model_worker_audio_cache_bytes": ("Result cache size in memory.", audio_cache["memory_bytes"]),
+            "model_worker_condition_cache_entries": ("Cached condition_zero entries.", len(self.state.condition_cache)),
+        }
+        return METRICS.render(counters, gauges)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue": {
+                "outstanding": self.outstanding,
+                "waiting": self.batcher.queue.qsize(),
+                "max_queue": self.max_queue,
+            },
+            "connections": self.connections,
+            "served": self.served,
+            "rejected": self.rejected,
+            "cache_hits": self.cache_hits,
+            "batching": self.batcher.stats(),
+        }
+
+
+def _json(payload: Any) -> bytes:
+    return json.dumps(payload).encode("utf-8")
 
 
 def main() -> None:
@@ -198,6 +1220,86 @@ def main() -> None:
     parser.add_argument("--port", type=int, default=8001)
     parser.add_argument("--model-root", default=None)
     parser.add_argument("--onnx-dir", default=None)
+    parser.add_argument(
+        "--max-batch",
+        type=int,
+        default=int(os.getenv("MODEL_MAX_BATCH", "8")),
+        help="Most concurrent /generate requests run as one batch (1 disables micro-batching)",
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=int(os.getenv("MODEL_MAX_QUEUE", "32")),
+        help="Most /generate requests waiting or running at once; the rest get 503 + Retry-After",
+    )
+    parser.add_argument(
+        "--keepalive-timeout",
+        type=float,
+        default=float(os.getenv("MODEL_KEEPALIVE_TIMEOUT", "15")),
+        help="Seconds an idle keep-alive connection stays open",
+    )
+    parser.add_argument(
+        "--max-batch-wait-ms",
+        type=float,
+        default=float(os.getenv("MODEL_MAX_BATCH_WAIT_MS", "10")),
+        help="How long a batch may wait for more requests while the worker is busy",
+    )
+    parser.add_argument(
+        "--condition-cache-size",
+        type=int,
+        default=int(os.getenv("MODEL_CONDITION_CACHE_SIZE", "256")),
+        help="Label sets whose condition_zero and noise are kept for slider requests (0 disables)",
+    )
+    parser.add_argument(
+        "--audio-cache-mb",
+        type=float,
+        default=float(os.getenv("MODEL_AUDIO_CACHE_MB", "64")),
+        help="In-memory cache of seeded results, in MB (0 disables)",
+    )
+    parser.add_argument(
+        "--audio-cache-dir",
+        default=os.getenv("MODEL_AUDIO_CACHE_DIR", str(Path(__file__).resolve().parents[1] / "model_audio_cache")),
+        help="Directory that seeded results spill to once evicted from memory",
+    )
+    parser.add_argument(
+        "--audio-cache-disk-mb",
+        type=float,
+        default=float(os.getenv("MODEL_AUDIO_CACHE_DISK_MB", "512")),
+        help="Disk spill cap in MB (0 disables spilling)",
+    )
+    parser.add_argument(
+        "--audio-store-dir",
+        default=os.getenv("MODEL_AUDIO_STORE_DIR", str(Path(__file__).resolve().parents[1] / "audio_files")),
+        help="Shared audio store for direct-to-store requests (empty disables them)",
+    )
+    parser.add_argument(
+        "--intra-op-threads",
+        type=int,
+        default=int(os.getenv("MODEL_ORT_INTRA_OP_THREADS", "0")),
+        help="ONNX Runtime intra-op threads (0 = runtime default)",
+    )
+    parser.add_argument(
+        "--inter-op-threads",
+        type=int,
+        default=int(os.getenv("MODEL_ORT_INTER_OP_THREADS", "0")),
+        help="ONNX Runtime inter-op threads (0 = runtime default; only used in parallel mode)",
+    )
+    parser.add_argument(
+        "--graph-optimization",
+        choices=sorted(GRAPH_OPTIMIZATION_LEVELS),
+        default=os.getenv("MODEL_ORT_GRAPH_OPTIMIZATION", "all"),
+    )
+    parser.add_argument(
+        "--execution-mode",
+        choices=sorted(EXECUTION_MODES),
+        default=os.getenv("MODEL_ORT_EXECUTION_MODE", "sequential"),
+    )
+    parser.add_argument(
+        "--warmup-runs",
+        type=int,
+        default=int(os.getenv("MODEL_WARMUP_RUNS", "1")),
+        help="Warm-up generations before serving (0 disables)",
+    )
     args = parser.parse_args()
 
     model_root = Path(args.model_root).expanduser() if args.model_root else resolve_model_root()
@@ -206,12 +1308,52 @@ def main() -> None:
     if not onnx_dir.exists():
         raise SystemExit(f"ONNX directory not found: {onnx_dir}")
 
-    state = ModelState(model_root=model_root, onnx_dir=onnx_dir)
-    ModelBetaHandler.state = state
+    audio_cache = AudioResultCache(
+        max_memory_bytes=int(args.audio_cache_mb * 1024 * 1024),
+        spill_dir=Path(args.audio_cache_dir).expanduser() if args.audio_cache_disk_mb > 0 else None,
+        max_disk_bytes=int(args.audio_cache_disk_mb * 1024 * 1024),
+    )
+    session_options = build_session_options(
+        args.intra_op_threads,
+        args.inter_op_threads,
+        args.graph_optimization,
+        args.execution_mode,
+    )
+    audio_store_dir = Path(args.audio_store_dir).expanduser().resolve() if args.audio_store_dir else None
+    if audio_store_dir is not None:
+        audio_store_dir.mkdir(parents=True, exist_ok=True)
+
+    def load(server: ModelBetaServer) -> Tuple[ModelState, GenerationBatcher]:
+        state = ModelState(
+            model_root=model_root,
+            onnx_dir=onnx_dir,
+            condition_cache_size=args.condition_cache_size,
+            audio_cache=audio_cache,
+            session_options=session_options,
+        )
+        print(
+            f"Model loaded in {state.startup['model_load_seconds']}s "
+            f"(intra-op threads {args.intra_op_threads or 'default'}, inter-op threads {args.inter_op_threads or 'default'}, "
+            f"graph optimization {args.graph_optimization}, {args.execution_mode} execution)"
+        )
+        server.phase = "warming"
+        # Before warm-up, which resets the condition cache and stage metrics afterwards.
+        if not state.check_seeding():
+            print("Warning: a seed does not reproduce the same audio; seeded results will not be cached")
+        if args.warmup_runs > 0:
+            state.warm_up(args.warmup_runs)
+            print(f"Warm-up generations took {state.startup['warmup_seconds']}s")
+        return state, GenerationBatcher(state, args.max_batch, args.max_batch_wait_ms)
 
-    server = ThreadingHTTPServer((args.host, args.port), ModelBetaHandler)
-    print(f"Model Beta worker running on http://{args.host}:{args.port}")
-    server.serve_forever()
+    server = ModelBetaServer(
+        max_queue=args.max_queue,
+        keepalive_timeout=args.keepalive_timeout,
+        audio_store_dir=audio_store_dir,
+    )
+    try:
+        asyncio.run(server.run(args.host, args.port, load))
+    except KeyboardInterrupt:
+        pass
 
 
 if __name__ == "__main__":
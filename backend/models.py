@@ -5,7 +5,7 @@ from typing import Any, Optional
 
 from pydantic import BaseModel, conint, field_validator, ConfigDict
 from typing import Union
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, JSON, String, Text, func
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, JSON, String, Text, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .database import Base
@@ -61,11 +61,16 @@ class TestResult(Base):
 
 class ModelTestResult(Base):
     __tablename__ = "model_test_results"
+    __table_args__ = (
+        Index("uq_model_test_results_source", "source_dataset", "source_filename", unique=True),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     source_dataset: Mapped[str] = mapped_column(String, nullable=False)
     source_filename: Mapped[str] = mapped_column(String, nullable=False, index=True)
     source_kind: Mapped[Optional[str]] = mapped_column(String, nullable=True, index=True)
+    # classify_drum_type(source_kind), stored so the dashboard can GROUP BY it.
+    drum_type: Mapped[Optional[str]] = mapped_column(String, nullable=True, index=True)
     source_audio_url: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     source_metadata: Mapped[Optional[dict[str, Any]]] = mapped_column(JSON, nullable=True)
     applied_tags: Mapped[Optional[dict[str, Any]]] = mapped_column(JSON, nullable=True)
@@ -79,9 +84,44 @@ class ModelTestResult(Base):
         default=lambda: datetime.now(timezone.utc),
         server_default=func.now(),
         nullable=False,
+        index=True,
     )
 
 
+class RemoteSample(Base):
+    """Local catalog copy of a gold-db/full-db sample, kept in sync by a background task."""
+
+    __tablename__ = "remote_samples"
+    __table_args__ = (UniqueConstraint("source", "dataset", "filename", name="uq_remote_samples_key"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    source: Mapped[str] = mapped_column(String, nullable=False)  # gold-db / full-db
+    dataset: Mapped[str] = mapped_column(String, nullable=False)  # raw upstream dataset
+    filename: Mapped[str] = mapped_column(String, nullable=False, index=True)
+    kind: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    drum_type: Mapped[str] = mapped_column(String, nullable=False, index=True)
+    velocity: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    dataset_type: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # upstream "_dataset"
+    raw: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    synced_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+
+class SampleCatalogSyncState(Base):
+    """Pagination cursor per (source, kind) for incremental catalog syncs."""
+
+    __tablename__ = "sample_catalog_sync_state"
+
+    source: Mapped[str] = mapped_column(String, primary_key=True)
+    kind: Mapped[str] = mapped_column(String, primary_key=True)
+    next_page: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    last_synced_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_full_sync_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
 class IllugenGeneration(Base):
     __tablename__ = "illugen_generations"
 
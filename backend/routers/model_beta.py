@@ -5,6 +5,7 @@ from typing import Any, Dict
 from fastapi import APIRouter, HTTPException, Response
 
 from backend.services.model_beta_client import ModelBetaClient
+from backend.services.model_worker_manager import WorkerPoolUnavailable, worker_pool_state
 
 
 router = APIRouter()
@@ -19,6 +20,12 @@ async def health() -> Dict[str, Any]:
         raise HTTPException(status_code=502, detail=f"Model Beta worker unavailable: {exc}") from exc
 
 
+@router.get("/workers")
+async def workers() -> Dict[str, Any]:
+    """Worker pool state: per-worker health, load, restarts and last error."""
+    return worker_pool_state()
+
+
 @router.get("/schema")
 async def schema() -> Dict[str, Any]:
     try:
@@ -31,10 +38,13 @@ async def schema() -> Dict[str, Any]:
 async def generate(payload: Dict[str, Any]) -> Response:
     try:
         audio_bytes, sample_rate = await client.generate_audio(payload)
+    except WorkerPoolUnavailable as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": str(exc.retry_after)}) from exc
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=502, detail=f"Model Beta worker error: {exc}") from exc
 
     headers = {}
     if sample_rate:
         headers["X-Sample-Rate"] = sample_rate
-    return Response(content=audio_bytes, media_type="audio/wav", headers=headers)
+    media_type = "audio/flac" if payload.get("format") == "flac" else "audio/wav"
+    return Response(content=audio_bytes, media_type=media_type, headers=headers)
@@ -1,31 +1,58 @@
 from __future__ import annotations
 
+import asyncio
+import base64
 import json
+import logging
 import os
 import random
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, Optional
 from uuid import uuid4
 from urllib.parse import quote
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi.responses import Response
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel, Field, field_validator
-from sqlalchemy import select
+from sqlalchemy import and_, func, not_, or_, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_session
 from ..models import ModelTestResult
 from ..services.model_beta_client import ModelBetaClient
-from ..services.model_worker_manager import ensure_model_worker_started
+from ..services.model_worker_manager import WorkerPoolUnavailable, ensure_model_worker_started
+from ..services.remote_samples import (
+    DB_SOURCES,
+    DRUM_KIND_MAP,
+    catalog_status,
+    catalog_unused_samples,
+    classify_drum_type,
+    catalog_samples_by_key,
+    dataset_param,
+    scored_sample_keys,
+    sync_catalog,
+    synced_sources,
+)
+from ..services import source_audio_cache
+from ..services.batch_jobs import batch_jobs
+from ..services.single_flight import (
+    IDEMPOTENCY_HEADER,
+    IdempotencyConflict,
+    SingleFlight,
+    generation_flights,
+    request_key,
+)
+from ..services.upstream import resilient_request
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
-
-DB_SOURCES: dict[str, str] = {
-    "gold-db": "https://dev-onla-drumgen-demo.waves.com/gold-db",
-    "full-db": "https://dev-onla-drumgen-demo.waves.com/full-db",
-}
+# Strong references for fire-and-forget tasks (the event loop only keeps weak ones).
+_background_tasks: set[asyncio.Task[Any]] = set()
+source_audio_flights = SingleFlight()
 
 V18_MODEL_ROOT = Path(os.environ.get("DRUMGEN_MODEL_ROOT", str(Path.home() / "Desktop" / "V18_Acoustic+Electronic")))
 V18_ONNX_DIR = V18_MODEL_ROOT / "onnx_exports" / "acoustic"
@@ -36,15 +63,6 @@ AUDIO_DIR.mkdir(exist_ok=True)
 
 MODEL_VERSION = "v18_acoustic"
 
-DRUM_KIND_MAP: dict[str, list[str]] = {
-    "bass_drum": ["Bass Drum", "Kick"],
-    "snare": ["Snare", "Snare Piccolo", "Snare + Clap"],
-    "low_tom": ["Low Tom", "Floor Tom"],
-    "mid_tom": ["Mid Tom"],
-    "high_tom": ["High Tom", "Hi Tom"],
-}
-
-
 def parse_multi_value(value: Any) -> list[str]:
     if value is None:
         return []
@@ -75,21 +93,6 @@ def normalize_sample_json_for_model(sample: dict[str, Any]) -> dict[str, Any]:
     return normalized
 
 
-def classify_drum_type(kind: Optional[str]) -> str:
-    normalized = (kind or "").strip().lower()
-    if "snare" in normalized:
-        return "snare"
-    if "kick" in normalized or "bass drum" in normalized:
-        return "bass_drum"
-    if "floor tom" in normalized or "low tom" in normalized:
-        return "low_tom"
-    if "mid tom" in normalized:
-        return "mid_tom"
-    if "high tom" in normalized or "hi tom" in normalized:
-        return "high_tom"
-    return "other"
-
-
 def encode_source_dataset(db_source: str, dataset: str) -> str:
     return f"{db_source}|{dataset}"
 
@@ -104,6 +107,13 @@ def decode_source_dataset(dataset: str) -> tuple[Optional[str], str]:
     return None, dataset
 
 
+def normalize_source_dataset(dataset: str) -> str:
+    # Pre-source-tagged rows stored the raw gold-db dataset without a "<source>|" prefix.
+    if "|" not in dataset:
+        return encode_source_dataset("gold-db", dataset)
+    return dataset
+
+
 def build_source_audio_proxy_url(dataset: str, filename: str, db_source: Optional[str] = None) -> str:
     encoded_source, raw_dataset = decode_source_dataset(dataset)
     source = db_source or encoded_source
@@ -116,40 +126,73 @@ def build_source_audio_proxy_url(dataset: str, filename: str, db_source: Optiona
     return base
 
 
-def _case_insensitive_match(candidate: str, options: list[str]) -> str | None:
-    """Return the option that matches candidate (case-insensitive), or None."""
-    lower = candidate.lower().strip()
-    for opt in options:
-        if opt.lower().strip() == lower:
-            return opt
-    return None
+class LabelSchema:
+    """The V18 label schema plus lowercase -> canonical option lookups, built once per file version."""
+
+    def __init__(self, raw: dict[str, Any], mtime: float) -> None:
+        self.mtime = mtime
+        self.dictionaries: dict[str, Any] = raw.get("dictionaries", {})
+        self.multi_value_cols: list[str] = raw.get("multi_value_cols", [])
+        self.dataset_type: str = raw.get("dataset_type", "unknown")
+        self.multi_cols = set(self.multi_value_cols)
+        self.lookups: dict[str, dict[str, str]] = {}
+        for key, options_map in self.dictionaries.items():
+            lookup: dict[str, str] = {}
+            for option in (options_map or {}).keys():
+                if key == "Velocity" and option == "quiet":
+                    continue
+                # First option wins, like the original linear scan.
+                lookup.setdefault(option.lower().strip(), option)
+            self.lookups[key] = lookup
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "conditioning_params": V18_CONDITIONING_PARAMS,
+            "label_schema": {
+                "dictionaries": self.dictionaries,
+                "multi_value_cols": self.multi_value_cols,
+                "dataset_type": self.dataset_type,
+            },
+        }
+
 
+_label_schema: Optional[LabelSchema] = None
 
-def normalize_tags_for_model(tags: dict[str, Any], schema: dict[str, Any]) -> dict[str, Any]:
-    dictionaries = schema.get("label_schema", {}).get("dictionaries", {})
-    multi_cols = set(schema.get("label_schema", {}).get("multi_value_cols", []))
 
+def get_label_schema() -> LabelSchema:
+    """Return the cached schema, re-reading label_dictionaries.json only when its mtime changes."""
+    global _label_schema
+    label_dict_path = V18_ONNX_DIR / "label_dictionaries.json"
+    try:
+        mtime = label_dict_path.stat().st_mtime
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=500,
+            detail=f"label_dictionaries.json not found at {label_dict_path}",
+        )
+    if _label_schema is None or _label_schema.mtime != mtime:
+        with label_dict_path.open("r", encoding="utf-8") as handle:
+            _label_schema = LabelSchema(json.load(handle), mtime)
+    return _label_schema
+
+
+def normalize_tags_for_model(tags: dict[str, Any], schema: LabelSchema) -> dict[str, Any]:
     normalized: dict[str, Any] = {}
-    for key, options_map in dictionaries.items():
-        if key not in tags:
+    for key, value in tags.items():
+        lookup = schema.lookups.get(key)
+        if lookup is None:
             continue
-        options = list((options_map or {}).keys())
-        if key == "Velocity":
-            options = [opt for opt in options if opt != "quiet"]
 
-        if key in multi_cols:
-            input_value = tags.get(key, [])
-            values = parse_multi_value(input_value)
+        if key in schema.multi_cols:
             matched = []
-            for value in values:
-                m = _case_insensitive_match(value, options)
+            for item in parse_multi_value(value):
+                m = lookup.get(item.lower().strip())
                 if m:
                     matched.append(m)
             normalized[key] = matched
             continue
 
-        selected = str(tags.get(key, "")).strip()
-        matched = _case_insensitive_match(selected, options)
+        matched = lookup.get(str(value).strip().lower())
         if matched:
             normalized[key] = matched
 
@@ -162,6 +205,21 @@ class GenerateModelAudioRequest(BaseModel):
     sliders: Optional[Dict[str, float]] = None
     temperature: float = 1.0
     width: float = 0.5
+    # Same seed and settings give the same audio (served from the worker's result cache).
+    seed: Optional[int] = None
+
+
+class BatchGenerateRequest(BaseModel):
+    # Sample ids as returned by /samples ("<source>|<dataset>:<filename>"), resolved via the catalog.
+    sample_ids: list[str] = Field(default_factory=list)
+    # Full sample entries from /samples, for samples that are not in the catalog.
+    samples: list[Dict[str, Any]] = Field(default_factory=list)
+    temperature: float = 1.0
+    width: float = 0.5
+    # Every sample is generated once per slider set.
+    slider_sets: list[Dict[str, float]] = Field(default_factory=lambda: [{}])
+    seed: Optional[int] = None
+    concurrency: Optional[int] = Field(default=None, ge=1)
 
 
 class ModelTestResultCreate(BaseModel):
@@ -196,76 +254,118 @@ class ModelTestResultUpdate(BaseModel):
         return value
 
 
+REMOTE_PAGE_SIZE = 200
+# Page requests allowed in flight per fetch, across all sources and kinds.
+REMOTE_FETCH_CONCURRENCY = int(os.getenv("REMOTE_FETCH_CONCURRENCY", "8"))
+# Pages requested ahead of the one being processed, per (source, kind) walk.
+REMOTE_PREFETCH_PAGES = int(os.getenv("REMOTE_PREFETCH_PAGES", "2"))
+# How long the source-audio proxy waits on one source before also asking the next.
+SOURCE_AUDIO_HEDGE_DELAY_SECONDS = float(os.getenv("SOURCE_AUDIO_HEDGE_DELAY", "0.3"))
+# Batch generation jobs: default/maximum parallel worker calls per job, and items per job.
+MODEL_BATCH_CONCURRENCY = int(os.getenv("MODEL_BATCH_CONCURRENCY", "2"))
+MODEL_BATCH_MAX_CONCURRENCY = int(os.getenv("MODEL_BATCH_MAX_CONCURRENCY", "8"))
+MODEL_BATCH_MAX_ITEMS = int(os.getenv("MODEL_BATCH_MAX_ITEMS", "2000"))
+# Let the worker write generated audio straight into AUDIO_DIR (local workers share it).
+# Switched off for the process once a worker turns out not to share the directory.
+MODEL_DIRECT_STORE = os.getenv("MODEL_DIRECT_STORE", "1") not in {"0", "false", "False"}
+# Background warming of a returned sample batch: parallel downloads (across all batches)
+# and the most bytes one batch may pull into the cache.
+SOURCE_AUDIO_PREFETCH_CONCURRENCY = int(os.getenv("SOURCE_AUDIO_PREFETCH_CONCURRENCY", "4"))
+SOURCE_AUDIO_PREFETCH_MAX_BYTES = int(float(os.getenv("SOURCE_AUDIO_PREFETCH_MAX_MB", "256")) * 1024 * 1024)
+# How much of one shared source-audio download is buffered for requests that join it late.
+SOURCE_AUDIO_REPLAY_MAX_BYTES = int(float(os.getenv("SOURCE_AUDIO_REPLAY_MAX_MB", "8")) * 1024 * 1024)
+_prefetch_semaphore = asyncio.Semaphore(SOURCE_AUDIO_PREFETCH_CONCURRENCY)
+_prefetch_stats = {"queued": 0, "fetched": 0, "already_cached": 0, "failed": 0, "over_budget": 0}
+
+
 async def fetch_remote_samples(
     target_kinds: list[str],
     limit: Optional[int],
     source_names: Optional[list[str]] = None,
 ) -> list[dict[str, Any]]:
-    async with httpx.AsyncClient(verify=False, timeout=8.0) as client:
-        selected_sources = source_names or list(DB_SOURCES.keys())
-        samples: list[dict[str, Any]] = []
-        seen: set[tuple[str, str, str]] = set()
+    """Collect usable samples from the remote DBs, walking every (source, kind) concurrently.
+
+    Each walk prefetches the next pages under a shared semaphore. As soon as
+    ``limit`` usable samples are collected, outstanding page requests are
+    cancelled.
+    """
+    selected_sources = [name for name in (source_names or list(DB_SOURCES.keys())) if name in DB_SOURCES]
+    samples: list[dict[str, Any]] = []
+    seen: set[tuple[str, str, str]] = set()
+    limit_reached = asyncio.Event()
+    semaphore = asyncio.Semaphore(REMOTE_FETCH_CONCURRENCY)
+
+    def accept(source_name: str, page_samples: list[dict[str, Any]]) -> int:
+        page_added = 0
+        for sample in page_samples:
+            # Early filter: skip electronic samples from full-db
+            # (they are not playable and would waste the limit budget).
+            if source_name == "full-db":
+                ds_type = str(sample.get("_dataset") or "").strip().lower()
+                if ds_type == "electronic":
+                    continue
 
-        for source_name in selected_sources:
-            source_base = DB_SOURCES.get(source_name)
-            if not source_base:
+            # Skip samples tagged with velocity "quiet".
+            velocity = str(sample.get("Velocity") or "").strip().lower()
+            if velocity == "quiet":
                 continue
 
-            for kind in target_kinds:
-                page = 1
-                per_page = 200
-                # Track consecutive pages with zero usable samples so we
-                # don't endlessly paginate through unplayable electronic rows.
-                consecutive_empty_pages = 0
-                while True:
-                    # gold-db uses "acoustic_drums", full-db uses "acoustic"
-                    dataset_param = "acoustic_drums" if source_name == "gold-db" else "acoustic"
-                    params = {
-                        "dataset": dataset_param,
-                        "kind": kind,
-                        "page": page,
-                        "per_page": per_page,
-                    }
-                    try:
-                        response = await client.get(f"{source_base}/api/samples", params=params)
-                        response.raise_for_status()
-                        payload = response.json()
-                        page_samples = payload.get("samples", [])
-                    except Exception:  # noqa: BLE001
-                        # Keep model testing usable even if one remote source is down/unreachable.
-                        break
+            dataset = str(sample.get("dataset") or "acoustic_drums")
+            filename = str(sample.get("Filename") or "")
+            if not filename:
+                continue
+            key = (source_name, dataset, filename)
+            if key in seen:
+                continue
+            seen.add(key)
+            samples.append({"sample": sample, "db_source": source_name})
+            page_added += 1
+            if limit is not None and len(samples) >= limit:
+                limit_reached.set()
+                break
+        return page_added
 
-                    if not page_samples:
+    async with httpx.AsyncClient(verify=False, timeout=8.0) as client:
+
+        async def fetch_page(source_name: str, kind: str, page: int) -> Optional[list[dict[str, Any]]]:
+            params = {
+                "dataset": dataset_param(source_name),
+                "kind": kind,
+                "page": page,
+                "per_page": REMOTE_PAGE_SIZE,
+            }
+            async with semaphore:
+                try:
+                    response = await resilient_request(
+                        client,
+                        "GET",
+                        f"{DB_SOURCES[source_name]}/api/samples",
+                        max_attempts=2,
+                        upstream=source_name,
+                        params=params,
+                    )
+                    return response.json().get("samples", [])
+                except Exception:  # noqa: BLE001
+                    # Keep model testing usable even if one remote source is down/unreachable.
+                    return None
+
+        async def walk(source_name: str, kind: str) -> None:
+            pending: dict[int, asyncio.Task[Optional[list[dict[str, Any]]]]] = {}
+            next_page = 1
+            page = 1
+            # Track consecutive pages with zero usable samples so we
+            # don't endlessly paginate through unplayable electronic rows.
+            consecutive_empty_pages = 0
+            try:
+                while not limit_reached.is_set():
+                    while len(pending) < REMOTE_PREFETCH_PAGES:
+                        pending[next_page] = asyncio.ensure_future(fetch_page(source_name, kind, next_page))
+                        next_page += 1
+                    page_samples = await pending.pop(page)
+                    if not page_samples or limit_reached.is_set():
                         break
 
-                    page_added = 0
-                    for sample in page_samples:
-                        # Early filter: skip electronic samples from full-db
-                        # (they are not playable and would waste the limit budget).
-                        if source_name == "full-db":
-                            ds_type = str(sample.get("_dataset") or "").strip().lower()
-                            if ds_type == "electronic":
-                                continue
-
-                        # Skip samples tagged with velocity "quiet".
-                        velocity = str(sample.get("Velocity") or "").strip().lower()
-                        if velocity == "quiet":
-                            continue
-
-                        dataset = str(sample.get("dataset") or "acoustic_drums")
-                        filename = str(sample.get("Filename") or "")
-                        if not filename:
-                            continue
-                        key = (source_name, dataset, filename)
-                        if key in seen:
-                            continue
-                        seen.add(key)
-                        samples.append({"sample": sample, "db_source": source_name})
-                        page_added += 1
-                        if limit is not None and len(samples) >= limit:
-                            return samples
-
-                    if page_added == 0:
+                    if accept(source_name, page_samples) == 0:
                         consecutive_empty_pages += 1
                         if consecutive_empty_pages >= 3:
                             # All recent pages contained only unusable samples
@@ -274,32 +374,53 @@ async def fetch_remote_samples(
                     else:
                         consecutive_empty_pages = 0
 
-                    if len(page_samples) < per_page:
+                    if len(page_samples) < REMOTE_PAGE_SIZE:
                         break
                     page += 1
+            finally:
+                for task in pending.values():
+                    task.cancel()
+
+        walkers = [
+            asyncio.ensure_future(walk(source_name, kind))
+            for source_name in selected_sources
+            for kind in target_kinds
+        ]
+        if walkers:
+            all_walked = asyncio.gather(*walkers)
+            limit_waiter = asyncio.ensure_future(limit_reached.wait())
+            try:
+                await asyncio.wait({all_walked, limit_waiter}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for task in (*walkers, limit_waiter):
+                    task.cancel()
+                await asyncio.gather(all_walked, limit_waiter, return_exceptions=True)
 
-        return samples if limit is None else samples[:limit]
+    return samples if limit is None else samples[:limit]
 
 
 @router.get("/schema")
 async def get_schema() -> Dict[str, Any]:
     """Return the V18 acoustic model schema directly from disk (no worker needed)."""
-    label_dict_path = V18_ONNX_DIR / "label_dictionaries.json"
-    if not label_dict_path.exists():
-        raise HTTPException(
-            status_code=500,
-            detail=f"label_dictionaries.json not found at {label_dict_path}",
-        )
-    with label_dict_path.open("r", encoding="utf-8") as handle:
-        raw = json.load(handle)
+    return get_label_schema().as_dict()
 
+
+def build_sample_entry(db_source: str, sample: dict[str, Any]) -> dict[str, Any]:
+    dataset = encode_source_dataset(db_source, str(sample.get("dataset") or "acoustic_drums"))
+    filename = sample.get("Filename")
+    kind = sample.get("Kind")
     return {
-        "conditioning_params": V18_CONDITIONING_PARAMS,
-        "label_schema": {
-            "dictionaries": raw.get("dictionaries", {}),
-            "multi_value_cols": raw.get("multi_value_cols", []),
-            "dataset_type": raw.get("dataset_type", "unknown"),
-        },
+        "id": f"{dataset}:{filename}",
+        "dataset": dataset,
+        "filename": filename,
+        "db_source": db_source,
+        "kind": kind,
+        "drum_type": classify_drum_type(kind),
+        "tags": to_prompt_tags(sample),
+        "source_audio_proxy_url": build_source_audio_proxy_url(str(dataset), str(filename), db_source),
+        "source_audio_url": sample.get("audio_url"),
+        "raw_sample": sample,
+        "source_json_for_model": normalize_sample_json_for_model(sample),
     }
 
 
@@ -307,6 +428,7 @@ async def get_schema() -> Dict[str, Any]:
 async def list_samples(
     drum_type: str = Query("bass_drum"),
     limit: Optional[int] = Query(50, ge=1, le=10000),
+    prefetch_audio: bool = Query(False, description="Warm the source-audio cache for the returned samples"),
     session: AsyncSession = Depends(get_session),
 ) -> Dict[str, Any]:
     if drum_type not in DRUM_KIND_MAP:
@@ -315,204 +437,515 @@ async def list_samples(
             detail=f"drum_type must be one of: {', '.join(DRUM_KIND_MAP)}",
         )
 
-    existing_rows = await session.execute(
-        select(ModelTestResult.source_dataset, ModelTestResult.source_filename)
-    )
-    scored_keys = {
-        (str(dataset), str(filename))
-        for dataset, filename in existing_rows.all()
-    }
-
     requested_limit = limit or 50
-    async def append_unused_samples(remote_samples: list[dict[str, Any]], current: list[dict[str, Any]]) -> list[dict[str, Any]]:
-        samples = list(current)
-        for remote_sample in remote_samples:
-            sample = remote_sample.get("sample") or {}
-            db_source = str(remote_sample.get("db_source") or "gold-db")
-            dataset_raw = sample.get("dataset") or "acoustic_drums"
-            dataset = encode_source_dataset(db_source, str(dataset_raw))
-            filename = sample.get("Filename")
-            if not filename:
-                continue
-            if (str(dataset), str(filename)) in scored_keys:
-                continue
-            # Backward compatibility: pre-source-tagged gold-db rows used raw dataset only.
-            if db_source == "gold-db" and (str(dataset_raw), str(filename)) in scored_keys:
-                continue
-            # full-db electronic samples are not playable (proxy returns 500 / 404).
-            # full-db acoustic samples ARE playable via the gold-db proxy fallback.
-            if db_source == "full-db":
-                sample_dataset_type = str(sample.get("_dataset") or "").strip().lower()
-                if sample_dataset_type == "electronic":
+    samples: list[dict[str, Any]] = []
+    unused_total = 0
+
+    # Fast path: local anti-join against the synced sample catalog.
+    # Only sources whose every kind for this drum type finished a full sync; the rest are paged remotely.
+    local_sources = await synced_sources(session, DRUM_KIND_MAP[drum_type])
+    if local_sources:
+        rows, unused_total = await catalog_unused_samples(session, drum_type, requested_limit, local_sources)
+        samples = [build_sample_entry(row.source, row.raw) for row in rows]
+
+    # Sources without a completed catalog sync are still paged from the remote DBs.
+    remote_sources = [name for name in DB_SOURCES if name not in local_sources]
+    if len(samples) < requested_limit and remote_sources:
+        seen_ids = {entry["id"] for entry in samples}
+
+        async def append_unused_samples(remote_samples: list[dict[str, Any]], current: list[dict[str, Any]]) -> list[dict[str, Any]]:
+            samples = list(current)
+            candidates: list[tuple[str, dict[str, Any], str, str]] = []
+            for remote_sample in remote_samples:
+                sample = remote_sample.get("sample") or {}
+                db_source = str(remote_sample.get("db_source") or "gold-db")
+                filename = sample.get("Filename")
+                if not filename:
                     continue
-            sample_id = f"{dataset}:{filename}"
-            if any(existing["id"] == sample_id for existing in samples):
-                continue
-            kind = sample.get("Kind")
-            proxy_url = build_source_audio_proxy_url(str(dataset), str(filename), db_source)
-            samples.append(
-                {
-                    "id": sample_id,
-                    "dataset": dataset,
-                    "filename": filename,
-                    "db_source": db_source,
-                    "kind": kind,
-                    "drum_type": classify_drum_type(kind),
-                    "tags": to_prompt_tags(sample),
-                    "source_audio_proxy_url": proxy_url,
-                    "source_audio_url": sample.get("audio_url"),
-                    "raw_sample": sample,
-                    "source_json_for_model": normalize_sample_json_for_model(sample),
-                }
-            )
-            if len(samples) >= requested_limit:
-                break
-        return samples
-
-    try:
-        # Stage 1: fast path from gold-db.
-        gold_remote = await fetch_remote_samples(
-            DRUM_KIND_MAP[drum_type],
-            max(requested_limit * 6, 200),
-            source_names=["gold-db"],
-        )
-        samples = await append_unused_samples(gold_remote, [])
-
-        # Stage 2: only if needed, top up from full-db.
-        if len(samples) < requested_limit:
-            remaining_needed = requested_limit - len(samples)
-            full_remote = await fetch_remote_samples(
-                DRUM_KIND_MAP[drum_type],
-                max(remaining_needed * 12, 200),
-                source_names=["full-db"],
-            )
-            samples = await append_unused_samples(full_remote, samples)
-
-        # Fallback when kind filtering is inconsistent upstream.
-        if not samples:
-            all_known_kinds = sorted({kind for kinds in DRUM_KIND_MAP.values() for kind in kinds})
-            broad_samples = await fetch_remote_samples(
-                all_known_kinds,
-                max(requested_limit * 6, 200),
-                source_names=["gold-db", "full-db"],
-            )
-            typed = [
-                remote_sample
-                for remote_sample in broad_samples
-                if classify_drum_type((remote_sample.get("sample") or {}).get("Kind")) == drum_type
-            ]
-            samples = await append_unused_samples(typed, samples)
-    except Exception as exc:  # noqa: BLE001
-        raise HTTPException(status_code=502, detail=f"Failed to fetch source samples: {exc}") from exc
+                # full-db electronic samples are not playable (proxy returns 500 / 404).
+                # full-db acoustic samples ARE playable via the gold-db proxy fallback.
+                if db_source == "full-db":
+                    sample_dataset_type = str(sample.get("_dataset") or "").strip().lower()
+                    if sample_dataset_type == "electronic":
+                        continue
+                dataset = encode_source_dataset(db_source, str(sample.get("dataset") or "acoustic_drums"))
+                candidates.append((db_source, sample, dataset, str(filename)))
+
+            # Only the candidates' keys are looked up, via the (source_dataset, source_filename) index.
+            scored_keys = await scored_sample_keys(session, [(dataset, filename) for _, _, dataset, filename in candidates])
+            for db_source, sample, dataset, filename in candidates:
+                sample_id = f"{dataset}:{filename}"
+                if (dataset, filename) in scored_keys or sample_id in seen_ids:
+                    continue
+                seen_ids.add(sample_id)
+                samples.append(build_sample_entry(db_source, sample))
+                if len(samples) >= requested_limit:
+                    break
+            return samples
+
+        local_count = len(samples)
+        try:
+            # gold-db first; only if needed, top up from full-db.
+            for source_name in remote_sources:
+                if len(samples) >= requested_limit:
+                    break
+                remaining_needed = requested_limit - len(samples)
+                overfetch = 6 if source_name == "gold-db" else 12
+                remote = await fetch_remote_samples(
+                    DRUM_KIND_MAP[drum_type],
+                    max(remaining_needed * overfetch, 200),
+                    source_names=[source_name],
+                )
+                samples = await append_unused_samples(remote, samples)
+
+            # Fallback when kind filtering is inconsistent upstream.
+            if not samples:
+                all_known_kinds = sorted({kind for kinds in DRUM_KIND_MAP.values() for kind in kinds})
+                broad_samples = await fetch_remote_samples(
+                    all_known_kinds,
+                    max(requested_limit * 6, 200),
+                    source_names=remote_sources,
+                )
+                typed = [
+                    remote_sample
+                    for remote_sample in broad_samples
+                    if classify_drum_type((remote_sample.get("sample") or {}).get("Kind")) == drum_type
+                ]
+                samples = await append_unused_samples(typed, samples)
+        except Exception as exc:  # noqa: BLE001
+            raise HTTPException(status_code=502, detail=f"Failed to fetch source samples: {exc}") from exc
+        unused_total += len(samples) - local_count
 
     random.shuffle(samples)
     selected = samples[:requested_limit]
-    remaining_after_return = max(len(samples) - len(selected), 0)
+    remaining_after_return = max(unused_total - len(selected), 0)
+    prefetch_queued = 0
+    if prefetch_audio and selected and source_audio_cache.CACHE_ENABLED:
+        prefetch_queued = len(selected)
+        _prefetch_stats["queued"] += prefetch_queued
+        _background_tasks.add(task := asyncio.ensure_future(prefetch_source_audio(selected)))
+        task.add_done_callback(_background_tasks.discard)
     return {
         "samples": selected,
-        "unused_total": len(samples),
+        "prefetch_queued": prefetch_queued,
+        "unused_total": unused_total,
         "requested_limit": requested_limit,
         "remaining_after_return": remaining_after_return,
-        "depleted": len(samples) == 0,
+        "depleted": unused_total == 0,
         "message": (
             f"No unused samples left for {drum_type}."
-            if len(samples) == 0
+            if unused_total == 0
             else None
         ),
     }
 
 
+@router.get("/catalog")
+async def get_catalog_status(session: AsyncSession = Depends(get_session)) -> Dict[str, Any]:
+    """Row counts and sync cursors of the local gold-db/full-db sample catalog."""
+    return await catalog_status(session)
+
+
+@router.post("/catalog/sync", status_code=status.HTTP_202_ACCEPTED)
+async def trigger_catalog_sync(full: bool = Query(False)) -> Dict[str, Any]:
+    """Start a catalog sync in the background (``full`` re-walks every page)."""
+    _background_tasks.add(task := asyncio.ensure_future(sync_catalog(full=full)))
+    task.add_done_callback(_background_tasks.discard)
+    return {"status": "started", "full": full}
+
+
+async def _open_source_audio(client: httpx.AsyncClient, source_name: str, params: dict[str, str]) -> httpx.Response:
+    # Single attempt: the other sources are the fallback, and an open
+    # breaker skips a source that is known to be down.
+    response = await resilient_request(
+        client,
+        "GET",
+        f"{DB_SOURCES[source_name]}/api/proxy-audio",
+        max_attempts=1,
+        raise_for_status=False,
+        upstream=source_name,
+        stream=True,
+        params=params,
+    )
+    if response.status_code != 200:
+        await response.aclose()
+        raise LookupError(f"{source_name} returned {response.status_code}")
+    return response
+
+
+async def _hedged_open(client: httpx.AsyncClient, source_order: list[str], params: dict[str, str]) -> Optional[httpx.Response]:
+    """Open the first source that answers 200.
+
+    The next source starts as soon as the previous one fails, or after
+    SOURCE_AUDIO_HEDGE_DELAY if it is merely slow; the losers are cancelled.
+    """
+    remaining = list(source_order)
+    pending: set[asyncio.Task[httpx.Response]] = set()
+    try:
+        while remaining or pending:
+            if remaining:
+                pending.add(asyncio.ensure_future(_open_source_audio(client, remaining.pop(0), params)))
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=SOURCE_AUDIO_HEDGE_DELAY_SECONDS if remaining else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            winner: Optional[httpx.Response] = None
+            for task in done:
+                if task.exception() is not None:
+                    continue
+                if winner is None:
+                    winner = task.result()
+                else:
+                    await task.result().aclose()
+            if winner is not None:
+                return winner
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
+        for result in await asyncio.gather(*pending, return_exceptions=True):
+            if isinstance(result, httpx.Response):
+                await result.aclose()
+
+
+async def _stream_source_audio(requested_source: str, raw_dataset: str, filename: str, warm: bool) -> AsyncIterator[bytes]:
+    """Relay upstream chunks as they arrive, writing them into the source-audio cache on the way."""
+    params = {"dataset": raw_dataset, "filename": filename}
+    async with httpx.AsyncClient(verify=False, timeout=40.0) as client:
+        response = await _hedged_open(client, _source_audio_order(requested_source), params)
+        if response is None:
+            raise LookupError("Source audio not found")
+        writer = (
+            source_audio_cache.CacheWriter(_cache_source(requested_source), raw_dataset, filename, warm)
+            if source_audio_cache.CACHE_ENABLED
+            else None
+        )
+        try:
+            async for chunk in response.aiter_bytes():
+                if writer:
+                    await writer.write(chunk)
+                yield chunk
+            if writer:
+                await writer.commit()
+        finally:
+            await response.aclose()
+            if writer:
+                await writer.discard()
+
+
+def _source_audio_order(requested_source: str) -> list[str]:
+    if requested_source in DB_SOURCES:
+        # Always fall back to gold-db for audio (full-db acoustic files are
+        # served through the gold-db proxy, since full-db proxy often fails).
+        source_order = [requested_source]
+        if "gold-db" not in source_order:
+            source_order.append("gold-db")
+        return source_order
+    return ["gold-db", "full-db"]
+
+
+def _cache_source(requested_source: str) -> str:
+    return requested_source if requested_source in DB_SOURCES else "any"
+
+
+def _shared_source_audio(requested_source: str, raw_dataset: str, filename: str, warm: bool = False) -> AsyncIterator[bytes]:
+    """Subscribe to the download of one sample; concurrent requests share a single upstream stream."""
+    key = f"source-audio:{source_audio_cache.cache_key(_cache_source(requested_source), raw_dataset, filename)}"
+    return source_audio_flights.stream(
+        key,
+        lambda: _stream_source_audio(requested_source, raw_dataset, filename, warm),
+        max_replay_bytes=SOURCE_AUDIO_REPLAY_MAX_BYTES,
+    )
+
+
+async def cache_source_audio(requested_source: str, raw_dataset: str, filename: str, warm: bool = False) -> bool:
+    """Download a reference sample into the source-audio cache. Returns False if no source has it."""
+    try:
+        async for _chunk in _shared_source_audio(requested_source, raw_dataset, filename, warm):
+            pass
+    except LookupError:
+        return False
+    return True
+
+
+async def prefetch_source_audio(samples: list[dict[str, Any]]) -> None:
+    """Warm the source-audio cache for a sample batch, in order, within the prefetch caps.
+
+    The byte budget is checked before each download starts (sizes are unknown until
+    then), so a batch can overshoot it by at most the downloads already in flight.
+    """
+    pending = iter(samples)
+    remaining_bytes = SOURCE_AUDIO_PREFETCH_MAX_BYTES
+
+    async def worker() -> None:
+        nonlocal remaining_bytes
+        for sample in pending:
+            if remaining_bytes <= 0:
+                _prefetch_stats["over_budget"] += 1
+                continue
+            db_source = str(sample.get("db_source") or "")
+            _source, raw_dataset = decode_source_dataset(str(sample.get("dataset") or ""))
+            filename = str(sample.get("filename") or "")
+            if source_audio_cache.cached_size(_cache_source(db_source), raw_dataset, filename) is not None:
+                _prefetch_stats["already_cached"] += 1
+                continue
+            async with _prefetch_semaphore:
+                try:
+                    found = await cache_source_audio(db_source, raw_dataset, filename, warm=True)
+                except Exception as exc:  # noqa: BLE001
+                    logger.info("Source audio prefetch failed for %s: %s", filename, exc)
+                    found = False
+            size = source_audio_cache.cached_size(_cache_source(db_source), raw_dataset, filename) if found else None
+            if size is None:
+                _prefetch_stats["failed"] += 1
+                continue
+            _prefetch_stats["fetched"] += 1
+            remaining_bytes -= size
+
+    await asyncio.gather(*(worker() for _ in range(max(SOURCE_AUDIO_PREFETCH_CONCURRENCY, 1))))
+
+
 @router.get("/source-audio")
 async def proxy_source_audio(
     dataset: str,
     filename: str,
     db_source: Optional[str] = Query(None),
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    if_range: Optional[str] = Header(None, alias="If-Range"),
 ) -> Response:
     decoded_source, raw_dataset = decode_source_dataset(dataset)
     requested_source = (db_source or decoded_source or "").strip().lower()
-    if requested_source in DB_SOURCES:
-        # Always fall back to gold-db for audio (full-db acoustic files are
-        # served through the gold-db proxy, since full-db proxy often fails).
-        source_order = [requested_source]
-        if "gold-db" not in source_order:
-            source_order.append("gold-db")
-    else:
-        source_order = ["gold-db", "full-db"]
 
-    params = {"dataset": raw_dataset, "filename": filename}
-    async with httpx.AsyncClient(verify=False, timeout=40.0) as client:
-        for source_name in source_order:
-            source_base = DB_SOURCES[source_name]
-            try:
-                response = await client.get(f"{source_base}/api/proxy-audio", params=params)
-                if response.status_code == 200:
-                    return Response(content=response.content, media_type="audio/wav")
-            except Exception:  # noqa: BLE001
-                # Source unreachable / timeout — try next source.
-                continue
-    raise HTTPException(status_code=404, detail="Source audio not found")
+    path = source_audio_cache.lookup(_cache_source(requested_source), raw_dataset, filename)
+    if path is not None:
+        return source_audio_cache.cached_file_response(path, range_header, if_none_match, if_range)
 
+    # Miss: stream straight from the fastest healthy source (ranges are not honored here).
+    chunks = _shared_source_audio(requested_source, raw_dataset, filename)
+    try:
+        first_chunk = await chunks.__anext__()
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Source audio not found")
+    except StopAsyncIteration:
+        first_chunk = b""
 
-def _read_schema_from_disk() -> Dict[str, Any]:
-    """Read the V18 acoustic model schema from disk (no worker round-trip)."""
-    label_dict_path = V18_ONNX_DIR / "label_dictionaries.json"
-    with label_dict_path.open("r", encoding="utf-8") as handle:
-        raw = json.load(handle)
-    return {
-        "conditioning_params": V18_CONDITIONING_PARAMS,
-        "label_schema": {
-            "dictionaries": raw.get("dictionaries", {}),
-            "multi_value_cols": raw.get("multi_value_cols", []),
-            "dataset_type": raw.get("dataset_type", "unknown"),
-        },
-    }
+    async def relay() -> AsyncIterator[bytes]:
+        yield first_chunk
+        async for chunk in chunks:
+            yield chunk
+
+    return StreamingResponse(relay(), media_type="audio/wav")
+
+
+@router.get("/source-audio/cache")
+async def get_source_audio_cache_stats() -> Dict[str, Any]:
+    return {**source_audio_cache.cache_stats(), "prefetch": dict(_prefetch_stats)}
 
 
 @router.post("/generate")
-async def generate_from_tags(payload: GenerateModelAudioRequest) -> Dict[str, Any]:
-    schema = _read_schema_from_disk()
+async def generate_from_tags(
+    payload: GenerateModelAudioRequest,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER),
+) -> Dict[str, Any]:
+    # Identical concurrent requests (double clicks, re-renders) share one worker call.
+    key, retain_seconds, fingerprint = request_key("model-testing-generate", payload.model_dump(), idempotency_key)
+    try:
+        return await generation_flights.do(
+            key, lambda: _generate_from_tags(payload), retain_seconds=retain_seconds, fingerprint=fingerprint
+        )
+    except IdempotencyConflict as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{IDEMPOTENCY_HEADER} was already used with a different request.",
+        ) from exc
+
+
+async def _generate_into(client: ModelBetaClient, model_payload: Dict[str, Any], audio_id: str, output_path: Path) -> None:
+    """Generate audio into ``output_path``, directly by the worker when it shares AUDIO_DIR."""
+    global MODEL_DIRECT_STORE
+    if MODEL_DIRECT_STORE:
+        try:
+            stored = await client.generate_to_store(model_payload, audio_id)
+        except httpx.HTTPStatusError as exc:
+            if exc.response.status_code != 501:
+                raise
+            logger.info("Model worker has direct store disabled; transferring audio over HTTP")
+            MODEL_DIRECT_STORE = False
+        else:
+            if Path(stored.get("path", "")).resolve() == output_path.resolve() and output_path.exists():
+                return
+            logger.warning(
+                "Model worker stored audio at %s, not in %s; transferring audio over HTTP",
+                stored.get("path"),
+                AUDIO_DIR,
+            )
+            MODEL_DIRECT_STORE = False
+
+    audio_bytes, _sample_rate = await client.generate_audio(model_payload)
+    output_path.write_bytes(audio_bytes)
+
+
+async def _generate_from_tags(payload: GenerateModelAudioRequest) -> Dict[str, Any]:
+    schema = get_label_schema()
     labels = normalize_tags_for_model(payload.tags, schema)
     incoming_sliders = payload.sliders or {}
     model_payload = {
         "labels": labels,
-        "sliders": {name: float(incoming_sliders.get(name, 0)) for name in schema.get("conditioning_params", [])},
+        "sliders": {name: float(incoming_sliders.get(name, 0)) for name in V18_CONDITIONING_PARAMS},
         "temperature": payload.temperature,
         "width": payload.width,
     }
+    if payload.seed is not None:
+        model_payload["seed"] = payload.seed
 
+    audio_id = str(uuid4())
+    output_path = AUDIO_DIR / f"{audio_id}.wav"
     client = ModelBetaClient()
     try:
-        audio_bytes, _sample_rate = await client.generate_audio(model_payload)
+        await _generate_into(client, model_payload, audio_id, output_path)
+    except WorkerPoolUnavailable as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": str(exc.retry_after)}) from exc
+    except httpx.HTTPStatusError as exc:
+        if exc.response.status_code == 503:
+            # Worker queue is full: pass its load-shedding answer through instead of a 502.
+            raise HTTPException(
+                status_code=503,
+                detail="Model worker busy, retry shortly",
+                headers={"Retry-After": exc.response.headers.get("Retry-After", "1")},
+            ) from exc
+        raise HTTPException(status_code=502, detail=f"Model generation failed: {exc}") from exc
     except Exception as exc:  # noqa: BLE001
         ensure_model_worker_started()
         raise HTTPException(
             status_code=502,
             detail=(
-                f"Model generation failed (is the model worker running on port 8001?): {exc}"
+                f"Model generation failed (is the model worker running? see /api/model-beta/workers): {exc}"
             ),
         ) from exc
     finally:
         await client.close()
 
-    audio_id = str(uuid4())
-    output_path = AUDIO_DIR / f"{audio_id}.wav"
-    output_path.write_bytes(audio_bytes)
-
     return {
         "audio_id": audio_id,
         "audio_url": f"/api/audio/{audio_id}",
         "audio_file_path": f"audio_files/{audio_id}.wav",
         "applied_tags": labels,
         "model_version": MODEL_VERSION,
+        "seed": payload.seed,
     }
 
 
+async def _resolve_batch_samples(payload: BatchGenerateRequest, session: AsyncSession) -> list[dict[str, Any]]:
+    entries: list[dict[str, Any]] = []
+    keys: list[tuple[str, str, str]] = []
+    for sample_id in payload.sample_ids:
+        dataset, _sep, filename = sample_id.partition(":")
+        source, raw_dataset = decode_source_dataset(dataset)
+        if not filename or source is None:
+            raise HTTPException(status_code=400, detail=f"Invalid sample id: {sample_id}")
+        keys.append((source, raw_dataset, filename))
+
+    found = await catalog_samples_by_key(session, keys)
+    missing = [
+        f"{encode_source_dataset(source, dataset)}:{filename}"
+        for source, dataset, filename in keys
+        if (source, dataset, filename) not in found
+    ]
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail=f"{len(missing)} sample id(s) not in the sample catalog (pass them in 'samples' instead): {', '.join(missing[:5])}",
+        )
+    entries.extend(build_sample_entry(found[key].source, found[key].raw) for key in keys)
+
+    for sample in payload.samples:
+        db_source = str(sample.get("db_source") or "")
+        raw_sample = sample.get("raw_sample")
+        if db_source not in DB_SOURCES or not isinstance(raw_sample, dict):
+            raise HTTPException(status_code=400, detail="Each entry in 'samples' needs db_source and raw_sample")
+        entries.append(build_sample_entry(db_source, raw_sample))
+    return entries
+
+
+@router.post("/generate/batch", status_code=status.HTTP_202_ACCEPTED)
+async def start_batch_generation(
+    payload: BatchGenerateRequest,
+    session: AsyncSession = Depends(get_session),
+) -> Dict[str, Any]:
+    """Generate audio for many samples (x slider sets) as a background job; poll its results."""
+    entries = await _resolve_batch_samples(payload, session)
+    slider_sets = payload.slider_sets or [{}]
+    items = [(entry, sliders) for entry in entries for sliders in slider_sets]
+    if not items:
+        raise HTTPException(status_code=400, detail="No samples given")
+    if len(items) > MODEL_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch too large ({len(items)} > {MODEL_BATCH_MAX_ITEMS} generations)")
+
+    async def generate_item(item: tuple[dict[str, Any], Dict[str, float]]) -> dict[str, Any]:
+        entry, sliders = item
+        generated = await _generate_from_tags(
+            GenerateModelAudioRequest(
+                sample=entry["source_json_for_model"],
+                tags=entry["tags"],
+                sliders=sliders,
+                temperature=payload.temperature,
+                width=payload.width,
+                seed=payload.seed,
+            )
+        )
+        return {
+            "sample_id": entry["id"],
+            "sliders": sliders,
+            **generated,
+            # Body for POST /results once a score is added.
+            "result_payload": {
+                "source_dataset": entry["dataset"],
+                "source_filename": entry["filename"],
+                "source_kind": entry["kind"],
+                "source_audio_url": entry["source_audio_url"],
+                "source_metadata": entry["raw_sample"],
+                "applied_tags": generated["applied_tags"],
+                "generated_audio_id": generated["audio_id"],
+                "generated_audio_path": generated["audio_file_path"],
+            },
+        }
+
+    concurrency = min(payload.concurrency or MODEL_BATCH_CONCURRENCY, MODEL_BATCH_MAX_CONCURRENCY)
+    job = batch_jobs.start("model-testing-generate", items, generate_item, concurrency)
+    return job.snapshot()
+
+
+@router.get("/generate/batch")
+async def list_batch_generations() -> Dict[str, Any]:
+    return {"jobs": batch_jobs.list()}
+
+
+@router.get("/generate/batch/{job_id}")
+async def get_batch_generation(job_id: str, since: int = Query(0, ge=0)) -> Dict[str, Any]:
+    """Job progress plus the results that finished after the first ``since`` ones."""
+    job = batch_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    return job.snapshot(since)
+
+
+@router.delete("/generate/batch/{job_id}")
+async def cancel_batch_generation(job_id: str) -> Dict[str, Any]:
+    job = batch_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    return {"job_id": job.id, "status": "cancelling" if job.finished_at is None else job.status}
+
+
 @router.post("/results", status_code=status.HTTP_201_CREATED)
 async def create_result(payload: ModelTestResultCreate, session: AsyncSession = Depends(get_session)) -> Dict[str, Any]:
+    source_dataset = normalize_source_dataset(payload.source_dataset)
     existing = (
         await session.execute(
             select(ModelTestResult).where(
-                ModelTestResult.source_dataset == payload.source_dataset,
+                ModelTestResult.source_dataset == source_dataset,
                 ModelTestResult.source_filename == payload.source_filename,
             )
         )
@@ -522,9 +955,10 @@ async def create_result(payload: ModelTestResultCreate, session: AsyncSession =
         return {"id": existing.id, "already_exists": True}
 
     row = ModelTestResult(
-        source_dataset=payload.source_dataset,
+        source_dataset=source_dataset,
         source_filename=payload.source_filename,
         source_kind=payload.source_kind,
+        drum_type=classify_drum_type(payload.source_kind),
         source_audio_url=payload.source_audio_url,
         source_metadata=payload.source_metadata,
         applied_tags=payload.applied_tags,
@@ -535,23 +969,35 @@ async def create_result(payload: ModelTestResultCreate, session: AsyncSession =
         notes=payload.notes,
     )
     session.add(row)
-    await session.commit()
+    try:
+        await session.commit()
+    except IntegrityError:
+        # A concurrent request stored this sample first (unique source index).
+        await session.rollback()
+        existing_id = (
+            await session.execute(
+                select(ModelTestResult.id).where(
+                    ModelTestResult.source_dataset == source_dataset,
+                    ModelTestResult.source_filename == payload.source_filename,
+                )
+            )
+        ).scalar_one()
+        return {"id": existing_id, "already_exists": True}
     await session.refresh(row)
     return {"id": row.id}
 
 
-def serialize_result(row: ModelTestResult) -> dict[str, Any]:
+def serialize_result(row: Any, include_json: bool = True) -> dict[str, Any]:
+    """Serialize a result (an ORM row or a projected Row); JSON columns only with ``include_json``."""
     source_dataset = str(row.source_dataset)
     source_filename = str(row.source_filename)
-    return {
+    data = {
         "id": row.id,
         "source_dataset": source_dataset,
         "source_filename": source_filename,
         "source_kind": row.source_kind,
         "source_audio_url": row.source_audio_url,
         "source_audio_proxy_url": build_source_audio_proxy_url(source_dataset, source_filename),
-        "source_metadata": row.source_metadata,
-        "applied_tags": row.applied_tags,
         "generated_audio_id": row.generated_audio_id,
         "generated_audio_url": f"/api/audio/{row.generated_audio_id}" if row.generated_audio_id else None,
         "generated_audio_path": row.generated_audio_path,
@@ -559,23 +1005,129 @@ def serialize_result(row: ModelTestResult) -> dict[str, Any]:
         "score": row.score,
         "notes": row.notes,
         "tested_at": row.tested_at,
-        "drum_type": classify_drum_type(row.source_kind),
+        "drum_type": row.drum_type or classify_drum_type(row.source_kind),
     }
+    if include_json:
+        data["source_metadata"] = row.source_metadata
+        data["applied_tags"] = row.applied_tags
+    return data
+
+
+# Everything except the large JSON columns (source_metadata, applied_tags).
+RESULT_SUMMARY_COLUMNS = (
+    ModelTestResult.id,
+    ModelTestResult.source_dataset,
+    ModelTestResult.source_filename,
+    ModelTestResult.source_kind,
+    ModelTestResult.drum_type,
+    ModelTestResult.source_audio_url,
+    ModelTestResult.generated_audio_id,
+    ModelTestResult.generated_audio_path,
+    ModelTestResult.model_version,
+    ModelTestResult.score,
+    ModelTestResult.notes,
+    ModelTestResult.tested_at,
+)
+
+
+def _as_utc_naive(value: datetime) -> datetime:
+    # SQLite stores tested_at as naive UTC text; compare against the same form.
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+# tested_at text comes in two shapes: "YYYY-MM-DD HH:MM:SS" (server default, older rows) and
+# "YYYY-MM-DD HH:MM:SS.ffffff" (ORM default). Compare and order on one normalized form so the
+# two don't interleave wrongly as plain strings.
+_TESTED_AT_FORMAT = "%Y-%m-%d %H:%M:%f"
+_TESTED_AT_KEY = func.strftime(_TESTED_AT_FORMAT, ModelTestResult.tested_at)
+
+
+def _tested_at_value(value: datetime | str):
+    if isinstance(value, datetime):
+        value = _as_utc_naive(value).isoformat(sep=" ")
+    return func.strftime(_TESTED_AT_FORMAT, value)
+
+
+def _encode_results_cursor(tested_at: datetime, result_id: int) -> str:
+    raw = f"{_as_utc_naive(tested_at).isoformat(sep=' ')}|{result_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_results_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        tested_at, result_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+        return datetime.fromisoformat(tested_at), int(result_id)
+    except (ValueError, UnicodeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
 
 
 @router.get("/results")
 async def list_results(
     drum_type: Optional[str] = None,
+    min_score: Optional[int] = Query(None, ge=0, le=100),
+    max_score: Optional[int] = Query(None, ge=0, le=100),
+    tested_after: Optional[datetime] = None,
+    tested_before: Optional[datetime] = None,
+    model_version: Optional[str] = None,
+    has_notes: Optional[bool] = None,
+    include_json: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = Query(200, ge=1, le=1000),
     session: AsyncSession = Depends(get_session),
 ) -> Dict[str, Any]:
-    query = select(ModelTestResult).order_by(ModelTestResult.tested_at.desc())
-    rows = (await session.execute(query)).scalars().all()
+    """Newest-first results with filters applied in SQL and keyset (cursor) pagination.
+
+    Rows omit ``source_metadata`` / ``applied_tags`` unless ``include_json`` is set;
+    ``GET /results/{id}`` always returns the full row.
+    """
+    filters = []
+    if drum_type and drum_type != "all":
+        filters.append(ModelTestResult.drum_type == ("bass_drum" if drum_type == "kick" else drum_type))
+    if min_score is not None:
+        filters.append(ModelTestResult.score >= min_score)
+    if max_score is not None:
+        filters.append(ModelTestResult.score <= max_score)
+    if tested_after is not None:
+        filters.append(_TESTED_AT_KEY >= _tested_at_value(tested_after))
+    if tested_before is not None:
+        filters.append(_TESTED_AT_KEY < _tested_at_value(tested_before))
+    if model_version and model_version.strip():
+        filters.append(ModelTestResult.model_version == model_version)
+    if has_notes is not None:
+        has_notes_text = and_(ModelTestResult.notes.isnot(None), func.trim(ModelTestResult.notes) != "")
+        filters.append(has_notes_text if has_notes else not_(has_notes_text))
+
+    total = (
+        await session.execute(select(func.count()).select_from(ModelTestResult).where(*filters))
+    ).scalar() or 0
+
+    query = select(ModelTestResult) if include_json else select(*RESULT_SUMMARY_COLUMNS)
+    query = query.where(*filters)
+    if cursor:
+        cursor_tested_at, cursor_id = _decode_results_cursor(cursor)
+        cursor_key = _tested_at_value(cursor_tested_at)
+        query = query.where(
+            or_(
+                _TESTED_AT_KEY < cursor_key,
+                and_(_TESTED_AT_KEY == cursor_key, ModelTestResult.id < cursor_id),
+            )
+        )
+    query = query.order_by(_TESTED_AT_KEY.desc(), ModelTestResult.id.desc()).limit(limit + 1)
 
-    if drum_type:
-        normalized_filter = "bass_drum" if drum_type == "kick" else drum_type
-        rows = [row for row in rows if classify_drum_type(row.source_kind) == normalized_filter]
+    result = await session.execute(query)
+    rows = list(result.scalars().all() if include_json else result.all())
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_results_cursor(rows[-1].tested_at, rows[-1].id)
 
-    return {"results": [serialize_result(row) for row in rows]}
+    return {
+        "results": [serialize_result(row, include_json=include_json) for row in rows],
+        "total": total,
+        "next_cursor": next_cursor,
+    }
 
 
 @router.get("/results/{result_id}")
@@ -618,14 +1170,15 @@ async def delete_result(result_id: int, session: AsyncSession = Depends(get_sess
 
 @router.get("/dashboard")
 async def dashboard(session: AsyncSession = Depends(get_session)) -> Dict[str, Any]:
-    rows = (await session.execute(select(ModelTestResult))).scalars().all()
+    # One row per (drum_type, score); totals, averages and bands all derive from it.
+    rows = await session.execute(
+        select(ModelTestResult.drum_type, ModelTestResult.score, func.count())
+        .where(ModelTestResult.drum_type.in_(DRUM_KIND_MAP.keys()))
+        .group_by(ModelTestResult.drum_type, ModelTestResult.score)
+    )
 
     grouped: dict[str, dict[str, Any]] = {}
-    for row in rows:
-        drum_type = classify_drum_type(row.source_kind)
-        if drum_type == "other":
-            continue
-
+    for drum_type, score, count in rows.all():
         if drum_type not in grouped:
             grouped[drum_type] = {
                 "drum_type": drum_type,
@@ -636,13 +1189,14 @@ async def dashboard(session: AsyncSession = Depends(get_session)) -> Dict[str, A
                 "high_band_count": 0,
             }
 
-        grouped[drum_type]["total_results"] += 1
-        grouped[drum_type]["score_sum"] += row.score
-        grouped[drum_type]["score_distribution"][row.score] += 1
-        if row.score <= 50:
-            grouped[drum_type]["low_band_count"] += 1
+        grouped[drum_type]["total_results"] += count
+        grouped[drum_type]["score_sum"] += score * count
+        if score in grouped[drum_type]["score_distribution"]:
+            grouped[drum_type]["score_distribution"][score] += count
+        if score <= 50:
+            grouped[drum_type]["low_band_count"] += count
         else:
-            grouped[drum_type]["high_band_count"] += 1
+            grouped[drum_type]["high_band_count"] += count
 
     items = []
     for key in ["bass_drum", "snare", "low_tom", "mid_tom", "high_tom"]:
@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_session
 from ..models import Prompt, PromptCreate, PromptRead, TestResult
+from ..services import warm_pool
 
 logger = logging.getLogger(__name__)
 
@@ -79,6 +80,7 @@ async def get_next_prompt_in_rotation(
     current_difficulty: Optional[int] = None,
     exclude_id: Optional[int] = None,
     start_from_beginning: bool = False,
+    model_version: Optional[str] = None,
     session: AsyncSession = Depends(get_session)
 ) -> PromptRead:
     """
@@ -89,6 +91,8 @@ async def get_next_prompt_in_rotation(
     4. Only non-user-generated prompts
     5. Exclude a specific prompt ID to avoid repeats when skipping
     6. If start_from_beginning=True, always start from first drum type at difficulty 1
+    7. Within a slot, prefer prompts already pre-generated by the warm pool
+       (for model_version when given)
     """
     # Get all drum types ordered alphabetically
     drum_types_result = await session.execute(
@@ -130,6 +134,8 @@ async def get_next_prompt_in_rotation(
         next_drum_idx = random.randint(0, len(drum_types) - 1)
         next_difficulty = random.randint(1, 10)
     
+    warm_ids = warm_pool.warm_prompt_ids(model_version)
+
     # Try to find a prompt starting from the next position
     attempts = 0
     max_attempts = len(drum_types) * 10  # All possible combinations
@@ -148,7 +154,10 @@ async def get_next_prompt_in_rotation(
         if exclude_id is not None:
             stmt = stmt.where(Prompt.id != exclude_id)
         
-        stmt = stmt.order_by(func.random()).limit(1)
+        if warm_ids:
+            stmt = stmt.order_by(Prompt.id.in_(warm_ids).desc(), func.random()).limit(1)
+        else:
+            stmt = stmt.order_by(func.random()).limit(1)
         
         result = await session.execute(stmt)
         prompt = result.scalar_one_or_none()
@@ -2,20 +2,25 @@ from __future__ import annotations
 
 from __future__ import annotations
 
+import json
 import os
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Optional
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_session
+from ..database import async_session_maker, get_session
 from ..models import IllugenGeneration, Prompt
 from ..services.drumgen_client import DrumGenClient
 from ..services.illugen_client import IllugenClient
+from ..services import warm_pool
+from ..services.single_flight import IDEMPOTENCY_HEADER, IdempotencyConflict, generation_flights, request_key
 
 router = APIRouter()
 
@@ -55,74 +60,58 @@ class SendPromptResponse(BaseModel):
     illugen_error: Optional[str] = None
 
 
-async def get_client() -> DrumGenClient:
-    client = DrumGenClient()
-    try:
-        yield client
-    finally:
-        await client.close()
-
-
-async def get_illugen_client() -> IllugenClient:
-    client = IllugenClient()
-    try:
-        yield client
-    finally:
-        await client.close()
+def _drumgen_error(stage: str, exc: Exception) -> HTTPException:
+    """Map an upstream DrumGen failure to the 502 the frontend knows how to display."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        error_msg = f"DrumGen service error during {stage}: {exc.response.status_code} {exc.response.reason_phrase}"
+        if exc.response.status_code == 500:
+            error_msg = "The DrumGen service is temporarily unavailable (internal server error). Please try again in a moment."
+        return HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=error_msg)
+    return HTTPException(
+        status_code=status.HTTP_502_BAD_GATEWAY,
+        detail=f"Unable to connect to DrumGen service: {str(exc)}",
+    )
 
 
-@router.post("/send-prompt", response_model=SendPromptResponse, summary="Send prompt to DrumGen")
-async def send_prompt(
-    payload: SendPromptRequest,
-    session: AsyncSession = Depends(get_session),
-    client: DrumGenClient = Depends(get_client),
-    illugen_client: IllugenClient = Depends(get_illugen_client),
-) -> SendPromptResponse:
+async def _resolve_prompt(payload: SendPromptRequest, session: AsyncSession) -> tuple[Optional[Prompt], str]:
+    """Validate the request and load its prompt. used_count is bumped by the shared run."""
     prompt_text = payload.text
-    prompt_id: Optional[int] = payload.prompt_id
-    is_free_text = prompt_id is None
-
     prompt_obj: Optional[Prompt] = None
-    if prompt_id:
-        result = await session.execute(select(Prompt).where(Prompt.id == prompt_id))
+    if payload.prompt_id:
+        result = await session.execute(select(Prompt).where(Prompt.id == payload.prompt_id))
         prompt_obj = result.scalar_one_or_none()
         if not prompt_obj:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Prompt not found")
         prompt_text = prompt_obj.text
-        prompt_obj.used_count += 1
-        await session.commit()
     if not prompt_text:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Provide prompt_id or text.")
+    return prompt_obj, prompt_text
 
-    # Step 1: process text to JSON controls
+
+async def _process_llm(client: DrumGenClient, prompt_text: str, model_version: str) -> tuple[dict[str, Any], dict[str, Any], Optional[str]]:
+    """Step 1: process text to JSON controls. Returns (llm_data, controls, drum_type)."""
     try:
-        llm_data = await client.process_text(prompt_text, payload.model_version)
-    except httpx.HTTPStatusError as e:
-        error_msg = f"DrumGen service error during text processing: {e.response.status_code} {e.response.reason_phrase}"
-        if e.response.status_code == 500:
-            error_msg = "The DrumGen service is temporarily unavailable (internal server error). Please try again in a moment."
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=error_msg
-        ) from e
-    except httpx.RequestError as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Unable to connect to DrumGen service: {str(e)}"
-        ) from e
-    
+        llm_data = await client.process_text(prompt_text, model_version)
+    except (httpx.HTTPStatusError, httpx.RequestError) as e:
+        raise _drumgen_error("text processing", e) from e
+
     if not llm_data.get("success"):
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=f"LLM error: {llm_data.get('error')}")
     controls = llm_data.get("controls") or {}
-    
+
     # Extract drum type from LLM controls
     drum_type = None
     for key in ['Kind', 'kind', 'KIND']:
         if key in controls:
             drum_type = str(controls[key]).strip()
             break
+    return llm_data, controls, drum_type
 
-    # Step 2: generate audio
+
+async def _generate_and_store_audio(
+    client: DrumGenClient, controls: dict[str, Any], payload: SendPromptRequest
+) -> tuple[str, str]:
+    """Step 2: generate audio and save it locally. Returns (audio_id, audio_url)."""
     gen_payload = {
         "text_labels": controls,
         "condition_values": {},
@@ -133,20 +122,9 @@ async def send_prompt(
     }
     try:
         gen_data = await client.generate_audio(gen_payload)
-    except httpx.HTTPStatusError as e:
-        error_msg = f"DrumGen service error during audio generation: {e.response.status_code} {e.response.reason_phrase}"
-        if e.response.status_code == 500:
-            error_msg = "The DrumGen service is temporarily unavailable (internal server error). Please try again in a moment."
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=error_msg
-        ) from e
-    except httpx.RequestError as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Unable to connect to DrumGen service: {str(e)}"
-        ) from e
-    
+    except (httpx.HTTPStatusError, httpx.RequestError) as e:
+        raise _drumgen_error("audio generation", e) from e
+
     if not gen_data.get("success"):
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=f"Generate error: {gen_data.get('error')}")
 
@@ -157,92 +135,248 @@ async def send_prompt(
     # Download and save audio file locally
     try:
         audio_content = await client.fetch_audio(audio_id)
-    except httpx.HTTPStatusError as e:
-        error_msg = f"DrumGen service error during audio download: {e.response.status_code} {e.response.reason_phrase}"
-        if e.response.status_code == 500:
-            error_msg = "The DrumGen service is temporarily unavailable (internal server error). Please try again in a moment."
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=error_msg
-        ) from e
-    except httpx.RequestError as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Unable to connect to DrumGen service: {str(e)}"
-        ) from e
-    audio_filename = f"{audio_id}.wav"
-    audio_file_path = AUDIO_DIR / audio_filename
-    
+    except (httpx.HTTPStatusError, httpx.RequestError) as e:
+        raise _drumgen_error("audio download", e) from e
+    audio_file_path = AUDIO_DIR / f"{audio_id}.wav"
+
     with open(audio_file_path, "wb") as f:
         f.write(audio_content)
-    
-    audio_url = f"/api/audio/{audio_id}"  # Relative URL - frontend will add base
-    difficulty_val = prompt_obj.difficulty if prompt_obj else None
 
-    illugen_variations: list[dict[str, Any]] = []
-    illugen_generation_id: Optional[int] = None
-    illugen_error: Optional[str] = None
+    return audio_id, f"/api/audio/{audio_id}"  # Relative URL - frontend will add base
 
-    if payload.illugen:
-        try:
-            illugen_resp = await illugen_client.generate(prompt_text, payload.illugen_sfx_type)
-            request_id = illugen_resp.get("requestId") or illugen_resp.get("id")
-            variations = illugen_resp.get("variations") or []
-            if not request_id or not variations:
-                illugen_error = "Illugen response missing requestId or variations"
-            else:
-                target_dir = ILLUGEN_AUDIO_DIR / request_id
-                target_dir.mkdir(parents=True, exist_ok=True)
-                for var in variations:
-                    url = var.get("url")
-                    variation_id = var.get("variationId") or var.get("id")
-                    if not url or not variation_id:
-                        continue
-                    try:
-                        content = await illugen_client.download_file(url)
-                        filename = f"{variation_id}.wav"
-                        out_path = target_dir / filename
-                        out_path.write_bytes(content)
-                        illugen_variations.append(
-                            {
-                                "variation_id": variation_id,
-                                "order_index": var.get("orderIndex"),
-                                "serve_path": f"/api/illugen/audio/{request_id}/{filename}",
-                                "local_path": str(out_path),
-                                "source_url": url,
-                                "title": illugen_resp.get("title"),
-                                "sfx_type": illugen_resp.get("sfxType") or payload.illugen_sfx_type,
-                                "request_id": request_id,
-                            }
-                        )
-                    except Exception as download_exc:  # noqa: BLE001
-                        illugen_error = f"Failed to download variation {variation_id}: {download_exc}"
-
-                illugen_entry = IllugenGeneration(
-                    request_id=request_id,
-                    prompt_text=prompt_text,
-                    sfx_type=payload.illugen_sfx_type,
-                    variations={"items": illugen_variations},
+
+def _take_warm_result(payload: SendPromptRequest, prompt_obj: Optional[Prompt]) -> Optional[warm_pool.WarmResult]:
+    """Serve rotation prompts pre-generated by the warm pool, and report the tester's position to it."""
+    if prompt_obj is None:
+        return None
+    warm_pool.note_activity(payload.model_version, prompt_obj.drum_type, prompt_obj.difficulty, prompt_obj.id)
+    if not warm_pool.is_default_request(payload.temperature, payload.stereo_width, payload.generation_mode):
+        return None
+    return warm_pool.take(prompt_obj.id, payload.model_version, AUDIO_DIR)
+
+
+class IllugenRun:
+    """Accumulates the outcome of one Illugen generation while variations stream in."""
+
+    def __init__(self) -> None:
+        self.variations: list[dict[str, Any]] = []
+        self.generation_id: Optional[int] = None
+        self.error: Optional[str] = None
+
+
+async def _iter_illugen_variations(
+    illugen_client: IllugenClient,
+    session: AsyncSession,
+    prompt_text: str,
+    sfx_type: str,
+    run: IllugenRun,
+) -> AsyncIterator[dict[str, Any]]:
+    """Generate with Illugen, yielding each variation as soon as it is saved locally.
+
+    Errors never propagate; they are recorded on ``run.error`` so the DrumGen
+    result is still returned to the tester.
+    """
+    try:
+        illugen_resp = await illugen_client.generate(prompt_text, sfx_type)
+        request_id = illugen_resp.get("requestId") or illugen_resp.get("id")
+        variations = illugen_resp.get("variations") or []
+        if not request_id or not variations:
+            run.error = "Illugen response missing requestId or variations"
+            return
+
+        target_dir = ILLUGEN_AUDIO_DIR / request_id
+        target_dir.mkdir(parents=True, exist_ok=True)
+        for var in variations:
+            url = var.get("url")
+            variation_id = var.get("variationId") or var.get("id")
+            if not url or not variation_id:
+                continue
+            try:
+                content = await illugen_client.download_file(url)
+                filename = f"{variation_id}.wav"
+                out_path = target_dir / filename
+                out_path.write_bytes(content)
+            except Exception as download_exc:  # noqa: BLE001
+                run.error = f"Failed to download variation {variation_id}: {download_exc}"
+                continue
+            item = {
+                "variation_id": variation_id,
+                "order_index": var.get("orderIndex"),
+                "serve_path": f"/api/illugen/audio/{request_id}/{filename}",
+                "local_path": str(out_path),
+                "source_url": url,
+                "title": illugen_resp.get("title"),
+                "sfx_type": illugen_resp.get("sfxType") or sfx_type,
+                "request_id": request_id,
+            }
+            run.variations.append(item)
+            yield item
+
+        illugen_entry = IllugenGeneration(
+            request_id=request_id,
+            prompt_text=prompt_text,
+            sfx_type=sfx_type,
+            variations={"items": run.variations},
+        )
+        session.add(illugen_entry)
+        await session.commit()
+        await session.refresh(illugen_entry)
+        run.generation_id = illugen_entry.id
+    except Exception as exc:  # noqa: BLE001
+        run.error = f"Illugen generation failed: {exc}"
+
+
+async def _send_prompt_events(
+    payload: SendPromptRequest, prompt_obj: Optional[Prompt], prompt_text: str
+) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+    """Run one send-prompt, yielding (event, data) as each stage completes.
+
+    Ends with ``done`` (the full SendPromptResponse) or ``error``. Owns its
+    clients and session because it may outlive the request that started it.
+    """
+    client = DrumGenClient()
+    illugen_client = IllugenClient()
+    difficulty = prompt_obj.difficulty if prompt_obj else None
+    try:
+        async with async_session_maker() as session:
+            if prompt_obj:
+                await session.execute(
+                    update(Prompt).where(Prompt.id == prompt_obj.id).values(used_count=Prompt.used_count + 1)
                 )
-                session.add(illugen_entry)
                 await session.commit()
-                await session.refresh(illugen_entry)
-                illugen_generation_id = illugen_entry.id
-        except Exception as exc:  # noqa: BLE001
-            illugen_error = f"Illugen generation failed: {exc}"
-
-    # For free text, we don't create the prompt yet - user will tag it when scoring
-    return SendPromptResponse(
-        prompt_id=prompt_id,  # Will be None for free text
-        prompt_text=prompt_text,
-        difficulty=difficulty_val,
-        llm_controls=controls,
-        llm_response=llm_data.get("llm_response", ""),
-        audio_id=audio_id,
-        audio_url=audio_url,
-        drum_type=drum_type,
-        illugen_generation_id=illugen_generation_id,
-        illugen_variations=illugen_variations if illugen_variations else None,
-        illugen_error=illugen_error,
+
+            warm = _take_warm_result(payload, prompt_obj)
+            if warm:
+                llm_data, controls, drum_type = warm.llm_data, warm.controls, warm.drum_type
+            else:
+                llm_data, controls, drum_type = await _process_llm(client, prompt_text, payload.model_version)
+            yield "llm", {
+                "prompt_id": payload.prompt_id,
+                "prompt_text": prompt_text,
+                "difficulty": difficulty,
+                "llm_controls": controls,
+                "llm_response": llm_data.get("llm_response", ""),
+                "drum_type": drum_type,
+            }
+
+            if warm:
+                audio_id, audio_url = warm.audio_id, f"/api/audio/{warm.audio_id}"
+            else:
+                audio_id, audio_url = await _generate_and_store_audio(client, controls, payload)
+            yield "audio", {"audio_id": audio_id, "audio_url": audio_url}
+
+            run = IllugenRun()
+            if payload.illugen:
+                async for variation in _iter_illugen_variations(
+                    illugen_client, session, prompt_text, payload.illugen_sfx_type, run
+                ):
+                    yield "illugen_variation", variation
+
+        # For free text, we don't create the prompt yet - user will tag it when scoring
+        response = SendPromptResponse(
+            prompt_id=payload.prompt_id,  # Will be None for free text
+            prompt_text=prompt_text,
+            difficulty=difficulty,
+            llm_controls=controls,
+            llm_response=llm_data.get("llm_response", ""),
+            audio_id=audio_id,
+            audio_url=audio_url,
+            drum_type=drum_type,
+            illugen_generation_id=run.generation_id,
+            illugen_variations=run.variations if run.variations else None,
+            illugen_error=run.error,
+        )
+        yield "done", response.model_dump()
+    except HTTPException as exc:
+        yield "error", {"status_code": exc.status_code, "detail": exc.detail}
+    except Exception as exc:  # noqa: BLE001
+        yield "error", {"status_code": 500, "detail": str(exc)}
+    finally:
+        await client.close()
+        await illugen_client.close()
+
+
+async def _shared_send_prompt(
+    payload: SendPromptRequest, session: AsyncSession, idempotency_key: Optional[str]
+) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+    """Validate, then join (or start) the single shared run for this Idempotency-Key.
+
+    Double clicks and retries of one send carry the same key and subscribe to
+    one upstream run instead of each paying for a generation. Requests without
+    a key always run on their own: two testers sending the same rotation
+    prompt are separate samples, not duplicates.
+    """
+    # Validate the prompt up front so 400/404 stay regular HTTP errors.
+    prompt_obj, prompt_text = await _resolve_prompt(payload, session)
+    if not idempotency_key:
+        return _send_prompt_events(payload, prompt_obj, prompt_text)
+    key, retain_seconds, fingerprint = request_key("send-prompt", payload.model_dump(), idempotency_key)
+    try:
+        return generation_flights.stream(
+            key,
+            lambda: _send_prompt_events(payload, prompt_obj, prompt_text),
+            retain_seconds=retain_seconds,
+            fingerprint=fingerprint,
+            # Failures arrive as "error" events; only replay runs that finished.
+            succeeded=lambda event: event[0] == "done",
+        )
+    except IdempotencyConflict as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{IDEMPOTENCY_HEADER} was already used with a different request.",
+        ) from exc
+
+
+@router.post("/send-prompt", response_model=SendPromptResponse, summary="Send prompt to DrumGen")
+async def send_prompt(
+    payload: SendPromptRequest,
+    session: AsyncSession = Depends(get_session),
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER),
+) -> SendPromptResponse:
+    events = await _shared_send_prompt(payload, session, idempotency_key)
+    async for event, data in events:
+        if event == "done":
+            return SendPromptResponse(**data)
+        if event == "error":
+            raise HTTPException(status_code=data["status_code"], detail=data["detail"])
+    raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Generation ended without a result.")
+
+
+def _sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+@router.post("/send-prompt/stream", summary="Send prompt to DrumGen, streaming stage progress (SSE)")
+async def send_prompt_stream(
+    payload: SendPromptRequest,
+    session: AsyncSession = Depends(get_session),
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER),
+) -> StreamingResponse:
+    """Server-Sent Events variant of ``/send-prompt``.
+
+    Emits ``llm`` (controls), ``audio`` (audio-ready URL), one
+    ``illugen_variation`` per saved Illugen file, then ``done`` carrying the
+    same body ``/send-prompt`` returns. Upstream failures after the stream has
+    started are reported as an ``error`` event with ``status_code`` and ``detail``.
+    """
+    events = await _shared_send_prompt(payload, session, idempotency_key)
+
+    async def event_stream() -> AsyncIterator[str]:
+        async for event, data in events:
+            yield _sse_event(event, data)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
+
+@router.get("/warm-pool", summary="Warm pool state")
+async def warm_pool_state() -> dict[str, Any]:
+    return warm_pool.pool_state()
+
+
+@router.get("/single-flight", summary="Request de-duplication stats")
+async def single_flight_state() -> dict[str, Any]:
+    return generation_flights.stats()
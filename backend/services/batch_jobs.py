@@ -0,0 +1,129 @@
+"""
+In-memory batch jobs: run one coroutine per item with bounded concurrency and
+expose results incrementally while the job is still running.
+
+Results are appended in completion order and carry their item index, so a
+poller can ask for everything after the last result it has seen. Finished
+jobs are kept until BATCH_JOBS_MAX_RETAINED newer jobs exist.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Optional
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+MAX_RETAINED_JOBS = int(os.getenv("BATCH_JOBS_MAX_RETAINED", "20"))
+
+
+class BatchJob:
+    def __init__(self, kind: str, items: list[Any], concurrency: int) -> None:
+        self.id = uuid4().hex
+        self.kind = kind
+        self.items = items
+        self.concurrency = max(concurrency, 1)
+        self.status = "queued"
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.results: list[dict[str, Any]] = []
+        self.failed = 0
+        self.task: Optional[asyncio.Task[None]] = None
+
+    async def run(self, runner: Callable[[Any], Awaitable[dict[str, Any]]]) -> None:
+        self.status = "running"
+        pending = iter(enumerate(self.items))
+
+        async def worker() -> None:
+            for index, item in pending:
+                started = time.perf_counter()
+                try:
+                    entry = {"index": index, "ok": True, **await runner(item)}
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:  # noqa: BLE001
+                    detail = getattr(exc, "detail", None) or str(exc)
+                    entry = {"index": index, "ok": False, "error": detail}
+                    self.failed += 1
+                entry["seconds"] = round(time.perf_counter() - started, 3)
+                self.results.append(entry)
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+            self.status = "completed"
+        except asyncio.CancelledError:
+            self.status = "cancelled"
+        except Exception:  # noqa: BLE001
+            logger.exception("Batch job %s failed", self.id)
+            self.status = "failed"
+        finally:
+            self.finished_at = time.time()
+
+    def snapshot(self, since: int = 0) -> dict[str, Any]:
+        end = self.finished_at or time.time()
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "total": len(self.items),
+            "completed": len(self.results),
+            "failed": self.failed,
+            "elapsed_seconds": round(end - self.created_at, 1),
+            # Poll again with since=next_since to get only newer results.
+            "next_since": len(self.results),
+            "results": self.results[since:],
+        }
+
+
+class BatchJobRegistry:
+    def __init__(self) -> None:
+        self._jobs: dict[str, BatchJob] = {}
+
+    def start(
+        self,
+        kind: str,
+        items: list[Any],
+        runner: Callable[[Any], Awaitable[dict[str, Any]]],
+        concurrency: int,
+    ) -> BatchJob:
+        self._prune()
+        job = BatchJob(kind, items, concurrency)
+        self._jobs[job.id] = job
+        job.task = asyncio.ensure_future(job.run(runner))
+        return job
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[BatchJob]:
+        job = self._jobs.get(job_id)
+        if job is not None and job.task is not None and not job.task.done():
+            job.task.cancel()
+        return job
+
+    def list(self) -> list[dict[str, Any]]:
+        return [
+            {key: value for key, value in job.snapshot().items() if key != "results"}
+            for job in sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+        ]
+
+    def _prune(self) -> None:
+        finished = sorted(
+            (job for job in self._jobs.values() if job.finished_at is not None),
+            key=lambda job: job.created_at,
+        )
+        while len(self._jobs) >= MAX_RETAINED_JOBS and finished:
+            self._jobs.pop(finished.pop(0).id, None)
+
+    async def shutdown(self) -> None:
+        tasks = [job.task for job in self._jobs.values() if job.task is not None and not job.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+batch_jobs = BatchJobRegistry()
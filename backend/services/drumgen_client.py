@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-import asyncio
 import os
 from typing import Any, Dict, Optional
 
 import httpx
 
+from .upstream import resilient_request
+
 
 DRUMGEN_BASE_URL = os.getenv("DRUMGEN_BASE_URL", "https://dev-onla-drumgen-demo.waves.com")
 REQUEST_TIMEOUT = float(os.getenv("DRUMGEN_TIMEOUT", "30"))
@@ -19,25 +20,21 @@ class DrumGenClient:
         self.base_url = base_url.rstrip("/")
         self.client = httpx.AsyncClient(timeout=REQUEST_TIMEOUT, verify=False)
 
-    async def _request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
-        last_exc: Optional[Exception] = None
-        for attempt in range(1, MAX_RETRIES + 1):
-            try:
-                resp = await self.client.request(method, url, **kwargs)
-                resp.raise_for_status()
-                return resp
-            except Exception as exc:  # noqa: BLE001
-                last_exc = exc
-                if attempt == MAX_RETRIES:
-                    raise
-                await asyncio.sleep(1 * attempt)
-        if last_exc:
-            raise last_exc
-        raise RuntimeError("Unexpected request failure without exception.")
+    async def _request(self, method: str, url: str, idempotent: Optional[bool] = None, **kwargs: Any) -> httpx.Response:
+        return await resilient_request(
+            self.client,
+            method,
+            url,
+            max_attempts=MAX_RETRIES,
+            idempotent=idempotent,
+            upstream="drumgen",
+            **kwargs,
+        )
 
     async def process_text(self, text: str, model_version: str = "v15") -> Dict[str, Any]:
         url = f"{self.base_url}/process_text"
-        resp = await self._request("POST", url, json={"text": text, "model_version": model_version})
+        # Text processing has no side effects upstream, so it is safe to retry.
+        resp = await self._request("POST", url, idempotent=True, json={"text": text, "model_version": model_version})
         return resp.json()
 
     async def generate_audio(self, payload: Dict[str, Any]) -> Dict[str, Any]:
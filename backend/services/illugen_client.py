@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-import asyncio
 import os
 from typing import Any, Dict, List, Optional
 
 import httpx
 
+from .upstream import resilient_request
+
 ILLUGEN_BASE_URL = os.getenv(
     "ILLUGEN_BASE_URL", "https://test-onla-samplemaker-server.waves.com"
 )
@@ -21,21 +22,16 @@ class IllugenClient:
         self.base_url = base_url.rstrip("/")
         self.client = httpx.AsyncClient(timeout=REQUEST_TIMEOUT, verify=False)
 
-    async def _request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
-        last_exc: Optional[Exception] = None
-        for attempt in range(1, MAX_RETRIES + 1):
-            try:
-                resp = await self.client.request(method, url, **kwargs)
-                resp.raise_for_status()
-                return resp
-            except Exception as exc:  # noqa: BLE001
-                last_exc = exc
-                if attempt == MAX_RETRIES:
-                    raise
-                await asyncio.sleep(1 * attempt)
-        if last_exc:
-            raise last_exc
-        raise RuntimeError("Unexpected request failure without exception.")
+    async def _request(self, method: str, url: str, idempotent: Optional[bool] = None, **kwargs: Any) -> httpx.Response:
+        return await resilient_request(
+            self.client,
+            method,
+            url,
+            max_attempts=MAX_RETRIES,
+            idempotent=idempotent,
+            upstream="illugen",
+            **kwargs,
+        )
 
     async def generate(
         self,
@@ -5,28 +5,56 @@ from typing import Any, Dict, Tuple
 
 import httpx
 
+from backend.services.model_worker_manager import WORKER_COUNT, any_worker_url, manages_url, worker_lease
+
 
 MODEL_BETA_URL = os.getenv("MODEL_BETA_URL", "http://127.0.0.1:8001")
 MODEL_BETA_TIMEOUT = float(os.getenv("MODEL_BETA_TIMEOUT", "120"))
 
 
 class ModelBetaClient:
+    """HTTP client for the Model Beta worker.
+
+    Without an explicit ``base_url``, requests go through the supervised worker
+    pool (least-loaded ready worker) when MODEL_WORKER_COUNT > 1 or MODEL_BETA_URL
+    is the pool's own worker. Generate calls then wait for a worker to finish
+    loading instead of failing while the backend boots.
+    """
+
     def __init__(self, base_url: str | None = None) -> None:
+        self.pooled = base_url is None and (WORKER_COUNT > 1 or manages_url(MODEL_BETA_URL))
         self.base_url = (base_url or MODEL_BETA_URL).rstrip("/")
         self.client = httpx.AsyncClient(timeout=MODEL_BETA_TIMEOUT)
 
+    def _url(self, path: str) -> str:
+        return f"{any_worker_url() if self.pooled else self.base_url}{path}"
+
     async def get_schema(self) -> Dict[str, Any]:
-        resp = await self.client.get(f"{self.base_url}/schema")
+        resp = await self.client.get(self._url("/schema"))
         resp.raise_for_status()
         return resp.json()
 
+    async def _post_generate(self, payload: Dict[str, Any]) -> httpx.Response:
+        if not self.pooled:
+            resp = await self.client.post(f"{self.base_url}/generate", json=payload)
+            resp.raise_for_status()
+            return resp
+        async with worker_lease() as worker_url:
+            resp = await self.client.post(f"{worker_url}/generate", json=payload)
+            resp.raise_for_status()
+            return resp
+
     async def generate_audio(self, payload: Dict[str, Any]) -> Tuple[bytes, str | None]:
-        resp = await self.client.post(f"{self.base_url}/generate", json=payload)
-        resp.raise_for_status()
+        resp = await self._post_generate(payload)
         return resp.content, resp.headers.get("X-Sample-Rate")
 
+    async def generate_to_store(self, payload: Dict[str, Any], audio_id: str) -> Dict[str, Any]:
+        """Have the worker write the audio into its audio store as ``audio_id``; returns its metadata."""
+        resp = await self._post_generate({**payload, "store": {"audio_id": audio_id}})
+        return resp.json()
+
     async def get_health(self) -> Dict[str, Any]:
-        resp = await self.client.get(f"{self.base_url}/health")
+        resp = await self.client.get(self._url("/health"))
         resp.raise_for_status()
         return resp.json()
 
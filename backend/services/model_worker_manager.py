@@ -1,12 +1,136 @@
+"""
+Model Beta worker pool: spawn, supervise and route to ``model_beta_worker.py`` processes.
+
+MODEL_WORKER_COUNT workers listen on consecutive ports from
+MODEL_WORKER_BASE_PORT (8001). Each worker has its own ONNX session. With a
+single worker this behaves like the original one-process setup.
+
+A supervisor task polls every worker's /ready endpoint. A worker answers
+/ready with 503 while its model is loading or warming up and with 200 once it
+can generate. Requests go to the ready worker with the fewest requests in
+flight. Callers can wait for the first worker to become ready instead of
+failing during boot.
+
+Workers this backend spawned are restarted with exponential backoff when they
+exit or stop answering MODEL_WORKER_MAX_HEALTH_FAILURES polls in a row. A
+worker started by someone else is only replaced once its port is closed.
+Worker stdout/stderr go to rotating files in MODEL_WORKER_LOG_DIR. In a pool,
+each worker spills its result cache to its own subdirectory of
+MODEL_AUDIO_CACHE_DIR (``worker<index>``), since every worker prunes its
+cache directory to its own size cap.
+"""
+
 from __future__ import annotations
 
+import asyncio
+import logging
+import logging.handlers
+import math
 import os
 import socket
 import subprocess
 import sys
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any
-_WORKER_PROCESS: subprocess.Popen[Any] | None = None
+from typing import Any, AsyncIterator, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+WORKER_HOST = "127.0.0.1"
+WORKER_COUNT = max(int(os.getenv("MODEL_WORKER_COUNT", "1")), 1)
+WORKER_BASE_PORT = int(os.getenv("MODEL_WORKER_BASE_PORT", "8001"))
+HEALTH_INTERVAL_SECONDS = float(os.getenv("MODEL_WORKER_HEALTH_INTERVAL", "5"))
+# Poll faster while any worker is still starting, so it takes traffic as soon as it is warm.
+STARTING_POLL_SECONDS = float(os.getenv("MODEL_WORKER_STARTING_POLL", "0.5"))
+MAX_HEALTH_FAILURES = int(os.getenv("MODEL_WORKER_MAX_HEALTH_FAILURES", "3"))
+# A freshly spawned process may not be listening yet; unanswered polls don't trigger restarts until then.
+STARTUP_GRACE_SECONDS = float(os.getenv("MODEL_WORKER_STARTUP_GRACE", "60"))
+RESTART_BACKOFF_SECONDS = float(os.getenv("MODEL_WORKER_RESTART_BACKOFF", "1"))
+RESTART_BACKOFF_MAX_SECONDS = float(os.getenv("MODEL_WORKER_RESTART_BACKOFF_MAX", "60"))
+# How long a generate call waits for a worker to become ready before giving up.
+READY_WAIT_SECONDS = float(os.getenv("MODEL_WORKER_READY_WAIT", "120"))
+LOG_DIR = Path(os.getenv("MODEL_WORKER_LOG_DIR", str(PROJECT_ROOT / "logs")))
+LOG_MAX_BYTES = int(float(os.getenv("MODEL_WORKER_LOG_MAX_MB", "10")) * 1024 * 1024)
+LOG_BACKUPS = int(os.getenv("MODEL_WORKER_LOG_BACKUPS", "3"))
+LOG_TAIL_LINES = 20
+# Same default as the worker's --audio-cache-dir.
+AUDIO_CACHE_DIR = Path(os.getenv("MODEL_AUDIO_CACHE_DIR", str(PROJECT_ROOT / "model_audio_cache")))
+# Worker phases from which it can still become ready without a restart.
+STARTING_STATES = {"starting", "loading", "warming"}
+
+
+class WorkerPoolUnavailable(Exception):
+    """No worker is ready and none is on its way to ready (all crashed, failed or backing off)."""
+
+    def __init__(self, message: str, retry_after: int) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class WorkerSlot:
+    def __init__(self, index: int, port: int) -> None:
+        self.index = index
+        self.port = port
+        self.process: Optional[subprocess.Popen[str]] = None
+        # starting, loading, warming, ready, unreachable, backoff, failed (worker-reported phases pass through)
+        self.state = "stopped"
+        self.in_flight = 0
+        self.health_failures = 0
+        self.requests = 0
+        self.errors = 0
+        self.restarts = 0
+        self.crashes = 0
+        self.next_start_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.ready_at: Optional[float] = None
+        self.log_tail: deque[str] = deque(maxlen=LOG_TAIL_LINES)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{WORKER_HOST}:{self.port}"
+
+    @property
+    def owned(self) -> bool:
+        return self.process is not None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "index": self.index,
+            "url": self.base_url,
+            "pid": self.process.pid if self.process else None,
+            "owned": self.owned,
+            "state": self.state,
+            "ready": self.ready,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "restarts": self.restarts,
+            "consecutive_crashes": self.crashes,
+            "restart_in_seconds": round(max(self.next_start_at - time.time(), 0.0), 1) if self.next_start_at else None,
+            "health_failures": self.health_failures,
+            "last_error": self.last_error,
+            "uptime_seconds": round(time.time() - self.started_at, 1) if self.started_at else None,
+            "startup_seconds": round(self.ready_at - self.started_at, 1) if self.ready_at and self.started_at else None,
+            "log_file": str(_log_path(self.index)),
+            "log_tail": list(self.log_tail),
+        }
+
+
+_SLOTS = [WorkerSlot(index, WORKER_BASE_PORT + index) for index in range(WORKER_COUNT)]
+_monitor_task: Optional[asyncio.Task[None]] = None
+_ready_event: Optional[asyncio.Event] = None
+_log_handlers: dict[int, logging.Handler] = {}
 
 
 def _is_port_open(host: str, port: int) -> bool:
@@ -17,50 +141,305 @@ def _is_port_open(host: str, port: int) -> bool:
         return False
 
 
-def _resolve_worker_command() -> tuple[list[str], Path]:
-    project_root = Path(__file__).resolve().parents[2]
+def _resolve_worker_command(port: int) -> tuple[list[str], Path]:
     model_root = Path(os.environ.get("DRUMGEN_MODEL_ROOT", str(Path.home() / "Desktop" / "V18_Acoustic+Electronic")))
     onnx_dir = model_root / "onnx_exports" / "acoustic"
     python_bin = os.environ.get("MODEL_PYTHON_BIN", sys.executable)
 
     cmd = [
         python_bin,
-        str(project_root / "backend" / "model_beta_worker.py"),
+        str(PROJECT_ROOT / "backend" / "model_beta_worker.py"),
         "--model-root",
         str(model_root),
         "--onnx-dir",
         str(onnx_dir),
         "--host",
-        "127.0.0.1",
+        WORKER_HOST,
         "--port",
-        "8001",
+        str(port),
     ]
-    return cmd, project_root
+    return cmd, PROJECT_ROOT
 
 
-def ensure_model_worker_started() -> dict[str, Any]:
-    global _WORKER_PROCESS
+def _worker_env(index: int) -> dict[str, str]:
+    env = dict(os.environ)
+    # Line-buffered output, so the log files keep up with the worker.
+    env["PYTHONUNBUFFERED"] = "1"
+    if WORKER_COUNT > 1:
+        # Split the cores between workers instead of letting each one claim all of them.
+        threads = str(max((os.cpu_count() or 1) // WORKER_COUNT, 1))
+        env.setdefault("OMP_NUM_THREADS", threads)
+        env.setdefault("MODEL_ORT_INTRA_OP_THREADS", threads)
+        env["MODEL_AUDIO_CACHE_DIR"] = str(AUDIO_CACHE_DIR / f"worker{index}")
+    return env
+
 
-    if _is_port_open("127.0.0.1", 8001):
-        return {"status": "already_running"}
+def _log_path(index: int) -> Path:
+    return LOG_DIR / f"model_worker_{index}.log"
 
-    cmd, cwd = _resolve_worker_command()
-    _WORKER_PROCESS = subprocess.Popen(
+
+def _worker_logger(index: int) -> logging.Logger:
+    worker_logger = logging.getLogger(f"{__name__}.worker{index}")
+    if index not in _log_handlers:
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(
+            _log_path(index), maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        worker_logger.addHandler(handler)
+        worker_logger.setLevel(logging.INFO)
+        worker_logger.propagate = False
+        _log_handlers[index] = handler
+    return worker_logger
+
+
+def _pump_logs(slot: WorkerSlot, process: subprocess.Popen[str]) -> None:
+    worker_logger = _worker_logger(slot.index)
+    worker_logger.info("--- worker %s started (pid %s) ---", slot.index, process.pid)
+    assert process.stdout is not None
+    for line in process.stdout:
+        line = line.rstrip()
+        worker_logger.info(line)
+        slot.log_tail.append(line)
+    worker_logger.info("--- worker %s exited (code %s) ---", slot.index, process.wait())
+
+
+def _spawn(slot: WorkerSlot) -> None:
+    cmd, cwd = _resolve_worker_command(slot.port)
+    process = subprocess.Popen(
         cmd,
         cwd=str(cwd),
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
+        env=_worker_env(slot.index),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        errors="replace",
     )
-    return {"status": "started", "pid": _WORKER_PROCESS.pid}
+    threading.Thread(target=_pump_logs, args=(slot, process), name=f"model-worker-{slot.index}-logs", daemon=True).start()
+    slot.process = process
+    slot.started_at = time.time()
+    slot.ready_at = None
+    slot.next_start_at = None
+    slot.state = "starting"
+    slot.health_failures = 0
 
 
-def stop_model_worker() -> None:
-    global _WORKER_PROCESS
-    if _WORKER_PROCESS is None:
+def _terminate(slot: WorkerSlot) -> None:
+    if slot.process is None:
         return
     try:
-        _WORKER_PROCESS.terminate()
+        slot.process.terminate()
+        slot.process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        slot.process.kill()
     except Exception:
         pass
     finally:
-        _WORKER_PROCESS = None
+        slot.process = None
+
+
+def _schedule_restart(slot: WorkerSlot, reason: str) -> None:
+    slot.crashes += 1
+    delay = min(RESTART_BACKOFF_SECONDS * 2 ** (slot.crashes - 1), RESTART_BACKOFF_MAX_SECONDS)
+    slot.last_error = reason
+    slot.state = "backoff"
+    slot.next_start_at = time.time() + delay
+    logger.warning("Model worker %s %s; restarting in %.1fs", slot.index, reason, delay)
+
+
+def ensure_model_worker_started() -> dict[str, Any]:
+    """Start every pool worker that is not already running or waiting out a restart backoff."""
+    started = []
+    for slot in _SLOTS:
+        if slot.process is not None and slot.process.poll() is None:
+            continue
+        if slot.next_start_at is not None and time.time() < slot.next_start_at:
+            continue
+        if _is_port_open(WORKER_HOST, slot.port):
+            continue
+        _spawn(slot)
+        started.append(slot.process.pid)
+
+    if not started:
+        return {"status": "already_running", "workers": len(_SLOTS)}
+    if len(_SLOTS) == 1:
+        return {"status": "started", "pid": started[0]}
+    return {"status": "started", "pids": started, "workers": len(_SLOTS)}
+
+
+def stop_model_worker() -> None:
+    for slot in _SLOTS:
+        _terminate(slot)
+        slot.state = "stopped"
+        slot.next_start_at = None
+
+
+def manages_url(url: str) -> bool:
+    """Whether ``url`` points at a worker of this pool."""
+    return any(url.rstrip("/") == slot.base_url for slot in _SLOTS)
+
+
+def _pick_slot() -> WorkerSlot:
+    # Least-loaded ready worker; with none ready (e.g. no supervisor running), any worker.
+    candidates = [slot for slot in _SLOTS if slot.ready] or _SLOTS
+    return min(candidates, key=lambda slot: (slot.in_flight, slot.requests))
+
+
+def _update_ready_event() -> None:
+    if _ready_event is None:
+        return
+    if any(slot.ready for slot in _SLOTS):
+        _ready_event.set()
+    else:
+        _ready_event.clear()
+
+
+async def wait_until_ready(timeout: float = READY_WAIT_SECONDS) -> bool:
+    """Wait for a ready worker while the supervisor runs; returns whether one is ready.
+
+    Gives up as soon as no worker is starting, loading or warming, so a pool in
+    a crash loop fails fast instead of holding every request for ``timeout``.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        if any(slot.ready for slot in _SLOTS):
+            return True
+        if _monitor_task is None or _ready_event is None:
+            return False
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not any(slot.state in STARTING_STATES for slot in _SLOTS):
+            return False
+        try:
+            await asyncio.wait_for(_ready_event.wait(), min(remaining, STARTING_POLL_SECONDS))
+        except asyncio.TimeoutError:
+            pass
+
+
+def _retry_after() -> int:
+    restarts = [slot.next_start_at - time.time() for slot in _SLOTS if slot.next_start_at is not None]
+    return max(math.ceil(min(restarts)), 1) if restarts else max(math.ceil(HEALTH_INTERVAL_SECONDS), 1)
+
+
+@asynccontextmanager
+async def worker_lease() -> AsyncIterator[str]:
+    """Reserve the least-loaded ready worker for one request and yield its base URL.
+
+    While the supervisor runs and no worker is ready, raises WorkerPoolUnavailable
+    instead of sending the request to a worker that is known to be down.
+    """
+    if not await wait_until_ready() and _monitor_task is not None:
+        states = ", ".join(sorted({slot.state for slot in _SLOTS}))
+        raise WorkerPoolUnavailable(f"No model worker is ready ({states})", _retry_after())
+    slot = _pick_slot()
+    slot.in_flight += 1
+    slot.requests += 1
+    try:
+        yield slot.base_url
+    except Exception as exc:
+        slot.errors += 1
+        slot.last_error = str(exc)
+        if isinstance(exc, httpx.TransportError):
+            # Unreachable: stop routing here until the next poll says it is ready again.
+            slot.state = "unreachable"
+            _update_ready_event()
+        raise
+    finally:
+        slot.in_flight -= 1
+
+
+def any_worker_url() -> str:
+    return _pick_slot().base_url
+
+
+def worker_pool_state() -> dict[str, Any]:
+    return {
+        "workers": [slot.snapshot() for slot in _SLOTS],
+        "ready": sum(1 for slot in _SLOTS if slot.ready),
+        "size": len(_SLOTS),
+        "supervising": _monitor_task is not None,
+    }
+
+
+async def _probe(client: httpx.AsyncClient, slot: WorkerSlot) -> Optional[str]:
+    """The worker's phase ("ready", "loading", ...), or None if it did not answer."""
+    try:
+        response = await client.get(f"{slot.base_url}/ready")
+        if response.status_code == 404:
+            # Worker without a readiness endpoint: answering /health means ready.
+            response = await client.get(f"{slot.base_url}/health")
+            return "ready" if response.status_code == 200 else "starting"
+        return str(response.json().get("phase") or ("ready" if response.status_code == 200 else "starting"))
+    except Exception as exc:  # noqa: BLE001
+        slot.last_error = f"readiness check failed: {exc}"
+        return None
+
+
+async def _check(client: httpx.AsyncClient, slot: WorkerSlot) -> None:
+    if slot.process is not None and slot.process.poll() is not None:
+        code = slot.process.returncode
+        slot.process = None
+        _schedule_restart(slot, f"exited with code {code}")
+        return
+
+    if slot.process is None and slot.next_start_at is not None:
+        if time.time() >= slot.next_start_at:
+            slot.restarts += 1
+            _spawn(slot)
+        return
+
+    phase = await _probe(client, slot)
+    if phase is not None:
+        slot.health_failures = 0
+        if phase == "ready" and not slot.ready:
+            slot.ready_at = time.time()
+            logger.info("Model worker %s ready on %s", slot.index, slot.base_url)
+        if phase == "ready":
+            # Stayed up long enough to serve: later crashes start the backoff over.
+            slot.crashes = 0
+        slot.state = phase
+        return
+
+    slot.health_failures += 1
+    slot.state = "unreachable"
+    if slot.owned:
+        starting = slot.ready_at is None and slot.started_at is not None and time.time() - slot.started_at < STARTUP_GRACE_SECONDS
+        if starting:
+            # Spawned but not listening yet: still on its way to ready.
+            slot.state = "starting"
+        if slot.health_failures >= MAX_HEALTH_FAILURES and not starting:
+            await asyncio.to_thread(_terminate, slot)
+            _schedule_restart(slot, f"failed {slot.health_failures} readiness checks")
+    elif not _is_port_open(WORKER_HOST, slot.port):
+        # Someone else's worker went away; take the slot over.
+        slot.restarts += 1
+        _spawn(slot)
+
+
+async def _monitor() -> None:
+    async with httpx.AsyncClient(timeout=2.0) as client:
+        while True:
+            await asyncio.gather(*(_check(client, slot) for slot in _SLOTS))
+            _update_ready_event()
+            all_ready = all(slot.ready for slot in _SLOTS)
+            await asyncio.sleep(HEALTH_INTERVAL_SECONDS if all_ready else STARTING_POLL_SECONDS)
+
+
+def start_worker_monitor() -> None:
+    global _monitor_task, _ready_event
+    if _monitor_task is not None:
+        return
+    _ready_event = asyncio.Event()
+    _monitor_task = asyncio.get_running_loop().create_task(_monitor())
+    logger.info("Model worker supervisor started (%s worker(s) from port %s)", WORKER_COUNT, WORKER_BASE_PORT)
+
+
+async def stop_worker_monitor() -> None:
+    global _monitor_task
+    if _monitor_task is None:
+        return
+    _monitor_task.cancel()
+    try:
+        await _monitor_task
+    except asyncio.CancelledError:
+        pass
+    _monitor_task = None
@@ -0,0 +1,361 @@
+"""
+gold-db / full-db sample sources and the local catalog of their samples.
+
+A background task mirrors sample metadata from the remote databases into the
+``remote_samples`` table so ``/api/model-testing/samples`` can select unused
+samples with a local anti-join instead of paging through the remote APIs.
+
+Syncs are incremental: each (source, kind) keeps a page cursor and later syncs
+resume from the last, possibly partial, page. A full resync runs every
+CATALOG_FULL_RESYNC seconds. It walks from page 1 and drops rows that are no
+longer served.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+import httpx
+from sqlalchemy import and_, case, delete, exists, func, literal, not_, select, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import async_session_maker
+from ..models import ModelTestResult, RemoteSample, SampleCatalogSyncState
+from .upstream import resilient_request
+
+logger = logging.getLogger(__name__)
+
+DB_BASE_URL = os.getenv("DRUMGEN_DB_BASE_URL", "https://dev-onla-drumgen-demo.waves.com").rstrip("/")
+DB_SOURCES: dict[str, str] = {
+    "gold-db": f"{DB_BASE_URL}/gold-db",
+    "full-db": f"{DB_BASE_URL}/full-db",
+}
+
+DRUM_KIND_MAP: dict[str, list[str]] = {
+    "bass_drum": ["Bass Drum", "Kick"],
+    "snare": ["Snare", "Snare Piccolo", "Snare + Clap"],
+    "low_tom": ["Low Tom", "Floor Tom"],
+    "mid_tom": ["Mid Tom"],
+    "high_tom": ["High Tom", "Hi Tom"],
+}
+
+CATALOG_SYNC_ENABLED = os.getenv("CATALOG_SYNC_ENABLED", "1") not in {"0", "false", "False"}
+CATALOG_SYNC_INTERVAL_SECONDS = float(os.getenv("CATALOG_SYNC_INTERVAL", "900"))
+CATALOG_FULL_RESYNC_SECONDS = float(os.getenv("CATALOG_FULL_RESYNC", "86400"))
+CATALOG_PAGE_SIZE = 200
+# Keys per IN (...) lookup; two bound parameters each, well under SQLite's variable limit.
+SCORED_LOOKUP_CHUNK = 400
+
+
+def classify_drum_type(kind: Optional[str]) -> str:
+    normalized = (kind or "").strip().lower()
+    if "snare" in normalized:
+        return "snare"
+    if "kick" in normalized or "bass drum" in normalized:
+        return "bass_drum"
+    if "floor tom" in normalized or "low tom" in normalized:
+        return "low_tom"
+    if "mid tom" in normalized:
+        return "mid_tom"
+    if "high tom" in normalized or "hi tom" in normalized:
+        return "high_tom"
+    return "other"
+
+
+def dataset_param(source_name: str) -> str:
+    # gold-db uses "acoustic_drums", full-db uses "acoustic"
+    return "acoustic_drums" if source_name == "gold-db" else "acoustic"
+
+
+def _catalog_row(source_name: str, sample: dict[str, Any], synced_at: datetime) -> Optional[dict[str, Any]]:
+    filename = str(sample.get("Filename") or "")
+    if not filename:
+        return None
+    kind = sample.get("Kind")
+    return {
+        "source": source_name,
+        "dataset": str(sample.get("dataset") or "acoustic_drums"),
+        "filename": filename,
+        "kind": kind,
+        "drum_type": classify_drum_type(kind),
+        "velocity": str(sample.get("Velocity") or "").strip().lower() or None,
+        "dataset_type": str(sample.get("_dataset") or "").strip().lower() or None,
+        "raw": sample,
+        "synced_at": synced_at,
+    }
+
+
+async def _upsert_rows(session: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    if not rows:
+        return
+    stmt = sqlite_insert(RemoteSample).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["source", "dataset", "filename"],
+        set_={
+            column: stmt.excluded[column]
+            for column in ("kind", "drum_type", "velocity", "dataset_type", "raw", "synced_at")
+        },
+    )
+    await session.execute(stmt)
+
+
+async def _sync_kind(
+    client: httpx.AsyncClient,
+    source_name: str,
+    kind: str,
+    full: bool,
+    synced_at: datetime,
+) -> bool:
+    """Sync one (source, kind) walk. Returns False if the upstream failed mid-walk.
+
+    Each page is upserted and committed together with the cursor, so no write
+    transaction stays open across upstream requests and an interrupted walk
+    resumes from the last stored page.
+    """
+    async with async_session_maker() as session:
+        state = await session.get(SampleCatalogSyncState, (source_name, kind))
+        if state is None:
+            state = SampleCatalogSyncState(source=source_name, kind=kind, next_page=1)
+            session.add(state)
+            await session.commit()
+        full = full or state.last_full_sync_at is None
+        page = 1 if full else max(state.next_page, 1)
+
+        ok = True
+        while True:
+            params = {
+                "dataset": dataset_param(source_name),
+                "kind": kind,
+                "page": page,
+                "per_page": CATALOG_PAGE_SIZE,
+            }
+            try:
+                response = await resilient_request(
+                    client,
+                    "GET",
+                    f"{DB_SOURCES[source_name]}/api/samples",
+                    upstream=source_name,
+                    params=params,
+                )
+                page_samples = response.json().get("samples", [])
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Catalog sync of %s/%s stopped at page %s: %s", source_name, kind, page, exc)
+                ok = False
+                break
+
+            rows = [row for row in (_catalog_row(source_name, sample, synced_at) for sample in page_samples) if row]
+            await _upsert_rows(session, rows)
+            last_page = len(page_samples) < CATALOG_PAGE_SIZE
+            # Resume after this page, or from it again if it was the last (possibly partial) one.
+            state.next_page = page if last_page else page + 1
+            state.last_synced_at = synced_at
+            if last_page and full:
+                state.last_full_sync_at = synced_at
+            await session.commit()
+            if last_page:
+                break
+            page += 1
+
+        return ok
+
+
+async def _needs_full_sync(source_name: str) -> bool:
+    async with async_session_maker() as session:
+        oldest = (
+            await session.execute(
+                select(func.min(SampleCatalogSyncState.last_full_sync_at)).where(
+                    SampleCatalogSyncState.source == source_name
+                )
+            )
+        ).scalar()
+    if oldest is None:
+        return True
+    if oldest.tzinfo is None:
+        oldest = oldest.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - oldest > timedelta(seconds=CATALOG_FULL_RESYNC_SECONDS)
+
+
+_sync_lock = asyncio.Lock()
+
+
+async def sync_catalog(full: bool = False) -> dict[str, Any]:
+    """Run one catalog sync over every source and known kind."""
+    kinds = catalog_kinds()
+    summary: dict[str, Any] = {}
+    async with _sync_lock:
+        async with httpx.AsyncClient(verify=False, timeout=30.0) as client:
+            for source_name in DB_SOURCES:
+                synced_at = datetime.now(timezone.utc)
+                source_full = full or await _needs_full_sync(source_name)
+                results = [await _sync_kind(client, source_name, kind, source_full, synced_at) for kind in kinds]
+                removed = 0
+                if source_full and all(results):
+                    # Everything still served was touched by this sync; the rest is gone upstream.
+                    async with async_session_maker() as session:
+                        removed = (
+                            await session.execute(
+                                delete(RemoteSample).where(
+                                    RemoteSample.source == source_name,
+                                    RemoteSample.synced_at < synced_at,
+                                )
+                            )
+                        ).rowcount or 0
+                        await session.commit()
+                summary[source_name] = {"full": source_full, "ok": all(results), "removed": removed}
+    logger.info("Sample catalog sync finished: %s", summary)
+    return summary
+
+
+def catalog_kinds() -> list[str]:
+    return sorted({kind for kinds in DRUM_KIND_MAP.values() for kind in kinds})
+
+
+async def synced_sources(session: AsyncSession, kinds: Optional[list[str]] = None) -> list[str]:
+    """Sources whose catalog has completed a full sync of every one of ``kinds`` (default: all).
+
+    Kinds sync one after another, so a source is only served locally once none
+    of the requested kinds is still missing; until then callers page it remotely.
+    """
+    wanted = sorted(set(kinds or catalog_kinds()))
+    rows = await session.execute(
+        select(SampleCatalogSyncState.source)
+        .where(
+            SampleCatalogSyncState.kind.in_(wanted),
+            SampleCatalogSyncState.last_full_sync_at.isnot(None),
+        )
+        .group_by(SampleCatalogSyncState.source)
+        .having(func.count(SampleCatalogSyncState.kind) == len(wanted))
+    )
+    return [source for source in rows.scalars().all() if source in DB_SOURCES]
+
+
+def _already_scored():
+    """Correlated EXISTS matching a catalog row against scored results.
+
+    Results store ``"<source>|<dataset>"`` (legacy keys are normalized at startup), so
+    this is a single lookup on the (source_dataset, source_filename) unique index.
+    """
+    return exists().where(
+        ModelTestResult.source_dataset == RemoteSample.source + literal("|") + RemoteSample.dataset,
+        ModelTestResult.source_filename == RemoteSample.filename,
+    )
+
+
+async def scored_sample_keys(session: AsyncSession, keys: list[tuple[str, str]]) -> set[tuple[str, str]]:
+    """The subset of (source_dataset, source_filename) keys that already have a result."""
+    scored: set[tuple[str, str]] = set()
+    unique_keys = list(dict.fromkeys(keys))
+    for start in range(0, len(unique_keys), SCORED_LOOKUP_CHUNK):
+        chunk = unique_keys[start:start + SCORED_LOOKUP_CHUNK]
+        rows = await session.execute(
+            select(ModelTestResult.source_dataset, ModelTestResult.source_filename).where(
+                tuple_(ModelTestResult.source_dataset, ModelTestResult.source_filename).in_(chunk)
+            )
+        )
+        scored.update((str(dataset), str(filename)) for dataset, filename in rows.all())
+    return scored
+
+
+async def catalog_unused_samples(
+    session: AsyncSession,
+    drum_type: str,
+    limit: int,
+    sources: list[str],
+) -> tuple[list[RemoteSample], int]:
+    """Unused, playable catalog samples of ``drum_type`` (gold-db first) and their total count."""
+    conditions = [
+        RemoteSample.drum_type == drum_type,
+        RemoteSample.source.in_(sources),
+        func.coalesce(RemoteSample.velocity, "") != "quiet",
+        # full-db electronic samples are not playable.
+        not_(and_(RemoteSample.source == "full-db", func.coalesce(RemoteSample.dataset_type, "") == "electronic")),
+        ~_already_scored(),
+    ]
+    total = (await session.execute(select(func.count()).select_from(RemoteSample).where(*conditions))).scalar() or 0
+    rows = (
+        await session.execute(
+            select(RemoteSample)
+            .where(*conditions)
+            .order_by(case((RemoteSample.source == "gold-db", 0), else_=1), func.random())
+            .limit(limit)
+        )
+    ).scalars().all()
+    return list(rows), total
+
+
+async def catalog_samples_by_key(
+    session: AsyncSession,
+    keys: list[tuple[str, str, str]],
+) -> dict[tuple[str, str, str], RemoteSample]:
+    """Catalog rows for (source, dataset, filename) keys; missing keys are simply absent."""
+    found: dict[tuple[str, str, str], RemoteSample] = {}
+    unique_keys = list(dict.fromkeys(keys))
+    for start in range(0, len(unique_keys), SCORED_LOOKUP_CHUNK):
+        chunk = unique_keys[start:start + SCORED_LOOKUP_CHUNK]
+        rows = await session.execute(
+            select(RemoteSample).where(
+                tuple_(RemoteSample.source, RemoteSample.dataset, RemoteSample.filename).in_(chunk)
+            )
+        )
+        for row in rows.scalars().all():
+            found[(row.source, row.dataset, row.filename)] = row
+    return found
+
+
+async def catalog_status(session: AsyncSession) -> dict[str, Any]:
+    counts = await session.execute(
+        select(RemoteSample.source, func.count()).group_by(RemoteSample.source)
+    )
+    states = (await session.execute(select(SampleCatalogSyncState))).scalars().all()
+    return {
+        "enabled": CATALOG_SYNC_ENABLED,
+        "syncing": _sync_lock.locked(),
+        "rows": {source: count for source, count in counts.all()},
+        "streams": [
+            {
+                "source": state.source,
+                "kind": state.kind,
+                "next_page": state.next_page,
+                "last_synced_at": state.last_synced_at,
+                "last_full_sync_at": state.last_full_sync_at,
+            }
+            for state in states
+        ],
+    }
+
+
+_task: Optional[asyncio.Task[None]] = None
+
+
+async def _run() -> None:
+    while True:
+        try:
+            await sync_catalog()
+        except Exception:  # noqa: BLE001
+            logger.exception("Sample catalog sync failed")
+        await asyncio.sleep(CATALOG_SYNC_INTERVAL_SECONDS)
+
+
+def start_catalog_sync() -> None:
+    global _task
+    if not CATALOG_SYNC_ENABLED or _task is not None:
+        return
+    _task = asyncio.get_running_loop().create_task(_run())
+    logger.info("Sample catalog sync started (every %ss)", CATALOG_SYNC_INTERVAL_SECONDS)
+
+
+async def stop_catalog_sync() -> None:
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    _task = None
@@ -0,0 +1,259 @@
+"""
+Single-flight de-duplication of identical in-flight requests.
+
+Concurrent calls with the same key share one execution: the first caller runs
+the work as a task and later callers await the same result (``do``) or
+replay the same event stream from the beginning (``stream``). The task is
+detached from its callers, so a caller that disconnects does not cancel the
+work for the others. When a result is kept for ``retain_seconds`` (used for
+client Idempotency-Key headers), repeats within that window get the stored
+result instead of running again. Only successful runs are kept. Reusing an
+Idempotency-Key with a different payload raises ``IdempotencyConflict``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+import weakref
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL", "120"))
+
+
+def payload_hash(payload: Any) -> str:
+    """Stable hash of a JSON-serializable payload (key order does not matter)."""
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def canonical_key(namespace: str, payload: Any) -> str:
+    return f"{namespace}:{payload_hash(payload)}"
+
+
+class IdempotencyConflict(Exception):
+    """An Idempotency-Key was reused with a different request payload."""
+
+
+class _Cursor:
+    """Read position of one subscriber (absolute event index)."""
+
+    __slots__ = ("index", "__weakref__")
+
+    def __init__(self, index: int) -> None:
+        self.index = index
+
+
+class _Broadcast:
+    """Events produced by one shared run, replayable by any number of subscribers.
+
+    With ``max_replay_bytes`` (byte streams only) the replay buffer is bounded:
+    once more than that has been published, the run stops taking new
+    subscribers and drops every chunk its current subscribers have read.
+    """
+
+    def __init__(self, max_replay_bytes: Optional[int] = None) -> None:
+        self.events: list[Any] = []
+        self.finished = False
+        self.error: Optional[BaseException] = None
+        # False once early events were dropped; a late subscriber would miss them.
+        self.joinable = True
+        self._max_replay_bytes = max_replay_bytes
+        self._published_bytes = 0
+        self._base = 0  # absolute index of events[0]
+        # Subscribers that were never iterated (or were dropped) fall out on their own.
+        self._cursors: "weakref.WeakSet[_Cursor]" = weakref.WeakSet()
+        self._changed = asyncio.Event()
+
+    def publish(self, event: Any) -> None:
+        self.events.append(event)
+        if self._max_replay_bytes is not None:
+            self._published_bytes += len(event)
+            if self._published_bytes > self._max_replay_bytes:
+                self.joinable = False
+                self._trim()
+        self._notify()
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.finished = True
+        self.error = error
+        self._notify()
+
+    def _trim(self) -> None:
+        read = min((cursor.index for cursor in self._cursors), default=self._base + len(self.events))
+        if read > self._base:
+            del self.events[: read - self._base]
+            self._base = read
+
+    def _notify(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def subscribe(self) -> AsyncIterator[Any]:
+        # Register now, not on first iteration, so trimming never skips this subscriber.
+        cursor = _Cursor(self._base)
+        self._cursors.add(cursor)
+        return self._follow(cursor)
+
+    async def _follow(self, cursor: _Cursor) -> AsyncIterator[Any]:
+        try:
+            while True:
+                changed = self._changed
+                while cursor.index < self._base + len(self.events):
+                    event = self.events[cursor.index - self._base]
+                    cursor.index += 1
+                    yield event
+                if self.finished:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                await changed.wait()
+        finally:
+            self._cursors.discard(cursor)
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._in_flight: dict[str, Any] = {}
+        self._completed: dict[str, tuple[float, Any]] = {}
+        # Payload hash per in-flight or retained key, for keys that don't already encode it.
+        self._fingerprints: dict[str, str] = {}
+        # The event loop only keeps weak references to tasks.
+        self._producers: set[asyncio.Task[None]] = set()
+        self.shared_hits = 0
+        self.replayed_hits = 0
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        for key in [key for key, (expires, _result) in self._completed.items() if expires <= now]:
+            del self._completed[key]
+            if key not in self._in_flight:
+                self._fingerprints.pop(key, None)
+
+    def _claim(self, key: str, fingerprint: Optional[str]) -> None:
+        self._prune()
+        if fingerprint is None:
+            return
+        known = self._fingerprints.get(key)
+        if known is not None and known != fingerprint:
+            raise IdempotencyConflict(key)
+        if key in self._in_flight or key in self._completed:
+            return
+        self._fingerprints[key] = fingerprint
+
+    def _release(self, key: str, run: Any) -> None:
+        # A run that stopped taking subscribers may already have been replaced.
+        if self._in_flight.get(key) is not run:
+            return
+        del self._in_flight[key]
+        if key not in self._completed:
+            self._fingerprints.pop(key, None)
+
+    async def do(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[T]],
+        retain_seconds: float = 0.0,
+        fingerprint: Optional[str] = None,
+    ) -> T:
+        self._claim(key, fingerprint)
+        if key in self._completed:
+            self.replayed_hits += 1
+            return self._completed[key][1]
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._in_flight[key] = task
+
+            def _finish(done: asyncio.Task[Any]) -> None:
+                if retain_seconds > 0 and not done.cancelled() and done.exception() is None:
+                    self._completed[key] = (time.monotonic() + retain_seconds, done.result())
+                self._release(key, done)
+
+            task.add_done_callback(_finish)
+        else:
+            self.shared_hits += 1
+        return await asyncio.shield(task)
+
+    def stream(
+        self,
+        key: str,
+        factory: Callable[[], AsyncIterator[T]],
+        retain_seconds: float = 0.0,
+        fingerprint: Optional[str] = None,
+        succeeded: Optional[Callable[[T], bool]] = None,
+        max_replay_bytes: Optional[int] = None,
+    ) -> AsyncIterator[T]:
+        """Subscribe to the shared run of ``factory()``; every subscriber sees every event.
+
+        A retained stream is kept only if it raised nothing and, when given,
+        ``succeeded`` accepts its last event (streams that report failures as
+        events would otherwise be replayed as failures).
+
+        For byte streams, ``max_replay_bytes`` bounds what the run buffers for
+        late subscribers. Past it, callers with the same key start a new run
+        and the stream is never retained.
+        """
+        self._claim(key, fingerprint)
+        if key in self._completed:
+            self.replayed_hits += 1
+            return self._completed[key][1].subscribe()
+
+        broadcast = self._in_flight.get(key)
+        if broadcast is None:
+            broadcast = _Broadcast(max_replay_bytes)
+            self._in_flight[key] = broadcast
+
+            async def _produce() -> None:
+                error: Optional[BaseException] = None
+                try:
+                    async for event in factory():
+                        broadcast.publish(event)
+                        if not broadcast.joinable:
+                            self._release(key, broadcast)
+                except Exception as exc:  # noqa: BLE001
+                    error = exc
+                finally:
+                    broadcast.finish(error)
+                    ok = error is None and broadcast.joinable and (
+                        succeeded is None or (bool(broadcast.events) and succeeded(broadcast.events[-1]))
+                    )
+                    if retain_seconds > 0 and ok:
+                        self._completed[key] = (time.monotonic() + retain_seconds, broadcast)
+                    self._release(key, broadcast)
+
+            producer = asyncio.ensure_future(_produce())
+            self._producers.add(producer)
+            producer.add_done_callback(self._producers.discard)
+        else:
+            self.shared_hits += 1
+        return broadcast.subscribe()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "in_flight": len(self._in_flight),
+            "retained": len(self._completed),
+            "shared_hits": self.shared_hits,
+            "replayed_hits": self.replayed_hits,
+        }
+
+
+def request_key(namespace: str, payload: Any, idempotency_key: Optional[str]) -> tuple[str, float, Optional[str]]:
+    """Return (key, retain_seconds, fingerprint) for ``do``/``stream``.
+
+    Client idempotency keys are retained and carry the payload hash as their
+    fingerprint; payload-hash keys are not retained and need no fingerprint.
+    """
+    if idempotency_key:
+        return f"{namespace}:idem:{idempotency_key}", IDEMPOTENCY_TTL_SECONDS, payload_hash(payload)
+    return canonical_key(namespace, payload), 0.0, None
+
+
+generation_flights = SingleFlight()
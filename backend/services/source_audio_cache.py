@@ -0,0 +1,232 @@
+"""
+Content-addressed on-disk cache for gold-db / full-db reference audio.
+
+Entries are keyed by (source, dataset, filename) and named
+``<key hash>-<content hash>.wav``, so the content hash doubles as a strong
+ETag. Total size is capped at SOURCE_AUDIO_CACHE_MAX_MB; the least recently
+served entries are evicted first. Hits refresh the file mtime, so LRU order
+survives restarts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, BinaryIO, Optional
+from uuid import uuid4
+
+from fastapi.responses import FileResponse, Response
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+CACHE_DIR = Path(os.getenv("SOURCE_AUDIO_CACHE_DIR", str(PROJECT_ROOT / "source_audio_cache")))
+CACHE_ENABLED = os.getenv("SOURCE_AUDIO_CACHE_ENABLED", "1") not in {"0", "false", "False"}
+MAX_BYTES = int(float(os.getenv("SOURCE_AUDIO_CACHE_MAX_MB", "1024")) * 1024 * 1024)
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# key hash -> (path, size), least recently used first. Built lazily from CACHE_DIR.
+_index: Optional[OrderedDict[str, tuple[Path, int]]] = None
+_total_bytes = 0
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "stores": 0, "warmed": 0, "evictions": 0}
+
+
+def cache_key(source: str, dataset: str, filename: str) -> str:
+    return hashlib.sha256(f"{source}\0{dataset}\0{filename}".encode("utf-8")).hexdigest()[:32]
+
+
+def _load_index() -> OrderedDict[str, tuple[Path, int]]:
+    global _index, _total_bytes
+    if _index is None:
+        entries: list[tuple[float, str, Path, int]] = []
+        if CACHE_DIR.exists():
+            for path in CACHE_DIR.glob("*-*.wav"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, path.name.split("-", 1)[0], path, stat.st_size))
+        entries.sort()
+        _index = OrderedDict((key, (path, size)) for _mtime, key, path, size in entries)
+        _total_bytes = sum(size for _path, size in _index.values())
+    return _index
+
+
+def etag_for(path: Path) -> str:
+    return f'"{path.stem.split("-", 1)[1]}"'
+
+
+def lookup(source: str, dataset: str, filename: str) -> Optional[Path]:
+    """Return the cached file for a sample (marking it recently used), or None."""
+    if not CACHE_ENABLED:
+        return None
+    key = cache_key(source, dataset, filename)
+    with _lock:
+        index = _load_index()
+        entry = index.get(key)
+        if entry is None or not entry[0].exists():
+            index.pop(key, None)
+            _stats["misses"] += 1
+            return None
+        index.move_to_end(key)
+        _stats["hits"] += 1
+    try:
+        os.utime(entry[0])
+    except OSError:
+        pass
+    return entry[0]
+
+
+def cached_size(source: str, dataset: str, filename: str) -> Optional[int]:
+    """Size of a cached entry, or None. Does not count as a hit or touch LRU order."""
+    if not CACHE_ENABLED:
+        return None
+    with _lock:
+        entry = _load_index().get(cache_key(source, dataset, filename))
+    return entry[1] if entry else None
+
+
+class CacheWriter:
+    """Incrementally writes one entry (e.g. while streaming it to a client); ``commit`` publishes it.
+
+    Chunks are buffered and written in a worker thread every FLUSH_BYTES, so
+    the event loop relaying the stream never blocks on the disk.
+    """
+
+    FLUSH_BYTES = 256 * 1024
+
+    def __init__(self, source: str, dataset: str, filename: str, warm: bool = False) -> None:
+        self.key = cache_key(source, dataset, filename)
+        self.warm = warm
+        self.size = 0
+        self._digest = hashlib.sha256()
+        self._tmp_path = CACHE_DIR / f".{uuid4().hex}.tmp"
+        self._handle: Optional[BinaryIO] = None
+        self._pending: list[bytes] = []
+        self._pending_bytes = 0
+        self._opened = False
+        self._committed = False
+
+    async def write(self, chunk: bytes) -> None:
+        self._digest.update(chunk)
+        self.size += len(chunk)
+        self._pending.append(chunk)
+        self._pending_bytes += len(chunk)
+        if self._pending_bytes >= self.FLUSH_BYTES:
+            await asyncio.to_thread(self._flush)
+
+    async def commit(self) -> Path:
+        return await asyncio.to_thread(self._commit)
+
+    async def discard(self) -> None:
+        """Drop the partial file (no-op after ``commit``)."""
+        if self._opened and not self._committed:
+            await asyncio.to_thread(self._discard)
+
+    def _flush(self) -> None:
+        pending, self._pending, self._pending_bytes = self._pending, [], 0
+        if self._handle is None:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            self._handle = self._tmp_path.open("wb")
+            self._opened = True
+        self._handle.writelines(pending)
+
+    def _commit(self) -> Path:
+        self._flush()
+        assert self._handle is not None
+        self._handle.close()
+        self._handle = None
+        path = CACHE_DIR / f"{self.key}-{self._digest.hexdigest()[:32]}.wav"
+        os.replace(self._tmp_path, path)
+        self._committed = True
+        _add_entry(self.key, path, self.size, self.warm)
+        return path
+
+    def _discard(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        self._tmp_path.unlink(missing_ok=True)
+
+
+def _add_entry(key: str, path: Path, size: int, warm: bool) -> None:
+    global _total_bytes
+    evicted: list[Path] = []
+    with _lock:
+        index = _load_index()
+        previous = index.pop(key, None)
+        if previous is not None:
+            _total_bytes -= previous[1]
+            if previous[0] != path:
+                evicted.append(previous[0])
+        index[key] = (path, size)
+        _total_bytes += size
+        _stats["warmed" if warm else "stores"] += 1
+        while _total_bytes > MAX_BYTES and len(index) > 1:
+            _old_key, (old_path, old_size) = index.popitem(last=False)
+            _total_bytes -= old_size
+            evicted.append(old_path)
+            _stats["evictions"] += 1
+    for old_path in evicted:
+        old_path.unlink(missing_ok=True)
+
+
+def cache_stats() -> dict[str, Any]:
+    with _lock:
+        index = _load_index()
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            "enabled": CACHE_ENABLED,
+            "entries": len(index),
+            "bytes": _total_bytes,
+            "max_bytes": MAX_BYTES,
+            "hit_rate": round(_stats["hits"] / lookups, 3) if lookups else None,
+            **_stats,
+        }
+
+
+def cached_file_response(
+    path: Path,
+    range_header: Optional[str] = None,
+    if_none_match: Optional[str] = None,
+    if_range: Optional[str] = None,
+    media_type: str = "audio/wav",
+) -> Response:
+    """Serve a cached file with ETag revalidation and single byte-range support."""
+    etag = etag_for(path)
+    headers = {"ETag": etag, "Accept-Ranges": "bytes", "Cache-Control": "private, max-age=86400"}
+    if if_none_match and etag in {tag.strip() for tag in if_none_match.split(",")}:
+        return Response(status_code=304, headers=headers)
+
+    # Multi-range requests, and ranges whose If-Range validator is stale, get the full body.
+    match = _RANGE_RE.match(range_header.strip()) if range_header else None
+    if match and (not if_range or if_range.strip() == etag):
+        size = path.stat().st_size
+        first, last = match.groups()
+        if first:
+            start, end = int(first), min(int(last), size - 1) if last else size - 1
+        elif last:
+            start, end = max(size - int(last), 0), size - 1
+        else:
+            start, end = 0, -1
+        if start > end or start >= size:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        with path.open("rb") as handle:
+            handle.seek(start)
+            body = handle.read(end - start + 1)
+        return Response(
+            content=body,
+            status_code=206,
+            media_type=media_type,
+            headers={**headers, "Content-Range": f"bytes {start}-{end}/{size}"},
+        )
+
+    return FileResponse(path, media_type=media_type, headers=headers)
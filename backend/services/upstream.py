@@ -0,0 +1,249 @@
+"""
+Shared resilience layer for calls to upstream Waves hosts (DrumGen, Illugen, gold-db/full-db).
+
+Every request goes through a per-host concurrency cap and circuit breaker, and
+failed attempts are retried with exponential backoff plus full jitter. Only
+errors that are safe to retry are retried: connection failures and 429/503
+for any method, and additionally timeouts and 500/502/504 for idempotent
+requests. Other 4xx responses fail immediately.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENCY_PER_HOST = int(os.getenv("UPSTREAM_MAX_CONCURRENCY", "8"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("UPSTREAM_BREAKER_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("UPSTREAM_BREAKER_RESET", "30"))
+BACKOFF_BASE_SECONDS = float(os.getenv("UPSTREAM_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX_SECONDS = float(os.getenv("UPSTREAM_BACKOFF_MAX", "8"))
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+# Statuses where the upstream did not act on the request, so any method may retry.
+ALWAYS_RETRYABLE_STATUSES = {429, 503}
+# Statuses that may have been partially processed; only idempotent requests retry.
+IDEMPOTENT_RETRYABLE_STATUSES = {500, 502, 504}
+# Transport errors raised before the request reached the upstream.
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class CircuitOpenError(httpx.RequestError):
+    """Raised without contacting the upstream while its circuit breaker is open."""
+
+    def __init__(self, host: str, retry_in: float) -> None:
+        super().__init__(f"{host} is unavailable (circuit open, retrying in {retry_in:.0f}s)")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open -> half_open -> closed."""
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_seconds: float = BREAKER_RESET_SECONDS,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    def retry_in(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(self.reset_seconds - (time.monotonic() - self.opened_at), 0.0)
+
+    def allow_request(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            if self.retry_in() > 0:
+                return False
+            self.state = "half_open"
+        # Half-open: let a single probe through until it succeeds or fails.
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def release_probe(self) -> None:
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                logger.warning("Circuit opened after %s consecutive failures", self.consecutive_failures)
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+class UpstreamHost:
+    """Concurrency cap, breaker and counters for a single upstream."""
+
+    def __init__(self, host: str, max_concurrency: int = MAX_CONCURRENCY_PER_HOST) -> None:
+        self.host = host
+        self.max_concurrency = max_concurrency
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.breaker = CircuitBreaker()
+        self.in_flight = 0
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "retry_in_seconds": round(self.breaker.retry_in(), 1),
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "rejected": self.rejected,
+        }
+
+
+_HOSTS: dict[str, UpstreamHost] = {}
+
+
+def get_host(url: str, upstream: Optional[str] = None) -> UpstreamHost:
+    """Return the registry entry for ``upstream`` (defaults to the URL's host).
+
+    gold-db, full-db and DrumGen share a hostname but fail independently, so
+    callers name their upstream explicitly.
+    """
+    host = upstream or urlsplit(url).netloc or url
+    entry = _HOSTS.get(host)
+    if entry is None:
+        entry = _HOSTS[host] = UpstreamHost(host)
+    return entry
+
+
+def upstream_state() -> dict[str, dict[str, Any]]:
+    """Return breaker/concurrency state for every upstream contacted so far."""
+    return {host: entry.snapshot() for host, entry in sorted(_HOSTS.items())}
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Full-jitter exponential backoff, honoring a numeric Retry-After header."""
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_MAX_SECONDS)
+        except ValueError:
+            pass
+    ceiling = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** (attempt - 1)))
+    return random.uniform(0, ceiling)
+
+
+def _is_retryable(exc: Exception, idempotent: bool) -> bool:
+    if isinstance(exc, CircuitOpenError):
+        return False
+    if isinstance(exc, httpx.HTTPStatusError):
+        code = exc.response.status_code
+        return code in ALWAYS_RETRYABLE_STATUSES or (idempotent and code in IDEMPOTENT_RETRYABLE_STATUSES)
+    if isinstance(exc, NOT_SENT_ERRORS):
+        return True
+    return idempotent and isinstance(exc, httpx.TransportError)
+
+
+def _counts_as_host_failure(exc: Exception) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500 or exc.response.status_code == 429
+    return isinstance(exc, httpx.TransportError)
+
+
+async def resilient_request(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    *,
+    max_attempts: int = 3,
+    idempotent: Optional[bool] = None,
+    raise_for_status: bool = True,
+    upstream: Optional[str] = None,
+    stream: bool = False,
+    **kwargs: Any,
+) -> httpx.Response:
+    """Send a request through the host's semaphore and breaker, retrying safe failures.
+
+    ``idempotent`` defaults to whether ``method`` is idempotent; pass ``True`` for
+    POST endpoints that are safe to repeat. With ``raise_for_status=False`` non-2xx
+    responses are returned to the caller (5xx still count against the breaker).
+    With ``stream=True`` the body is not read; the caller must close the response.
+    """
+    entry = get_host(url, upstream)
+    if idempotent is None:
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+
+    attempt = 0
+    while True:
+        attempt += 1
+        if not entry.breaker.allow_request():
+            entry.rejected += 1
+            raise CircuitOpenError(entry.host, entry.breaker.retry_in())
+
+        retry_after: Optional[str] = None
+        try:
+            async with entry.semaphore:
+                entry.in_flight += 1
+                entry.requests += 1
+                try:
+                    if stream:
+                        resp = await client.send(client.build_request(method, url, **kwargs), stream=True)
+                    else:
+                        resp = await client.request(method, url, **kwargs)
+                finally:
+                    entry.in_flight -= 1
+            if resp.status_code >= 500 or resp.status_code == 429:
+                retry_after = resp.headers.get("Retry-After")
+                resp.raise_for_status()
+            entry.breaker.record_success()
+            if raise_for_status:
+                resp.raise_for_status()
+            return resp
+        except Exception as exc:  # noqa: BLE001
+            if _counts_as_host_failure(exc):
+                entry.failures += 1
+                entry.breaker.record_failure()
+            if attempt < max_attempts and _is_retryable(exc, idempotent):
+                if stream and isinstance(exc, httpx.HTTPStatusError):
+                    await exc.response.aclose()
+                entry.retries += 1
+                delay = backoff_delay(attempt, retry_after)
+                logger.info(
+                    "Retrying %s %s in %.2fs after %r (attempt %s/%s)",
+                    method, url, delay, exc, attempt, max_attempts,
+                )
+                await asyncio.sleep(delay)
+                continue
+            if not raise_for_status and isinstance(exc, httpx.HTTPStatusError):
+                return exc.response
+            if stream and isinstance(exc, httpx.HTTPStatusError):
+                await exc.response.aclose()
+            raise
+        finally:
+            # A cancelled or unexpected failure must not leave a half-open probe stuck.
+            entry.breaker.release_probe()
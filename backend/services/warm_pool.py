@@ -0,0 +1,347 @@
+"""
+Background pre-generation of DrumGen results for upcoming rotation prompts.
+
+For every model_version used recently, a worker looks ahead K slots in the
+prompt rotation (drum type x difficulty 1-10, least-used prompts first), runs
+process_text + generate + audio download for one prompt per slot, and parks
+the result on disk. ``send-prompt`` then serves a warm prompt straight from
+the pool instead of waiting on DrumGen.
+
+Only requests with the default generation settings are pre-generated, and each
+warm entry is consumed once. Slots that already have a warm prompt are not
+generated again, and entries that fall behind the tester's position are
+dropped. The pool is also bounded by entry count and age; the oldest entries
+are evicted first.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from sqlalchemy import func, select
+
+from ..database import async_session_maker
+from ..models import Prompt
+from .drumgen_client import DrumGenClient
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+WARM_POOL_DIR = PROJECT_ROOT / "warm_pool"
+
+WARM_POOL_ENABLED = os.getenv("WARM_POOL_ENABLED", "1") not in {"0", "false", "False"}
+LOOKAHEAD = int(os.getenv("WARM_POOL_LOOKAHEAD", "3"))
+MAX_ENTRIES = int(os.getenv("WARM_POOL_MAX_ENTRIES", "30"))
+ENTRY_TTL_SECONDS = float(os.getenv("WARM_POOL_TTL", "3600"))
+ACTIVE_WINDOW_SECONDS = float(os.getenv("WARM_POOL_ACTIVE_WINDOW", "900"))
+POLL_SECONDS = float(os.getenv("WARM_POOL_POLL", "10"))
+
+# Only requests using these send-prompt settings can be served from the pool.
+DEFAULT_SETTINGS = {"temperature": 1.0, "stereo_width": 0.5, "generation_mode": "generate"}
+
+
+@dataclass
+class WarmResult:
+    prompt_id: int
+    model_version: str
+    llm_data: dict[str, Any]
+    controls: dict[str, Any]
+    drum_type: Optional[str]
+    audio_id: str
+
+
+# model_version -> (last_seen, drum_type, difficulty, prompt_id)
+_activity: dict[str, tuple[float, str, int, int]] = {}
+_wake = asyncio.Event()
+_task: Optional[asyncio.Task[None]] = None
+_stats = {"hits": 0, "misses": 0, "generated": 0, "failed": 0, "evicted": 0}
+
+
+def _safe_version(model_version: str) -> str:
+    return "".join(ch for ch in model_version if ch.isalnum() or ch in "-_.") or "default"
+
+
+def _entry_path(prompt_id: int, model_version: str) -> Path:
+    return WARM_POOL_DIR / f"{_safe_version(model_version)}__{prompt_id}.json"
+
+
+def _list_entries() -> list[Path]:
+    if not WARM_POOL_DIR.exists():
+        return []
+    return sorted(WARM_POOL_DIR.glob("*.json"), key=lambda path: path.stat().st_mtime)
+
+
+def _remove_entry(meta_path: Path) -> None:
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        (WARM_POOL_DIR / f"{meta['audio_id']}.wav").unlink(missing_ok=True)
+    except (OSError, ValueError, KeyError):
+        pass
+    meta_path.unlink(missing_ok=True)
+
+
+def evict() -> int:
+    """Drop expired entries, then the oldest ones while the pool is over capacity."""
+    entries = _list_entries()
+    now = time.time()
+    removed = 0
+    for path in list(entries):
+        if now - path.stat().st_mtime > ENTRY_TTL_SECONDS:
+            _remove_entry(path)
+            entries.remove(path)
+            removed += 1
+    while len(entries) > MAX_ENTRIES:
+        _remove_entry(entries.pop(0))
+        removed += 1
+    _stats["evicted"] += removed
+    return removed
+
+
+def is_default_request(temperature: float, stereo_width: float, generation_mode: str) -> bool:
+    return (
+        temperature == DEFAULT_SETTINGS["temperature"]
+        and stereo_width == DEFAULT_SETTINGS["stereo_width"]
+        and generation_mode == DEFAULT_SETTINGS["generation_mode"]
+    )
+
+
+def warm_prompt_ids(model_version: Optional[str] = None) -> set[int]:
+    """Prompt ids that currently have a warm result (optionally for one model_version)."""
+    ids: set[int] = set()
+    prefix = f"{_safe_version(model_version)}__" if model_version else ""
+    for path in _list_entries():
+        if prefix and not path.name.startswith(prefix):
+            continue
+        try:
+            ids.add(int(path.stem.rsplit("__", 1)[1]))
+        except (IndexError, ValueError):
+            continue
+    return ids
+
+
+def take(prompt_id: int, model_version: str, audio_dir: Path) -> Optional[WarmResult]:
+    """Claim a warm result, moving its audio into ``audio_dir``. Returns None on a miss."""
+    meta_path = _entry_path(prompt_id, model_version)
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        meta_path.unlink()
+    except (OSError, ValueError):
+        _stats["misses"] += 1
+        return None
+
+    audio_id = meta["audio_id"]
+    try:
+        os.replace(WARM_POOL_DIR / f"{audio_id}.wav", audio_dir / f"{audio_id}.wav")
+    except OSError:
+        logger.warning("Warm pool audio missing for prompt %s (%s)", prompt_id, model_version)
+        _stats["misses"] += 1
+        return None
+
+    _stats["hits"] += 1
+    return WarmResult(
+        prompt_id=prompt_id,
+        model_version=model_version,
+        llm_data=meta["llm_data"],
+        controls=meta["controls"],
+        drum_type=meta.get("drum_type"),
+        audio_id=audio_id,
+    )
+
+
+def note_activity(model_version: str, drum_type: Optional[str], difficulty: Optional[int], prompt_id: int) -> None:
+    """Record a tester's rotation position so the worker can look ahead from it."""
+    if not WARM_POOL_ENABLED or not drum_type or not difficulty:
+        return
+    _activity[model_version] = (time.time(), drum_type, difficulty, prompt_id)
+    _wake.set()
+
+
+def pool_state() -> dict[str, Any]:
+    now = time.time()
+    return {
+        "enabled": WARM_POOL_ENABLED,
+        "entries": len(_list_entries()),
+        "max_entries": MAX_ENTRIES,
+        "lookahead": LOOKAHEAD,
+        "active_model_versions": sorted(
+            version for version, (seen, *_rest) in _activity.items() if now - seen <= ACTIVE_WINDOW_SECONDS
+        ),
+        **_stats,
+    }
+
+
+async def _plan_lookahead(
+    drum_type: str, difficulty: int, current_id: int, warm_ids: set[int]
+) -> tuple[set[int], list[Prompt]]:
+    """Walk the next LOOKAHEAD rotation slots after the tester's position.
+
+    Returns the warm prompt ids that already cover a slot (the one
+    /api/prompts/next-in-rotation would serve there) and one least-used prompt
+    to pre-generate for each slot that has none.
+    """
+    async with async_session_maker() as session:
+        drum_types = [
+            dt
+            for dt in (
+                await session.execute(
+                    select(Prompt.drum_type)
+                    .where(Prompt.is_user_generated == False)  # noqa: E712
+                    .distinct()
+                    .order_by(Prompt.drum_type)
+                )
+            ).scalars().all()
+            if dt
+        ]
+        if not drum_types:
+            return set(), []
+        min_used = (
+            await session.execute(
+                select(func.min(Prompt.used_count)).where(Prompt.is_user_generated == False)  # noqa: E712
+            )
+        ).scalar() or 0
+
+        drum_idx = drum_types.index(drum_type) if drum_type in drum_types else 0
+        next_difficulty = difficulty
+        covered: set[int] = set()
+        picked: list[Prompt] = []
+        for _ in range(len(drum_types) * 10):
+            if len(covered) + len(picked) >= LOOKAHEAD:
+                break
+            # Same stepping as /api/prompts/next-in-rotation.
+            if next_difficulty < 10:
+                next_difficulty += 1
+            else:
+                next_difficulty = 1
+                drum_idx = (drum_idx + 1) % len(drum_types)
+            stmt = select(Prompt).where(
+                Prompt.drum_type == drum_types[drum_idx],
+                Prompt.difficulty == next_difficulty,
+                Prompt.is_user_generated == False,  # noqa: E712
+                Prompt.used_count == min_used,
+                Prompt.id != current_id,
+            )
+            if warm_ids:
+                warm_id = (
+                    await session.execute(stmt.where(Prompt.id.in_(warm_ids)).with_only_columns(Prompt.id).limit(1))
+                ).scalar_one_or_none()
+                if warm_id is not None:
+                    covered.add(warm_id)
+                    continue
+            prompt = (await session.execute(stmt.order_by(func.random()).limit(1))).scalar_one_or_none()
+            if prompt:
+                picked.append(prompt)
+        return covered, picked
+
+
+def _evict_outside(model_version: str, keep: set[int]) -> None:
+    """Drop ``model_version`` entries outside the tester's lookahead window (slots already passed)."""
+    removed = 0
+    for prompt_id in warm_prompt_ids(model_version) - keep:
+        _remove_entry(_entry_path(prompt_id, model_version))
+        removed += 1
+    _stats["evicted"] += removed
+
+
+async def _pregenerate(client: DrumGenClient, prompt: Prompt, model_version: str) -> None:
+    llm_data = await client.process_text(prompt.text, model_version)
+    if not llm_data.get("success"):
+        raise RuntimeError(f"LLM error: {llm_data.get('error')}")
+    controls = llm_data.get("controls") or {}
+    drum_type = None
+    for key in ['Kind', 'kind', 'KIND']:
+        if key in controls:
+            drum_type = str(controls[key]).strip()
+            break
+
+    gen_data = await client.generate_audio(
+        {
+            "text_labels": controls,
+            "condition_values": {},
+            "temperature": DEFAULT_SETTINGS["temperature"],
+            "stereo_width": DEFAULT_SETTINGS["stereo_width"],
+            "generation_mode": DEFAULT_SETTINGS["generation_mode"],
+            "model_version": model_version,
+        }
+    )
+    audio_id = gen_data.get("audio_id")
+    if not gen_data.get("success") or not audio_id:
+        raise RuntimeError(f"Generate error: {gen_data.get('error') or 'missing audio_id'}")
+    audio_content = await client.fetch_audio(audio_id)
+
+    WARM_POOL_DIR.mkdir(exist_ok=True)
+    (WARM_POOL_DIR / f"{audio_id}.wav").write_bytes(audio_content)
+    # Write metadata last (atomically) so a visible entry always has its audio.
+    meta_path = _entry_path(prompt.id, model_version)
+    tmp_path = meta_path.with_suffix(".tmp")
+    tmp_path.write_text(
+        json.dumps({"llm_data": llm_data, "controls": controls, "drum_type": drum_type, "audio_id": audio_id}),
+        encoding="utf-8",
+    )
+    os.replace(tmp_path, meta_path)
+
+
+async def _fill_once(client: DrumGenClient) -> None:
+    evict()
+    now = time.time()
+    for model_version, (seen, drum_type, difficulty, current_id) in list(_activity.items()):
+        if now - seen > ACTIVE_WINDOW_SECONDS:
+            _activity.pop(model_version, None)
+            continue
+        covered, missing = await _plan_lookahead(drum_type, difficulty, current_id, warm_prompt_ids(model_version))
+        # Entries behind the tester will not be served; free their room instead of waiting for the TTL.
+        _evict_outside(model_version, covered)
+        for prompt in missing:
+            if len(_list_entries()) >= MAX_ENTRIES:
+                return
+            try:
+                await _pregenerate(client, prompt, model_version)
+                _stats["generated"] += 1
+            except Exception as exc:  # noqa: BLE001
+                _stats["failed"] += 1
+                logger.warning("Warm pool pre-generation failed for prompt %s (%s): %s", prompt.id, model_version, exc)
+
+
+async def _run() -> None:
+    client = DrumGenClient()
+    try:
+        while True:
+            try:
+                await asyncio.wait_for(_wake.wait(), timeout=POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            _wake.clear()
+            try:
+                await _fill_once(client)
+            except Exception:  # noqa: BLE001
+                logger.exception("Warm pool cycle failed")
+    finally:
+        await client.close()
+
+
+def start_warm_pool() -> None:
+    global _task
+    if not WARM_POOL_ENABLED or _task is not None:
+        return
+    WARM_POOL_DIR.mkdir(exist_ok=True)
+    evict()
+    _task = asyncio.get_running_loop().create_task(_run())
+    logger.info("Warm pool started (lookahead=%s, max_entries=%s)", LOOKAHEAD, MAX_ENTRIES)
+
+
+async def stop_warm_pool() -> None:
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    _task = None
@@ -144,7 +144,8 @@ export default function ModelTestingPage() {
     setLoading(true);
     try {
       const { data } = await api.get('/api/model-testing/samples', {
-        params: { drum_type: drumType, limit: 50 },
+        // Reference audio for the batch is pulled into the server cache in the background.
+        params: { drum_type: drumType, limit: 50, prefetch_audio: true },
       });
       if (samplesRequestId !== latestSamplesRequestRef.current) {
         return;
@@ -1,9 +1,10 @@
-import React, { useEffect, useMemo, useState } from 'react';
+import React, { useEffect, useMemo, useRef, useState } from 'react';
 import { useLocation } from 'react-router-dom';
 import api, { API_BASE_URL } from '../services/api';
 import AudioPlayer from '../components/AudioPlayer';
 
 const SCORE_OPTIONS = Array.from({ length: 11 }, (_, index) => index * 10);
+const PAGE_SIZE = 200;
 
 const DRUM_LABELS = {
   bass_drum: 'Bass Drum',
@@ -17,8 +18,11 @@ const DRUM_LABELS = {
 export default function ModelTestingResultsPage() {
   const location = useLocation();
   const [results, setResults] = useState([]);
+  const [total, setTotal] = useState(0);
+  const [nextCursor, setNextCursor] = useState(null);
   const [selected, setSelected] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [drumType, setDrumType] = useState(location.state?.drumType || 'all');
   const [scoreFilter, setScoreFilter] = useState(
     location.state?.audioScore !== undefined && location.state?.audioScore !== null
@@ -30,23 +34,15 @@ export default function ModelTestingResultsPage() {
   const [sortDirection, setSortDirection] = useState('desc');
   const [editScore, setEditScore] = useState(50);
   const [editNotes, setEditNotes] = useState('');
+  // Bumped whenever the filters change, so responses for an older query are dropped.
+  const queryRef = useRef(0);
 
-  const filteredResults = useMemo(() => {
-    let rows = [...results];
-    if (drumType !== 'all') {
-      rows = rows.filter((result) => result.drum_type === drumType);
-    }
-    if (scoreFilter !== 'all') {
-      rows = rows.filter((result) => result.score === Number(scoreFilter));
-    }
-    if (hasNotesFilter) {
-      rows = rows.filter((result) => (result.notes || '').trim().length > 0);
-    }
-    return rows;
-  }, [results, drumType, scoreFilter, hasNotesFilter]);
-
+  // Filters are applied server-side. Pages arrive newest first, so column sorting
+  // is only offered once every matching row is loaded.
+  const canSort = !nextCursor;
   const sortedResults = useMemo(() => {
-    const rows = [...filteredResults];
+    if (!canSort) return results;
+    const rows = [...results];
     rows.sort((a, b) => {
       let aVal;
       let bVal;
@@ -81,23 +77,57 @@ export default function ModelTestingResultsPage() {
       return sortDirection === 'asc' ? aVal - bVal : bVal - aVal;
     });
     return rows;
-  }, [filteredResults, sortColumn, sortDirection]);
+  }, [results, sortColumn, sortDirection, canSort]);
+
+  const buildParams = (cursor) => {
+    const params = { limit: PAGE_SIZE };
+    if (drumType !== 'all') params.drum_type = drumType;
+    if (scoreFilter !== 'all') {
+      params.min_score = Number(scoreFilter);
+      params.max_score = Number(scoreFilter);
+    }
+    if (hasNotesFilter) params.has_notes = true;
+    if (cursor) params.cursor = cursor;
+    return params;
+  };
 
   const loadResults = async () => {
+    const query = ++queryRef.current;
     setLoading(true);
     try {
-      const { data } = await api.get('/api/model-testing/results');
+      const { data } = await api.get('/api/model-testing/results', { params: buildParams() });
+      if (query !== queryRef.current) return;
       setResults(data?.results || []);
+      setTotal(data?.total || 0);
+      setNextCursor(data?.next_cursor || null);
     } catch (err) {
       console.error('Failed to load model-testing results:', err);
     } finally {
-      setLoading(false);
+      if (query === queryRef.current) setLoading(false);
+    }
+  };
+
+  const loadMore = async () => {
+    if (!nextCursor || loadingMore) return;
+    const query = queryRef.current;
+    setLoadingMore(true);
+    try {
+      const { data } = await api.get('/api/model-testing/results', { params: buildParams(nextCursor) });
+      // The filters changed while this page was loading; it belongs to the old result set.
+      if (query !== queryRef.current) return;
+      setResults((prev) => [...prev, ...(data?.results || [])]);
+      setTotal(data?.total || 0);
+      setNextCursor(data?.next_cursor || null);
+    } catch (err) {
+      console.error('Failed to load more model-testing results:', err);
+    } finally {
+      setLoadingMore(false);
     }
   };
 
   useEffect(() => {
     loadResults();
-  }, []);
+  }, [drumType, scoreFilter, hasNotesFilter]);
 
   const hasActiveFilters = () => drumType !== 'all' || scoreFilter !== 'all' || hasNotesFilter;
   const resetFilters = () => {
@@ -106,6 +136,7 @@ export default function ModelTestingResultsPage() {
     setHasNotesFilter(false);
   };
   const handleSort = (column) => {
+    if (!canSort) return;
     if (sortColumn === column) {
       setSortDirection((prev) => (prev === 'asc' ? 'desc' : 'asc'));
     } else {
@@ -114,10 +145,25 @@ export default function ModelTestingResultsPage() {
     }
   };
 
-  const openDetail = (result) => {
+  // Until every page is loaded the table shows the server order (newest first).
+  const sortArrow = (column) => {
+    if (!canSort) return column === 'tested_at' ? '↓' : null;
+    return sortColumn === column && (sortDirection === 'asc' ? '↑' : '↓');
+  };
+  const sortCursor = canSort ? 'pointer' : 'default';
+  const sortTitle = canSort ? undefined : 'Load all results to sort by column';
+
+  const openDetail = async (result) => {
     setSelected(result);
     setEditScore(result.score);
     setEditNotes(result.notes || '');
+    // List rows omit the JSON columns; fetch the full row for the detail view.
+    try {
+      const { data } = await api.get(`/api/model-testing/results/${result.id}`);
+      setSelected((current) => (current && current.id === data.id ? data : current));
+    } catch (err) {
+      console.error('Failed to load model-testing result:', err);
+    }
   };
 
   const saveEdit = async () => {
@@ -140,6 +186,7 @@ export default function ModelTestingResultsPage() {
     try {
       await api.delete(`/api/model-testing/results/${selected.id}`);
       setResults((prev) => prev.filter((row) => row.id !== selected.id));
+      setTotal((prev) => Math.max(prev - 1, 0));
       setSelected(null);
     } catch (err) {
       alert(`Failed to delete: ${err?.response?.data?.detail || err.message}`);
@@ -156,7 +203,7 @@ export default function ModelTestingResultsPage() {
               Reset Filters
             </button>
             <div style={{ padding: '6px 12px', border: '1px solid var(--border-color)', borderRadius: '6px', fontWeight: 600 }}>
-              {sortedResults.length} {sortedResults.length === 1 ? 'result' : 'results'}
+              {total} {total === 1 ? 'result' : 'results'}
             </div>
           </div>
         </div>
@@ -192,11 +239,11 @@ export default function ModelTestingResultsPage() {
         <table style={{ width: '100%', borderCollapse: 'collapse' }}>
           <thead>
             <tr style={{ borderBottom: '2px solid var(--border-color)' }}>
-              <th onClick={() => handleSort('id')} style={{ textAlign: 'left', padding: '10px', cursor: 'pointer' }}>ID {sortColumn === 'id' && (sortDirection === 'asc' ? '↑' : '↓')}</th>
-              <th onClick={() => handleSort('tested_at')} style={{ textAlign: 'left', padding: '10px', cursor: 'pointer' }}>Date {sortColumn === 'tested_at' && (sortDirection === 'asc' ? '↑' : '↓')}</th>
-              <th onClick={() => handleSort('drum_type')} style={{ textAlign: 'left', padding: '10px', cursor: 'pointer' }}>Drum Type {sortColumn === 'drum_type' && (sortDirection === 'asc' ? '↑' : '↓')}</th>
-              <th onClick={() => handleSort('source_kind')} style={{ textAlign: 'left', padding: '10px', cursor: 'pointer' }}>Source Kind {sortColumn === 'source_kind' && (sortDirection === 'asc' ? '↑' : '↓')}</th>
-              <th onClick={() => handleSort('score')} style={{ textAlign: 'center', padding: '10px', cursor: 'pointer' }}>Score {sortColumn === 'score' && (sortDirection === 'asc' ? '↑' : '↓')}</th>
+              <th onClick={() => handleSort('id')} title={sortTitle} style={{ textAlign: 'left', padding: '10px', cursor: sortCursor }}>ID {sortArrow('id')}</th>
+              <th onClick={() => handleSort('tested_at')} title={sortTitle} style={{ textAlign: 'left', padding: '10px', cursor: sortCursor }}>Date {sortArrow('tested_at')}</th>
+              <th onClick={() => handleSort('drum_type')} title={sortTitle} style={{ textAlign: 'left', padding: '10px', cursor: sortCursor }}>Drum Type {sortArrow('drum_type')}</th>
+              <th onClick={() => handleSort('source_kind')} title={sortTitle} style={{ textAlign: 'left', padding: '10px', cursor: sortCursor }}>Source Kind {sortArrow('source_kind')}</th>
+              <th onClick={() => handleSort('score')} title={sortTitle} style={{ textAlign: 'center', padding: '10px', cursor: sortCursor }}>Score {sortArrow('score')}</th>
             </tr>
           </thead>
           <tbody>
@@ -227,6 +274,13 @@ export default function ModelTestingResultsPage() {
             ))}
           </tbody>
         </table>
+        {nextCursor && (
+          <div style={{ display: 'flex', justifyContent: 'center', marginTop: '12px' }}>
+            <button className="btn btn-secondary" onClick={loadMore} disabled={loadingMore}>
+              {loadingMore ? 'Loading...' : `Load more (${results.length} of ${total})`}
+            </button>
+          </div>
+        )}
       </div>
 
       {selected && (
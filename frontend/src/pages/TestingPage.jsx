@@ -1,5 +1,5 @@
 import React, { useState, useEffect, useRef } from 'react';
-import api, { API_BASE_URL } from '../services/api';
+import api, { API_BASE_URL, postEventStream } from '../services/api';
 import PromptDisplay from '../components/PromptDisplay';
 import AudioPlayer from '../components/AudioPlayer';
 import SimpleAudioPlayer from '../components/SimpleAudioPlayer';
@@ -278,8 +278,9 @@ export default function TestingPage() {
     setStatus('Loading next prompt...');
     setLoading(true);
     try {
-      // Pass current position for batch rotation (difficulty 1-10 per drum type)
-      const params = {};
+      // Pass current position for batch rotation (difficulty 1-10 per drum type),
+      // and the model version so only prompts warmed for it are preferred
+      const params = { model_version: modelVersion };
       
       if (isInitialLoad === true) {
         // On initial load, always start from difficulty 1
@@ -374,24 +375,57 @@ export default function TestingPage() {
         payload.illugen_sfx_type = 'one-shot';
       }
       
-      const { data } = await api.post('/api/test/send-prompt', payload);
+      const mapVariation = (v, idx) => ({
+        ...v,
+        request_id: v.request_id || (v.serve_path ? v.serve_path.split('/')?.[3] : undefined),
+        order_index: v.order_index ?? idx,
+        url: v.serve_path ? `${API_BASE_URL}${v.serve_path}` : v.url,
+      });
+
+      // Stream stage progress so controls and audio show up as soon as each stage lands.
+      // One key per send, so a retried request joins its run instead of generating twice.
+      const idempotencyKey = `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+      let data = null;
+      let streamError = null;
+      const streamedVariations = [];
+      await postEventStream('/api/test/send-prompt/stream', payload, (event, eventData) => {
+        if (event === 'llm') {
+          setLlmJson(eventData.llm_controls);
+          setLlmResponse(eventData.llm_response || null);
+          setStatus('Received JSON from DrumGen, generating audio...');
+        } else if (event === 'audio') {
+          setAudioUrl(`${API_BASE_URL}${eventData.audio_url}`);
+          setAudioId(eventData.audio_id || '');
+          setAudioFilePath(eventData.audio_url || '');  // audio_url is the relative path
+          setNoteAttachments([]);
+          setNoteAudioFile(null);
+          setNoteAudioPath('');
+          if (withIllugen) {
+            setLoading(false);
+            setStatus('✓ DrumGen audio ready, waiting for Illugen...');
+          }
+        } else if (event === 'illugen_variation') {
+          streamedVariations.push(mapVariation(eventData, streamedVariations.length));
+          setIllugenData({ generationId: null, variations: [...streamedVariations], error: null });
+        } else if (event === 'done') {
+          data = eventData;
+        } else if (event === 'error') {
+          streamError = new Error(eventData.detail);
+          streamError.response = { status: eventData.status_code, data: { detail: eventData.detail } };
+        }
+      }, { 'Idempotency-Key': idempotencyKey });
+      if (streamError) throw streamError;
+      if (!data) throw new Error('Stream ended before generation finished');
+
       setLlmJson(data.llm_controls);
       setLlmResponse(data.llm_response || null);
       // Store audio information
       setAudioUrl(data.audio_url ? `${API_BASE_URL}${data.audio_url}` : '');
       setAudioId(data.audio_id || '');
       setAudioFilePath(data.audio_url || '');  // audio_url is the relative path
-      setNoteAttachments([]);
-      setNoteAudioFile(null);
-      setNoteAudioPath('');
 
       if (withIllugen) {
-        const mappedVariations = (data.illugen_variations || []).map((v, idx) => ({
-          ...v,
-          request_id: v.request_id || (v.serve_path ? v.serve_path.split('/')?.[3] : undefined),
-          order_index: v.order_index ?? idx,
-          url: v.serve_path ? `${API_BASE_URL}${v.serve_path}` : v.url,
-        }));
+        const mappedVariations = (data.illugen_variations || []).map(mapVariation);
         setIllugenData({
           generationId: data.illugen_generation_id || null,
           variations: mappedVariations,
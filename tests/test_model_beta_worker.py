@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+
+import numpy as np
+import pytest
+
+from backend.model_beta_worker import FALLBACK_CONDITIONING_PARAMS, ModelBetaServer, ModelState, _BadRequest
+
+
+@pytest.fixture
+def server(tmp_path) -> ModelBetaServer:
+    # Payload validation runs before any synthesis, so no model files are needed.
+    state = ModelState.__new__(ModelState)
+    state.conditioning_params = list(FALLBACK_CONDITIONING_PARAMS)
+    server = ModelBetaServer(max_queue=4, keepalive_timeout=1.0, audio_store_dir=tmp_path)
+    server.state = state
+    server.phase = "ready"
+    return server
+
+
+def _post_generate(server: ModelBetaServer, payload) -> tuple[int, dict]:
+    body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+    status, _content_type, response, _headers = asyncio.run(server._dispatch("POST", "/generate", body))
+    return status, json.loads(bytes(response))
+
+
+@pytest.mark.parametrize(
+    ("payload", "detail"),
+    [
+        (b"{not json", "Invalid JSON"),
+        ([1, 2], "Expected a JSON object"),
+        ({"seed": "abc"}, "seed must be a number"),
+        ({"seed": [1]}, "seed must be a number"),
+        ({"temperature": "hot"}, "temperature must be a number"),
+        ({"temperature": "nan"}, "temperature must be finite"),
+        ({"width": None}, "width must be a number"),
+        ({"sliders": [0.5]}, "sliders must be an object"),
+        ({"sliders": {"pitch": "up"}}, "sliders.pitch must be a number"),
+        ({"sliders": {"pitch": True}}, "sliders.pitch must be a number"),
+        ({"labels": "kick"}, "labels must be an object"),
+        ({"labels": {"Kind": {"nested": 1}}}, "labels.Kind must be"),
+        ({"format": "mp3"}, "Unsupported format"),
+        ({"store": "abc"}, "store must be an object"),
+        ({"store": ["abc"]}, "store must be an object"),
+        ({"store": {"audio_id": "../escape"}}, "store.audio_id must match"),
+    ],
+)
+def test_invalid_generate_payloads_are_rejected_with_400(server, payload, detail):
+    status, response = _post_generate(server, payload)
+    assert status == 400
+    assert detail in response["detail"]
+
+
+def test_generate_is_unavailable_until_ready(server):
+    server.phase = "loading"
+    status, response = _post_generate(server, {})
+    assert status == 503
+    assert response["phase"] == "loading"
+
+
+def _read(server: ModelBetaServer, data: bytes):
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await server._read_request(reader)
+
+    return asyncio.run(run())
+
+
+def test_oversized_request_and_header_lines_are_bad_requests(server):
+    with pytest.raises(_BadRequest, match="Request line too long"):
+        _read(server, b"GET /" + b"a" * 70_000 + b" HTTP/1.1\r\n\r\n")
+    with pytest.raises(_BadRequest, match="Header line too long"):
+        _read(server, b"GET /health HTTP/1.1\r\nX-Long: " + b"a" * 70_000 + b"\r\n\r\n")
+
+
+def test_well_formed_request_is_parsed(server):
+    body = b'{"seed": 1}'
+    request = _read(server, b"POST /generate?x=1 HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+    assert request == ("POST", "/generate", "HTTP/1.1", {"content-length": str(len(body))}, body)
+
+
+FAKE_SYNTH = """
+import numpy as np
+
+
+class DrumSynthONNX:
+    fs = 8000
+    rng = None  # None: noise from the global RNG, like the real synth
+
+    def __init__(self, onnx_dir):
+        pass
+
+    def generate_drum_stereo(self, condition, latent, text, temperature, width, noise_source):
+        draw = self.rng.random if self.rng is not None else np.random.rand
+        noise = noise_source if noise_source is not None else draw(4)
+        audio = np.tile(np.resize(noise, 80)[:, None], (1, 2)).astype(np.float32) * 0.5
+        return None, audio, None, np.zeros(5, dtype=np.float32), noise
+"""
+
+
+@pytest.fixture
+def fake_model(tmp_path, monkeypatch):
+    onnx_dir = tmp_path / "onnx"
+    onnx_dir.mkdir()
+    (onnx_dir / "label_dictionaries.json").write_text(json.dumps({"dictionaries": {}, "multi_value_cols": []}))
+    (tmp_path / "drum_synth_onnx.py").write_text(FAKE_SYNTH)
+    monkeypatch.setattr(sys, "path", list(sys.path))
+    monkeypatch.delitem(sys.modules, "drum_synth_onnx", raising=False)
+    return ModelState(model_root=tmp_path, onnx_dir=onnx_dir)
+
+
+def test_seeded_noise_reproduces_audio_through_the_global_rng(fake_model):
+    assert fake_model.check_seeding()
+    assert fake_model.result_key({"seed": 1}) is not None
+
+
+def test_seeded_results_are_not_cached_when_the_seed_has_no_effect(fake_model):
+    fake_model.synth.rng = np.random.default_rng()
+    assert not fake_model.check_seeding()
+    assert fake_model.result_key({"seed": 1}) is None
+    assert fake_model.startup["seeding_reproducible"] is False
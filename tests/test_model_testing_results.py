@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+from typing import Any, Optional
+
+import pytest
+from sqlalchemy import text
+
+from backend.loadtest.check_results_pagination import _tested_at
+from backend.routers.model_testing import list_results
+
+ROWS = 61
+
+
+@pytest.fixture
+def results_db(session_maker):
+    async def seed() -> None:
+        async with session_maker() as session:
+            # Raw SQL keeps both stored tested_at shapes exactly as written.
+            await session.execute(
+                text(
+                    "INSERT INTO model_test_results (source_dataset, source_filename, drum_type, score, notes, tested_at) "
+                    "VALUES (:dataset, :filename, :drum_type, :score, :notes, :tested_at)"
+                ),
+                [
+                    {
+                        "dataset": "gold",
+                        "filename": f"sample_{index}.wav",
+                        "drum_type": "snare" if index % 3 else "bass_drum",
+                        "score": (index % 5) * 10,
+                        "notes": "muddy" if index % 4 == 0 else None,
+                        "tested_at": _tested_at(index),
+                    }
+                    for index in range(ROWS)
+                ],
+            )
+            await session.commit()
+
+    asyncio.run(seed())
+    return session_maker
+
+
+def _page_through(session_maker, limit: int, **filters: Any) -> tuple[list[dict[str, Any]], int]:
+    params: dict[str, Any] = {
+        "drum_type": None,
+        "min_score": None,
+        "max_score": None,
+        "tested_after": None,
+        "tested_before": None,
+        "model_version": None,
+        "has_notes": None,
+        "include_json": False,
+        **filters,
+    }
+
+    async def run() -> tuple[list[dict[str, Any]], int]:
+        rows: list[dict[str, Any]] = []
+        cursor: Optional[str] = None
+        async with session_maker() as session:
+            for _ in range(ROWS + 1):
+                page = await list_results(cursor=cursor, limit=limit, session=session, **params)
+                assert page["total"] >= len(rows)
+                rows.extend(page["results"])
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    return rows, page["total"]
+        raise AssertionError("cursor never ran out")
+
+    return asyncio.run(run())
+
+
+def _newest_first(indexes) -> list[int]:
+    # Ids are 1-based insert order.
+    return [
+        index + 1
+        for index in sorted(indexes, key=lambda index: (datetime.fromisoformat(_tested_at(index)), index), reverse=True)
+    ]
+
+
+@pytest.mark.parametrize("limit", [1, 7, 20, ROWS, 100])
+def test_cursor_pages_cover_every_row_once_newest_first(results_db, limit):
+    rows, total = _page_through(results_db, limit)
+    assert total == ROWS
+    assert [row["id"] for row in rows] == _newest_first(range(ROWS))
+
+
+@pytest.mark.parametrize("include_json", [False, True])
+def test_cursor_paging_keeps_filters(results_db, include_json):
+    rows, total = _page_through(results_db, 4, drum_type="snare", has_notes=True, include_json=include_json)
+    expected = _newest_first(index for index in range(ROWS) if index % 3 and index % 4 == 0)
+    assert total == len(expected)
+    assert [row["id"] for row in rows] == expected
+
+
+def test_cursor_paging_with_score_range(results_db):
+    rows, total = _page_through(results_db, 5, min_score=20, max_score=30)
+    expected = _newest_first(index for index in range(ROWS) if (index % 5) * 10 in {20, 30})
+    assert total == len(expected)
+    assert [row["id"] for row in rows] == expected
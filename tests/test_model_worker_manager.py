@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from backend.services import model_worker_manager as manager
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    slots = [manager.WorkerSlot(0, 18001), manager.WorkerSlot(1, 18002)]
+    monkeypatch.setattr(manager, "_SLOTS", slots)
+    monkeypatch.setattr(manager, "STARTING_POLL_SECONDS", 0.01)
+    return slots
+
+
+def _supervised(coro_factory):
+    """Run a coroutine as if the supervisor were running (without spawning anything)."""
+
+    async def run():
+        manager._ready_event = asyncio.Event()
+        manager._monitor_task = asyncio.get_running_loop().create_future()
+        try:
+            return await coro_factory()
+        finally:
+            manager._monitor_task.cancel()
+            manager._monitor_task = None
+            manager._ready_event = None
+
+    return asyncio.run(run())
+
+
+async def _lease_url() -> str:
+    async with manager.worker_lease() as url:
+        return url
+
+
+def test_crash_looping_pool_fails_fast(pool):
+    for slot in pool:
+        slot.state = "backoff"
+        slot.next_start_at = time.time() + 4
+    pool[1].state = "failed"
+
+    started = time.monotonic()
+    with pytest.raises(manager.WorkerPoolUnavailable) as info:
+        _supervised(_lease_url)
+    assert time.monotonic() - started < 1
+    assert info.value.retry_after == 4
+    assert "backoff" in str(info.value)
+
+
+def test_lease_waits_for_a_starting_worker(pool):
+    pool[0].state = "backoff"
+    pool[1].state = "warming"
+
+    async def lease_after_warm_up() -> str:
+        async def become_ready() -> None:
+            await asyncio.sleep(0.05)
+            pool[1].state = "ready"
+
+        asyncio.ensure_future(become_ready())
+        return await _lease_url()
+
+    assert _supervised(lease_after_warm_up) == pool[1].base_url
+
+
+def test_lease_prefers_ready_least_loaded_worker(pool):
+    pool[0].state = "ready"
+    pool[1].state = "ready"
+    pool[0].in_flight = 2
+    assert _supervised(_lease_url) == pool[1].base_url
+
+
+def test_without_supervisor_any_worker_is_used(pool):
+    assert asyncio.run(_lease_url()) in {slot.base_url for slot in pool}
+
+
+def test_pool_workers_get_their_own_audio_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(manager, "AUDIO_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(manager, "WORKER_COUNT", 2)
+    assert manager._worker_env(0)["MODEL_AUDIO_CACHE_DIR"] == str(tmp_path / "worker0")
+    assert manager._worker_env(1)["MODEL_AUDIO_CACHE_DIR"] == str(tmp_path / "worker1")
+
+
+def test_single_worker_keeps_the_configured_audio_cache_dir(monkeypatch):
+    monkeypatch.setattr(manager, "WORKER_COUNT", 1)
+    monkeypatch.delenv("MODEL_AUDIO_CACHE_DIR", raising=False)
+    assert "MODEL_AUDIO_CACHE_DIR" not in manager._worker_env(0)
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+
+from backend.models import SampleCatalogSyncState
+from backend.services.remote_samples import DRUM_KIND_MAP, catalog_kinds, synced_sources
+
+
+def _mark(session_maker, source: str, kinds: list[str], full: bool) -> None:
+    async def run() -> None:
+        async with session_maker() as session:
+            now = datetime.now(timezone.utc)
+            for kind in kinds:
+                session.add(
+                    SampleCatalogSyncState(
+                        source=source,
+                        kind=kind,
+                        next_page=2,
+                        last_synced_at=now,
+                        last_full_sync_at=now if full else None,
+                    )
+                )
+            await session.commit()
+
+    asyncio.run(run())
+
+
+def _synced(session_maker, kinds=None) -> list[str]:
+    async def run() -> list[str]:
+        async with session_maker() as session:
+            return sorted(await synced_sources(session, kinds))
+
+    return asyncio.run(run())
+
+
+def test_no_sync_state_means_no_local_sources(session_maker):
+    assert _synced(session_maker) == []
+
+
+def test_source_is_local_only_once_every_kind_has_fully_synced(session_maker):
+    kinds = catalog_kinds()
+    _mark(session_maker, "gold-db", kinds[:1], full=True)
+    assert _synced(session_maker) == []
+
+    _mark(session_maker, "gold-db", kinds[1:-1], full=True)
+    _mark(session_maker, "gold-db", kinds[-1:], full=False)
+    assert _synced(session_maker) == []
+
+    _mark(session_maker, "full-db", kinds, full=True)
+    assert _synced(session_maker) == ["full-db"]
+
+
+def test_scoped_to_requested_kinds(session_maker):
+    _mark(session_maker, "gold-db", DRUM_KIND_MAP["snare"], full=True)
+    _mark(session_maker, "gold-db", DRUM_KIND_MAP["bass_drum"][:1], full=True)
+    assert _synced(session_maker, DRUM_KIND_MAP["snare"]) == ["gold-db"]
+    assert _synced(session_maker, DRUM_KIND_MAP["bass_drum"]) == []
+    assert _synced(session_maker) == []
+
+
+def test_unknown_sources_are_ignored(session_maker):
+    _mark(session_maker, "other-db", catalog_kinds(), full=True)
+    assert _synced(session_maker) == []
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from backend.routers import model_testing, testing
+from backend.services.single_flight import IdempotencyConflict, SingleFlight, request_key
+
+
+async def _collect(events) -> list:
+    return [event async for event in events]
+
+
+def test_concurrent_calls_share_one_run():
+    flights = SingleFlight()
+    runs = 0
+
+    async def work() -> str:
+        nonlocal runs
+        runs += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def run() -> list[str]:
+        return await asyncio.gather(*(flights.do("k", work) for _ in range(3)))
+
+    assert asyncio.run(run()) == ["result"] * 3
+    assert runs == 1
+    assert flights.shared_hits == 2
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_only_successful_results_are_retained():
+    flights = SingleFlight()
+    outcomes = iter([RuntimeError("boom"), "ok"])
+
+    async def work() -> str:
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def run() -> tuple[str, str]:
+        with pytest.raises(RuntimeError):
+            await flights.do("k", work, retain_seconds=60)
+        first = await flights.do("k", work, retain_seconds=60)
+        # Retained: replayed without calling work() (which would raise StopIteration).
+        return first, await flights.do("k", work, retain_seconds=60)
+
+    assert asyncio.run(run()) == ("ok", "ok")
+    assert flights.replayed_hits == 1
+
+
+def test_stream_subscribers_replay_from_the_start():
+    flights = SingleFlight()
+    runs = 0
+
+    async def events():
+        nonlocal runs
+        runs += 1
+        for index in range(3):
+            yield index
+            await asyncio.sleep(0.01)
+
+    async def run() -> list[list[int]]:
+        first = flights.stream("k", events)
+        # Join after the first event has already been published.
+        await asyncio.sleep(0.005)
+        return await asyncio.gather(_collect(first), _collect(flights.stream("k", events)))
+
+    assert asyncio.run(run()) == [[0, 1, 2], [0, 1, 2]]
+    assert runs == 1
+
+
+def test_stream_is_retained_only_when_it_succeeded():
+    flights = SingleFlight()
+    endings = iter(["error", "done"])
+
+    async def events():
+        yield "llm"
+        yield next(endings)
+
+    def succeeded(event: str) -> bool:
+        return event == "done"
+
+    async def run() -> list[list[str]]:
+        return [
+            await _collect(flights.stream("k", events, retain_seconds=60, succeeded=succeeded))
+            for _ in range(3)
+        ]
+
+    assert asyncio.run(run()) == [["llm", "error"], ["llm", "done"], ["llm", "done"]]
+    assert flights.replayed_hits == 1
+
+
+def test_byte_stream_replay_buffer_is_bounded():
+    flights = SingleFlight()
+    runs = 0
+
+    async def chunks():
+        nonlocal runs
+        runs += 1
+        for _ in range(4):
+            yield b"x" * 10
+            await asyncio.sleep(0.01)
+
+    async def run() -> dict:
+        reader = flights.stream("k", chunks, max_replay_bytes=15)
+        idle = flights.stream("k", chunks, max_replay_bytes=15)
+        broadcast = flights._in_flight["k"]
+        read = [await reader.__anext__(), await reader.__anext__()]
+        # Over the cap: the run leaves the in-flight table and late callers start their own.
+        late = flights.stream("k", chunks, max_replay_bytes=15)
+        del idle  # never iterated, so it no longer holds chunks back
+        read += [chunk async for chunk in reader]
+        return {"read": read, "late": await _collect(late), "buffered": len(broadcast.events)}
+
+    result = asyncio.run(run())
+    assert result["read"] == result["late"] == [b"x" * 10] * 4
+    assert result["buffered"] <= 1
+    assert runs == 2
+
+
+def test_idempotency_key_reused_with_another_payload_conflicts():
+    flights = SingleFlight()
+
+    async def work() -> str:
+        return "ok"
+
+    async def run() -> None:
+        key, retain, fingerprint = request_key("ns", {"text": "kick"}, "abc")
+        await flights.do(key, work, retain_seconds=retain, fingerprint=fingerprint)
+        key, retain, fingerprint = request_key("ns", {"text": "snare"}, "abc")
+        await flights.do(key, work, retain_seconds=retain, fingerprint=fingerprint)
+
+    with pytest.raises(IdempotencyConflict):
+        asyncio.run(run())
+
+
+def test_send_prompt_without_idempotency_key_is_not_shared(monkeypatch):
+    runs = 0
+
+    async def resolve_prompt(payload, session):
+        return None, payload.text
+
+    async def send_prompt_events(payload, prompt_obj, prompt_text):
+        nonlocal runs
+        runs += 1
+        run = runs
+        await asyncio.sleep(0.01)
+        yield ("done", {"run": run})
+
+    monkeypatch.setattr(testing, "_resolve_prompt", resolve_prompt)
+    monkeypatch.setattr(testing, "_send_prompt_events", send_prompt_events)
+    payload = testing.SendPromptRequest(text="punchy kick")
+
+    async def run(idempotency_key):
+        streams = [await testing._shared_send_prompt(payload, None, idempotency_key) for _ in range(2)]
+        return await asyncio.gather(*(_collect(events) for events in streams))
+
+    assert asyncio.run(run(None)) == [[("done", {"run": 1})], [("done", {"run": 2})]]
+    runs = 0
+    assert asyncio.run(run("send-1")) == [[("done", {"run": 1})], [("done", {"run": 1})]]
+
+
+def test_reused_idempotency_key_on_generate_is_a_422(monkeypatch):
+    async def generate_from_tags(payload):
+        return {"audio_id": payload.tags["Kind"]}
+
+    monkeypatch.setattr(model_testing, "_generate_from_tags", generate_from_tags)
+    monkeypatch.setattr(model_testing, "generation_flights", SingleFlight())
+
+    async def run() -> None:
+        kick = model_testing.GenerateModelAudioRequest(sample={}, tags={"Kind": "Kick"})
+        snare = model_testing.GenerateModelAudioRequest(sample={}, tags={"Kind": "Snare"})
+        assert await model_testing.generate_from_tags(kick, idempotency_key="abc") == {"audio_id": "Kick"}
+        await model_testing.generate_from_tags(snare, idempotency_key="abc")
+
+    with pytest.raises(HTTPException) as info:
+        asyncio.run(run())
+    assert info.value.status_code == 422
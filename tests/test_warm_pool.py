@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import select
+
+from backend.models import Prompt
+from backend.services import warm_pool
+
+
+class FakeDrumGen:
+    def __init__(self) -> None:
+        self.generated = 0
+
+    async def process_text(self, text: str, model_version: str) -> dict:
+        return {"success": True, "controls": {"Kind": "Snare"}, "llm_response": text}
+
+    async def generate_audio(self, payload: dict) -> dict:
+        self.generated += 1
+        return {"success": True, "audio_id": f"warm{self.generated}"}
+
+    async def fetch_audio(self, audio_id: str) -> bytes:
+        return b"RIFF"
+
+
+@pytest.fixture
+def pool(session_maker, tmp_path, monkeypatch):
+    monkeypatch.setattr(warm_pool, "async_session_maker", session_maker)
+    monkeypatch.setattr(warm_pool, "WARM_POOL_DIR", tmp_path / "warm_pool")
+    monkeypatch.setattr(warm_pool, "LOOKAHEAD", 3)
+    monkeypatch.setattr(warm_pool, "_activity", {})
+
+    async def seed() -> None:
+        async with session_maker() as session:
+            for difficulty in range(1, 11):
+                for copy in range(2):
+                    session.add(Prompt(text=f"snare {difficulty}/{copy}", difficulty=difficulty, drum_type="snare"))
+            await session.commit()
+
+    asyncio.run(seed())
+    return FakeDrumGen()
+
+
+def _prompt_id(session_maker, difficulty: int) -> int:
+    async def run() -> int:
+        async with session_maker() as session:
+            return (
+                await session.execute(select(Prompt.id).where(Prompt.difficulty == difficulty).order_by(Prompt.id).limit(1))
+            ).scalar_one()
+
+    return asyncio.run(run())
+
+
+def _difficulties(session_maker, prompt_ids: set[int]) -> list[int]:
+    async def run() -> list[int]:
+        async with session_maker() as session:
+            return sorted([(await session.get(Prompt, prompt_id)).difficulty for prompt_id in prompt_ids])
+
+    return asyncio.run(run())
+
+
+def test_filled_slots_are_not_generated_again(pool, session_maker):
+    warm_pool._activity["v1"] = (time.time(), "snare", 2, _prompt_id(session_maker, 2))
+    asyncio.run(warm_pool._fill_once(pool))
+    assert pool.generated == 3
+    assert _difficulties(session_maker, warm_pool.warm_prompt_ids("v1")) == [3, 4, 5]
+
+    for _ in range(3):
+        asyncio.run(warm_pool._fill_once(pool))
+    assert pool.generated == 3
+
+
+def test_entries_behind_the_tester_are_evicted(pool, session_maker):
+    warm_pool._activity["v1"] = (time.time(), "snare", 2, _prompt_id(session_maker, 2))
+    asyncio.run(warm_pool._fill_once(pool))
+
+    warm_pool._activity["v1"] = (time.time(), "snare", 4, _prompt_id(session_maker, 4))
+    asyncio.run(warm_pool._fill_once(pool))
+    assert _difficulties(session_maker, warm_pool.warm_prompt_ids("v1")) == [5, 6, 7]
+    assert pool.generated == 5
+
+
+def test_versions_are_warmed_independently(pool, session_maker):
+    current = _prompt_id(session_maker, 2)
+    warm_pool._activity["v1"] = (time.time(), "snare", 2, current)
+    asyncio.run(warm_pool._fill_once(pool))
+    warm_pool._activity["v2"] = (time.time(), "snare", 2, current)
+    asyncio.run(warm_pool._fill_once(pool))
+    assert pool.generated == 6
+    assert len(warm_pool.warm_prompt_ids("v2")) == 3